@@ -25,5 +25,20 @@ strategy_config = {
 
     # Sets the maximum absolute value for the raw signal before normalization.
     # This helps to mitigate the impact of extreme volatility spikes on position sizing.
-    "clip_threshold": 2.0
-}
\ No newline at end of file
+    "clip_threshold": 2.0,
+
+    # Trade the N symbols with the highest recent daily turnover instead of `assets`
+    # when the context provides a universe (module.universe); None keeps `assets`.
+    "universe_size": None
+}
+
+
+# ==========================
+# Schedule Metadata
+# ==========================
+# Minute closes, short_vol_window + long_vol_window + 5 bars; runs every rebalance.
+schedule_config = {
+    "frequency": "1m",
+    "lookback": ["short_vol_window", "long_vol_window", 5],
+    "fields": ["close"],
+}
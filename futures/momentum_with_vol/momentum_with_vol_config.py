@@ -31,4 +31,18 @@ strategy_config = {
     # If True, weights are rank-normalized cross-sectionally.
     # If False, dollar-neutralized weights are used directly.
     "use_rank_normalization": True
-}
\ No newline at end of file
+}
+
+
+# ==========================
+# Schedule Metadata
+# ==========================
+# Lets runners skip calls that would only hold and fetch the window up front.
+schedule_config = {
+    # The strategy only trades on Mondays; other rebalances hold positions.
+    "weekdays": [0],
+    # Daily close and volume, vol_z_period + vol_std_period + 5 bars.
+    "frequency": "1d",
+    "lookback": ["vol_z_period", "vol_std_period", 5],
+    "fields": ["close", "volume"],
+}
@@ -1,5 +1,51 @@
 from module.data_context import DataContext
 import pandas as pd
+import numpy as np
+
+def weight_matrix(close: pd.DataFrame, config_dict: dict) -> pd.DataFrame:
+    """
+    Weights for every timestamp of a wide close-price frame (index=datetime, columns=asset).
+
+    Row t equals what `strategy` returns when its window ends at t: momentum is the
+    mean of (close[t] / close[t - p] - 1) over the configured periods, positives are
+    scaled to `long_ratio`, negatives to `short_ratio`, and rows with gross exposure
+    above 1 are rescaled to 1. Assets with zero momentum get weight 0.
+    """
+    strategy_params = config_dict.get("strategy_config", {})
+    periods = strategy_params.get("minutes", [60, 120, 180])
+    long_ratio = strategy_params.get("long_ratio", 0.7)
+    short_ratio = strategy_params.get("short_ratio", 0.3)
+
+    prices = close.to_numpy(dtype=np.float64)
+    num_rows = len(prices)
+
+    # Average k-bar return over all periods; a period only counts once the row has
+    # more than p bars of history, and a zero base price contributes nothing.
+    momentum = np.zeros(prices.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p in periods:
+            if num_rows <= p:
+                continue
+            first = prices[:-p]
+            ret = np.where(first != 0, prices[p:] / first - 1, 0.0)
+            momentum[p:] += ret
+    momentum /= len(periods)
+
+    # Normalize longs and shorts separately.
+    longs = momentum > 0
+    shorts = momentum < 0
+    total_long = np.where(longs, momentum, 0.0).sum(axis=1, keepdims=True)
+    total_short = -np.where(shorts, momentum, 0.0).sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(longs, (momentum / total_long) * long_ratio, 0.0)
+        weights = np.where(shorts, (momentum / total_short) * short_ratio, weights)
+
+    # Ensure total absolute weight ≤ 1
+    abs_sum = np.abs(weights).sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(abs_sum > 1.0, weights * (1.0 / abs_sum), weights)
+
+    return pd.DataFrame(weights, index=close.index, columns=close.columns)
 
 def strategy(context: DataContext, config_dict: dict) -> dict:
     """
@@ -11,8 +57,6 @@ def strategy(context: DataContext, config_dict: dict) -> dict:
     assets = strategy_params.get("assets", [])
     window = strategy_params.get("window", 180)  # window in minutes
     periods = strategy_params.get("minutes", [60, 120, 180])  # already in minutes
-    long_ratio = strategy_params.get("long_ratio", 0.7)
-    short_ratio = strategy_params.get("short_ratio", 0.3)
 
     # Fetch historical price data at 1-minute frequency
     hist = context.get_history(
@@ -28,36 +72,8 @@ def strategy(context: DataContext, config_dict: dict) -> dict:
     # Pivot to have index=datetime, columns=asset
     df = hist["close"].unstack(level=0)
 
-    # Calculate momentum for each asset
-    momentum = {}
-    for col in df.columns:
-        col_momentum = 0
-        for p in periods:
-            if len(df) > p:
-                first_price = df[col].iloc[-p-1]
-                last_price = df[col].iloc[-1]
-                if first_price != 0:
-                    col_momentum += (last_price / first_price) - 1
-        momentum[col] = col_momentum / len(periods)
-
-    # Separate long and short
-    longs = {k: v for k, v in momentum.items() if v > 0}
-    shorts = {k: v for k, v in momentum.items() if v < 0}
-
-    # Normalize weights
-    weights = {}
-    total_long = sum(longs.values())
-    total_short = -sum(shorts.values())
-    for k, v in longs.items():
-        weights[k] = (v / total_long) * long_ratio if total_long != 0 else 0
-    for k, v in shorts.items():
-        weights[k] = (v / total_short) * short_ratio if total_short != 0 else 0
-
-    # Ensure total absolute weight ≤ 1
-    abs_sum = sum(abs(w) for w in weights.values())
-    if abs_sum > 1.0:
-        scale = 1.0 / abs_sum
-        for k in weights:
-            weights[k] *= scale
-
+    # Latest row of the full weight matrix; longs first, then shorts
+    latest = weight_matrix(df, config_dict).iloc[-1]
+    weights = {k: v for k, v in latest.items() if v > 0}
+    weights.update({k: v for k, v in latest.items() if v < 0})
     return weights
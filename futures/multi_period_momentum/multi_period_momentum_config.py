@@ -11,3 +11,14 @@ strategy_config = {
     "long_ratio": 0.7,
     "short_ratio": 0.3    
 }
+
+
+# ==========================
+# Schedule Metadata
+# ==========================
+# Minute closes, window + the longest momentum period; runs every rebalance.
+schedule_config = {
+    "frequency": "1m",
+    "lookback": ["window", "minutes"],
+    "fields": ["close"],
+}
@@ -0,0 +1,392 @@
+import importlib
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from module.bar_store import BarStore
+from module.cadence import Cadence
+from module.data_context import PanelDataContext, ffill, frequency_to_minutes, to_datetime64
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+@dataclass
+class BacktestResult:
+    """Arrays produced by `run_backtest`. Bar-level series have one entry per bar in the test range."""
+    times: np.ndarray            # (T,) datetime64 of each bar
+    assets: list                 # (N,) column order for every per-asset array
+    equity: np.ndarray           # (T,) account equity marked at each bar close
+    leverage: np.ndarray         # (T,) gross exposure / equity
+    rebalance_index: np.ndarray  # (R,) bar positions (into `times`) where the strategy was called
+    weights: np.ndarray          # (R, N) target weights returned by the strategy
+    positions: np.ndarray        # (R, N) units held after each rebalance
+    turnover: np.ndarray         # (R,) traded notional / equity at each rebalance
+    fees: np.ndarray             # (R,) fees paid at each rebalance
+    bar_minutes: int = 1
+    config: dict = field(default_factory=dict)
+
+    def equity_curve(self) -> pd.Series:
+        return pd.Series(self.equity, index=pd.DatetimeIndex(self.times), name="equity")
+
+    def summary(self) -> dict:
+        """Headline statistics of the run."""
+        returns = np.diff(self.equity) / self.equity[:-1] if len(self.equity) > 1 else np.zeros(0)
+        periods_per_year = MINUTES_PER_YEAR / self.bar_minutes
+        std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+        running_max = np.maximum.accumulate(self.equity) if len(self.equity) else self.equity
+        drawdown = self.equity / running_max - 1 if len(self.equity) else self.equity
+        return {
+            "total_return": float(self.equity[-1] / self.equity[0] - 1) if len(self.equity) else 0.0,
+            "sharpe": float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+            "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+            "avg_leverage": float(self.leverage.mean()) if len(self.leverage) else 0.0,
+            "avg_turnover": float(self.turnover.mean()) if len(self.turnover) else 0.0,
+            "total_fees": float(self.fees.sum()),
+            "rebalances": int(len(self.rebalance_index)),
+        }
+
+
+def load_strategy(strategy_name: str) -> tuple:
+    """Import `futures/<name>/<name>.py` and its config, returning (strategy, config_dict)."""
+    strategy_module = importlib.import_module(f"futures.{strategy_name}.{strategy_name}")
+    config_module = importlib.import_module(f"futures.{strategy_name}.{strategy_name}_config")
+    config_dict = {"strategy_config": getattr(config_module, "strategy_config", {})}
+    for section in ("rebalancing_config", "schedule_config"):
+        if hasattr(config_module, section):
+            config_dict[section] = getattr(config_module, section)
+    Cadence.from_config(config_dict)   # fail on a malformed schedule_config at load time
+    return strategy_module.strategy, config_dict
+
+
+def rebalance_schedule(times: np.ndarray, start: np.datetime64, end: np.datetime64, interval_hours: float) -> np.ndarray:
+    """Bar positions of the last bar at or before each `interval_hours` boundary in [start, end]."""
+    step = np.timedelta64(int(interval_hours * 3600), "s")
+    boundaries = np.arange(start, end + np.timedelta64(1, "ns"), step).astype("datetime64[ns]")
+    index = np.searchsorted(times, boundaries, side="right") - 1
+    index = index[(index >= 0) & (times[np.maximum(index, 0)] >= start)]
+    return np.unique(index)
+
+
+def weights_to_vector(weights: dict, asset_index: dict, size: int) -> np.ndarray:
+    vector = np.zeros(size)
+    for symbol, weight in weights.items():
+        i = asset_index.get(symbol)
+        if i is not None and weight is not None and np.isfinite(weight):
+            vector[i] = weight
+    return vector
+
+
+def run_backtest(
+    strategy: Callable,
+    config_dict: dict,
+    context: PanelDataContext,
+    start=None,
+    end=None,
+    capital: float = 10000,
+    leverage: float = 1,
+    fee_rate: float = 0.0005,
+    price_field: str = "close",
+) -> BacktestResult:
+    """
+    Replay bars through `context` and call `strategy(context, config_dict)` at every
+    `rebalancing_interval_hours` boundary between `start` and `end`.
+
+    Targets are `weight * equity * leverage` of notional, filled at the close of the
+    rebalance bar. An empty dict from the strategy holds the current positions; any
+    other dict is the full target book (missing assets are closed).
+    Between rebalances units are held constant and equity is marked to market
+    for the whole segment at once. Rebalances off the strategy's declared
+    cadence (`schedule_config`, see `module.cadence`) hold without calling it.
+    """
+    asset_index = {asset: i for i, asset in enumerate(context.assets)}
+    num_assets = len(context.assets)
+    cadence = Cadence.from_config(config_dict)
+
+    def target_at(bar: int) -> Optional[np.ndarray]:
+        if cadence is not None and not cadence.due(context.times[bar]):
+            return None
+        context.cursor = bar
+        target = strategy(context, config_dict)
+        return weights_to_vector(target, asset_index, num_assets) if target else None
+
+    cursor = context.cursor
+    try:
+        return _simulate(target_at, config_dict, context, start, end, capital, leverage, fee_rate, price_field)
+    finally:
+        context.cursor = cursor
+
+
+def run_matrix_backtest(
+    weights: np.ndarray,
+    config_dict: dict,
+    context: PanelDataContext,
+    start=None,
+    end=None,
+    capital: float = 10000,
+    leverage: float = 1,
+    fee_rate: float = 0.0005,
+    price_field: str = "close",
+) -> BacktestResult:
+    """
+    Backtest a precomputed (time x asset) weight matrix aligned with `context.times`
+    and `context.assets`, e.g. from a strategy's whole-history `weight_matrix`.
+
+    Rows are sampled on the same rebalance schedule as `run_backtest`; an all-zero
+    (or all-NaN) row holds positions like an empty dict from `strategy`.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (len(context.times), len(context.assets)):
+        raise ValueError(f"Weight matrix has shape {weights.shape}, expected {(len(context.times), len(context.assets))}")
+
+    def target_at(bar: int) -> Optional[np.ndarray]:
+        row = np.nan_to_num(weights[bar])
+        return row if row.any() else None
+
+    return _simulate(target_at, config_dict, context, start, end, capital, leverage, fee_rate, price_field)
+
+
+def _read_ahead(store: BarStore, fields: List[str], first: int, last: int, chunk_bars: int,
+                chunks: queue.Queue, stopped: threading.Event) -> None:
+    """Reader thread: queue (row, times, {field: block}) for each chunk of rows [first, last), then None."""
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for row in range(first, last, chunk_bars):
+            stop = min(row + chunk_bars, last)
+            # One extra time tells the consumer where this chunk's rebalance boundaries end.
+            times = store.read_times(row, stop + 1)
+            if not put((row, times, {name: store.read(name, row, stop) for name in fields})):
+                return
+        put(None)
+    except BaseException as e:
+        put(e)
+
+
+def run_streaming_backtest(
+    strategy: Callable,
+    config_dict: dict,
+    store: BarStore,
+    start=None,
+    end=None,
+    lookback_minutes: Optional[float] = None,
+    chunk_bars: int = 10_080,
+    fields: Optional[List[str]] = None,
+    prefetch: int = 1,
+    capital: float = 10000,
+    leverage: float = 1,
+    fee_rate: float = 0.0005,
+    price_field: str = "close",
+) -> BacktestResult:
+    """
+    `run_backtest` over a `BarStore` too long to hold in memory.
+
+    Rows are read from disk `chunk_bars` at a time (plain reads, not the memmap)
+    by a background thread that stays up to `prefetch` chunks ahead. The
+    strategy sees a `PanelDataContext` over the last `lookback_minutes` of bars
+    plus the current chunk, so its `get_history` windows must fit in
+    `lookback_minutes`. Only `fields` are read. Both default to the strategy's
+    declared `schedule_config` (else one day and every field), and off-cadence
+    rebalances hold without calling the strategy.
+
+    Resident memory is about (lookback + (2 + prefetch) * chunk_bars) rows x
+    assets x fields, whatever the length of the run; the result's bar-level
+    arrays (times, equity, leverage) still grow by 24 bytes per bar. Results
+    match `run_backtest` except that prices are forward-filled from the
+    lookback tail rather than the whole history.
+    """
+    cadence = Cadence.from_config(config_dict)
+    if lookback_minutes is None:
+        lookback_minutes = cadence.lookback_minutes if cadence is not None and cadence.lookback else 1440
+    if fields is None and cadence is not None and cadence.lookback:
+        fields = [name for name in cadence.fields if name in store.fields]
+    fields = list(fields or store.meta["fields"])
+    if price_field not in fields:
+        fields.append(price_field)
+    start = to_datetime64(start) if start is not None else np.datetime64(store.times[0], "ns")
+    end = to_datetime64(end) if end is not None else np.datetime64(store.times[-1], "ns")
+    step = np.timedelta64(int(config_dict.get("rebalancing_config", {}).get("rebalancing_interval_hours", 1) * 3600), "s")
+    step = step.astype("timedelta64[ns]")
+    one = np.timedelta64(1, "ns")
+
+    first = int(np.searchsorted(store.times, start, side="left"))
+    last = int(np.searchsorted(store.times, end, side="right"))
+    bar_minutes = frequency_to_minutes(store.frequency)
+    lookback = max(int(np.ceil(lookback_minutes / bar_minutes)), 1)
+    asset_index = {asset: i for i, asset in enumerate(store.assets)}
+    num_assets = len(store.assets)
+
+    head = max(first - lookback, 0)
+    tail_times = store.read_times(head, first)
+    tail = {name: store.read(name, head, first) for name in fields}
+    carry = ffill(tail[price_field].astype(np.float64))[-1:] if first > head else None
+
+    ledger = _Ledger(num_assets, capital, leverage, fee_rate)
+    times_parts, equity_parts, gross_parts, schedule_parts = [], [], [], []
+
+    chunks: queue.Queue = queue.Queue(maxsize=max(prefetch, 1))
+    stopped = threading.Event()
+    reader = threading.Thread(target=_read_ahead, args=(store, fields, first, last, chunk_bars, chunks, stopped),
+                              daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            row, times, blocks = item
+            size = len(blocks[price_field])
+            chunk_times = times[:size]
+            upper = times[size] if len(times) > size else end + one
+
+            # Rebalance boundaries falling in [first bar of this chunk, first bar of the next).
+            k0 = -(-(chunk_times[0] - start) // step)
+            boundaries = np.arange(start + k0 * step, min(upper, end + one), step).astype("datetime64[ns]")
+            schedule = np.unique(np.searchsorted(chunk_times, boundaries, side="right") - 1)
+
+            context = PanelDataContext(np.concatenate([tail_times, chunk_times]), store.assets,
+                                       {name: np.concatenate([tail[name], blocks[name]]) for name in fields},
+                                       frequency=store.frequency)
+            offset = len(tail_times)
+
+            def target_at(bar: int) -> Optional[np.ndarray]:
+                if cadence is not None and not cadence.due(context.times[offset + bar]):
+                    return None
+                context.cursor = offset + bar
+                target = strategy(context, config_dict)
+                return weights_to_vector(target, asset_index, num_assets) if target else None
+
+            prices = blocks[price_field].astype(np.float64)
+            if carry is not None:
+                prices = ffill(np.vstack([carry, prices]))[1:]
+            else:
+                prices = ffill(prices)
+            carry = prices[-1:]
+            equity, gross = ledger.run(np.nan_to_num(prices), schedule, target_at)
+
+            times_parts.append(chunk_times)
+            equity_parts.append(equity)
+            gross_parts.append(gross)
+            schedule_parts.append(schedule + (row - first))
+            keep = max(len(context.times) - lookback, 0)
+            tail_times = context.times[keep:]
+            tail = {name: context.fields[name][keep:].copy() for name in fields}
+            del context, blocks, prices
+    finally:
+        stopped.set()
+        reader.join()
+
+    def joined(parts: list, dtype) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    return ledger.result(joined(times_parts, "datetime64[ns]"), store.assets, joined(schedule_parts, np.intp),
+                         joined(equity_parts, np.float64), joined(gross_parts, np.float64), bar_minutes, config_dict)
+
+
+class _Ledger:
+    """Book carried from one block of bars to the next by `_simulate` and `run_streaming_backtest`."""
+
+    def __init__(self, num_assets: int, capital: float, leverage: float, fee_rate: float):
+        self.leverage, self.fee_rate = leverage, fee_rate
+        self.units = np.zeros(num_assets)
+        self.weights = np.zeros(num_assets)
+        self.reference = np.zeros(num_assets)   # prices at the last rebalance
+        self.equity = float(capital)            # equity right after the last rebalance
+        self.weight_book, self.position_book, self.turnover, self.fees = [], [], [], []
+
+    def run(self, prices: np.ndarray, schedule: np.ndarray, target_at: Callable, offset: int = 0) -> tuple:
+        """
+        Mark and trade one block of forward-filled, NaN-zeroed `prices`, rebalancing at
+        block rows `schedule` (`target_at` gets `offset + row`). Returns (equity, gross).
+        """
+        num_bars, num_assets = prices.shape
+        equity = np.empty(num_bars)
+        gross = np.empty(num_bars)
+        segment_start = 0
+
+        for bar in np.r_[schedule, num_bars].astype(np.intp):
+            # Mark the held book for every bar up to (and including) this rebalance bar.
+            stop = min(bar + 1, num_bars)
+            segment = prices[segment_start:stop]
+            equity[segment_start:stop] = self.equity + (segment - self.reference) @ self.units
+            gross[segment_start:stop] = np.abs(segment * self.units).sum(axis=1)
+            if bar == num_bars:
+                break
+
+            target = target_at(offset + bar)
+            price = prices[bar]
+            current_equity = equity[bar]
+            turnover = fee = 0.0
+
+            if target is not None:
+                self.weights = target
+                tradable = price > 0
+                new_units = np.zeros(num_assets)
+                new_units[tradable] = target[tradable] * current_equity * self.leverage / price[tradable]
+                traded = np.abs(new_units - self.units) @ price
+                fee = traded * self.fee_rate
+                current_equity -= fee
+                self.units = new_units
+                turnover = traded / current_equity if current_equity else 0.0
+
+            equity[bar] = current_equity
+            gross[bar] = np.abs(self.units * price).sum()
+            self.weight_book.append(self.weights)
+            self.position_book.append(self.units)
+            self.turnover.append(turnover)
+            self.fees.append(fee)
+            self.reference, self.equity = price, current_equity
+            segment_start = bar
+
+        return equity, gross
+
+    def result(self, times: np.ndarray, assets: list, schedule: np.ndarray, equity: np.ndarray, gross: np.ndarray,
+               bar_minutes: int, config_dict: dict) -> BacktestResult:
+        num_assets = len(assets)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            leverage_curve = np.where(equity > 0, gross / equity, np.inf)
+        return BacktestResult(
+            times=times,
+            assets=list(assets),
+            equity=equity,
+            leverage=leverage_curve,
+            rebalance_index=schedule,
+            weights=np.array(self.weight_book).reshape(-1, num_assets),
+            positions=np.array(self.position_book).reshape(-1, num_assets),
+            turnover=np.array(self.turnover),
+            fees=np.array(self.fees),
+            bar_minutes=bar_minutes,
+            config=config_dict,
+        )
+
+
+def _simulate(target_at: Callable, config_dict: dict, context: PanelDataContext, start, end,
+              capital: float, leverage: float, fee_rate: float, price_field: str) -> BacktestResult:
+    """Shared event loop: `target_at(bar)` returns a target weight vector, or None to hold."""
+    times = context.times
+    start = to_datetime64(start) if start is not None else times[0]
+    end = to_datetime64(end) if end is not None else times[-1]
+    interval_hours = config_dict.get("rebalancing_config", {}).get("rebalancing_interval_hours", 1)
+
+    first = int(np.searchsorted(times, start, side="left"))
+    last = int(np.searchsorted(times, end, side="right"))
+    prices = np.nan_to_num(context.prices(price_field)[first:last])
+
+    schedule = rebalance_schedule(times, start, end, interval_hours) - first
+    schedule = schedule[(schedule >= 0) & (schedule < len(prices))]
+
+    ledger = _Ledger(prices.shape[1], capital, leverage, fee_rate)
+    equity, gross = ledger.run(prices, schedule, target_at, offset=first)
+    return ledger.result(times[first:last], context.assets, schedule, equity, gross, context.bar_minutes, config_dict)
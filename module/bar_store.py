@@ -0,0 +1,192 @@
+# python -m module.bar_store --csv {CSV_PATH} --store {STORE_DIR} [--field close]
+
+import argparse
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from module.data_context import PanelDataContext
+
+META_FILE = "meta.json"
+TIMES_FILE = "times.i8"
+
+
+class BarStore:
+    """
+    On-disk, time-aligned bar store.
+
+    Layout of a store directory:
+        meta.json       assets, fields, frequency, dtype and row count
+        times.i8        int64 nanosecond timestamps, one per row
+        <field>.bin     (row x asset) array in C order, one file per field
+
+    Every file is opened with `np.memmap`, so slicing a window only touches the
+    pages it covers.
+    """
+
+    def __init__(self, path: str, mode: str = "r"):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.assets: List[str] = self.meta["assets"]
+        self.frequency: str = self.meta["frequency"]
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.length: int = self.meta["length"]
+
+        shape = (self.length, len(self.assets))
+        self.times = np.memmap(os.path.join(path, TIMES_FILE), dtype=np.int64, mode=mode, shape=(self.length,)).view("datetime64[ns]")
+        self.fields: Dict[str, np.ndarray] = {
+            name: np.memmap(self._field_path(name), dtype=self.dtype, mode=mode, shape=shape)
+            for name in self.meta["fields"]
+        }
+
+    def _field_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    @classmethod
+    def create(cls, path: str, times, assets: List[str], fields: Dict[str, np.ndarray],
+               frequency: str = "1m", dtype: str = "float64") -> "BarStore":
+        """Write a new store from in-memory (row x asset) arrays and open it read-only."""
+        return cls.create_chunked(path, assets, [(times, fields)], frequency=frequency, dtype=dtype)
+
+    @classmethod
+    def create_chunked(cls, path: str, assets: List[str], chunks: Iterable[tuple],
+                       frequency: str = "1m", dtype: str = "float64") -> "BarStore":
+        """
+        Write a new store from an iterable of (times, {field: array}) row blocks, so
+        only one block has to be in memory at a time. Opens the result read-only.
+        """
+        os.makedirs(path, exist_ok=True)
+        names, length, last = None, 0, None
+        files = {}
+        try:
+            times_file = open(os.path.join(path, TIMES_FILE), "wb")
+            files[TIMES_FILE] = times_file
+            for times, fields in chunks:
+                times = np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+                check = times if last is None else np.concatenate([[last], times])
+                if len(check) > 1 and not (np.diff(check) > 0).all():
+                    raise ValueError("Bar times must be strictly increasing.")
+                if names is None:
+                    names = list(fields)
+                    for name in names:
+                        files[name] = open(os.path.join(path, f"{name}.bin"), "wb")
+
+                times.tofile(times_file)
+                for name in names:
+                    values = np.ascontiguousarray(fields[name], dtype=dtype)
+                    if values.shape != (len(times), len(assets)):
+                        raise ValueError(f"Field '{name}' has shape {values.shape}, expected {(len(times), len(assets))}")
+                    values.tofile(files[name])
+                length += len(times)
+                if len(times):
+                    last = times[-1]
+        finally:
+            for f in files.values():
+                f.close()
+
+        meta = {
+            "assets": list(assets),
+            "fields": names or [],
+            "frequency": frequency,
+            "dtype": np.dtype(dtype).name,
+            "length": int(length),
+        }
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return cls(path)
+
+    def context(self) -> PanelDataContext:
+        """DataContext serving `get_history` straight from the mapped arrays."""
+        return PanelDataContext(self.times, self.assets, self.fields, frequency=self.frequency)
+
+    def window(self, field: str, start: int, stop: int) -> np.ndarray:
+        """Zero-copy (row x asset) view of rows [start, stop) for `field`."""
+        return self.fields[field][start:stop]
+
+    def read(self, field: str, start: int, stop: int) -> np.ndarray:
+        """
+        Private copy of rows [start, stop) for `field`, read with plain file I/O.
+        Unlike slicing the memmap, no pages stay mapped into the process, so
+        walking a long store chunk by chunk keeps the resident set flat.
+        """
+        width = len(self.assets)
+        stop = min(stop, self.length)
+        with open(self._field_path(field), "rb") as f:
+            values = np.fromfile(f, dtype=self.dtype, count=max(stop - start, 0) * width,
+                                 offset=start * width * self.dtype.itemsize)
+        return values.reshape(-1, width)
+
+    def read_times(self, start: int, stop: int) -> np.ndarray:
+        """Copy of bar times [start, stop), read like `read`."""
+        stop = min(stop, self.length)
+        with open(os.path.join(self.path, TIMES_FILE), "rb") as f:
+            values = np.fromfile(f, dtype=np.int64, count=max(stop - start, 0), offset=start * 8)
+        return values.view("datetime64[ns]")
+
+
+def frame_to_arrays(frame: pd.DataFrame, field: Optional[str] = None) -> tuple:
+    """
+    Convert a bar frame to (times, assets, {field: array}).
+
+    Accepts the wide single-field layout of `df_sample.csv` (datetime index,
+    one column per asset) when `field` is given, or a long OHLCV frame indexed
+    by (asset, datetime) otherwise.
+    """
+    if field is not None:
+        frame = frame.sort_index()
+        return frame.index.values, list(frame.columns), {field: frame.to_numpy(dtype=np.float64)}
+
+    frame = frame.sort_index()
+    times = frame.index.get_level_values("datetime").unique().sort_values()
+    assets = list(frame.index.get_level_values("asset").unique())
+    fields = {}
+    for name in frame.columns:
+        wide = frame[name].unstack(level=0).reindex(index=times, columns=assets)
+        fields[name] = wide.to_numpy(dtype=np.float64)
+    return times.values, assets, fields
+
+
+def read_bar_csv(csv_path: str, field: str = "close") -> tuple:
+    """
+    Read a bar CSV in one pass.
+
+    Long OHLCV files need `asset` (or `symbol`) and `datetime` (or `timestamp`)
+    columns; any other layout is treated as wide with `field` values per asset.
+    """
+    frame = pd.read_csv(csv_path)
+    asset_col = next((c for c in ("asset", "symbol") if c in frame.columns), None)
+    time_col = next((c for c in ("datetime", "timestamp") if c in frame.columns), frame.columns[0])
+
+    if time_col == "timestamp" and np.issubdtype(frame[time_col].dtype, np.number):
+        frame[time_col] = pd.to_datetime(frame[time_col], unit="ms")
+    else:
+        frame[time_col] = pd.to_datetime(frame[time_col])
+
+    if asset_col is None:
+        return frame_to_arrays(frame.set_index(time_col), field=field)
+    frame = frame.rename(columns={asset_col: "asset", time_col: "datetime"}).set_index(["asset", "datetime"])
+    return frame_to_arrays(frame.select_dtypes("number"))
+
+
+def convert_csv(csv_path: str, store_path: str, field: str = "close", frequency: str = "1m",
+                dtype: str = "float64") -> BarStore:
+    """One-shot conversion of a CSV (wide close or long OHLCV) into a `BarStore`."""
+    times, assets, fields = read_bar_csv(csv_path, field=field)
+    return BarStore.create(store_path, times, assets, fields, frequency=frequency, dtype=dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a bar CSV into a memory-mapped bar store")
+    parser.add_argument("--csv", required=True, help="Wide (datetime + one column per asset) or long OHLCV CSV")
+    parser.add_argument("--store", required=True, help="Output store directory")
+    parser.add_argument("--field", default="close", help="Field name for wide CSVs")
+    parser.add_argument("--frequency", default="1m", help="Bar frequency")
+    parser.add_argument("--dtype", default="float64", help="Storage dtype (float64/float32)")
+    args = parser.parse_args()
+
+    store = convert_csv(args.csv, args.store, field=args.field, frequency=args.frequency, dtype=args.dtype)
+    print(f"📦 {store.length} bars x {len(store.assets)} assets -> {args.store} ({', '.join(store.fields)})")
@@ -0,0 +1,216 @@
+# python -m module.benchmark --strategies anomarly_vol multi_period_momentum --assets 10 67 --bars 360 1440 --out {RESULTS_JSON}
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from module import synthetic
+from module.backtest import load_strategy
+from module.cadence import Cadence
+from module.data_context import PanelDataContext, frequency_to_minutes
+
+STRATEGIES = ["anomarly_vol", "momentum_with_vol", "multi_period_momentum"]
+# old_version strategies take a wide close frame: strategy(df, config_dict).
+# old_version/futures/reversion is left out because it downloads its own data.
+LEGACY_STRATEGIES = ["simple_momentum", "simple_reversion", "simple_volatility"]
+ASSET_COUNTS = [10, 67, 500, 2000]
+BAR_COUNTS = [360, 1440, 10080, 100_000]
+
+BAR_BUDGET_SEC = 60.0
+
+
+# --- Synthetic data ---
+def synthetic_context(num_assets: int, bars: int, seed: int = 0, end: str = "2025-09-01 00:00",
+                      frequency: str = "1m") -> PanelDataContext:
+    """Deterministic OHLCV panel at `frequency` (see `module.synthetic`) whose last bar is `end` (a Monday)."""
+    start = pd.Timestamp(end) - pd.Timedelta(minutes=(bars - 1) * frequency_to_minutes(frequency))
+    return synthetic.synthetic_context(num_assets, bars, frequency=frequency, start=str(start), seed=seed)
+
+
+# --- Strategy loading ---
+def load_legacy_strategy(strategy_name: str) -> tuple:
+    """Import `old_version/futures/<name>/<name>.py` and its config, returning (strategy, config_dict)."""
+    strategy_module = importlib.import_module(f"old_version.futures.{strategy_name}.{strategy_name}")
+    config_module = importlib.import_module(f"old_version.futures.{strategy_name}.{strategy_name}_config")
+    if hasattr(config_module, "strategy_config_params"):
+        return strategy_module.strategy, dict(config_module.strategy_config_params)
+    return strategy_module.strategy, {"strategy_config": getattr(config_module, "strategy_config", {})}
+
+
+def strategy_cadence(strategy_name: str) -> Optional[Cadence]:
+    """The `schedule_config` declaration of a strategy under futures/ (None for legacy ones)."""
+    if strategy_name in LEGACY_STRATEGIES:
+        return None
+    return Cadence.from_config(load_strategy(strategy_name)[1])
+
+
+def strategy_call(strategy_name: str, context: PanelDataContext) -> Callable[[], dict]:
+    """
+    Zero-argument callable running one `strategy()` evaluation on the whole
+    `context` universe. Shared features are dropped before every call, so
+    repeated runs time the computation rather than the per-bar feature memo.
+    """
+    if strategy_name in LEGACY_STRATEGIES:
+        strategy, config_dict = load_legacy_strategy(strategy_name)
+        df = pd.DataFrame(context.fields["close"], index=pd.DatetimeIndex(context.times, name="datetime"),
+                          columns=context.assets)
+        return lambda: strategy(df, config_dict)
+
+    strategy, config_dict = load_strategy(strategy_name)
+    config_dict = dict(config_dict, strategy_config=dict(config_dict["strategy_config"], assets=list(context.assets)))
+
+    def call() -> dict:
+        context.__dict__.pop("_feature_graph", None)
+        return strategy(context, config_dict)
+
+    return call
+
+
+# --- Measurement ---
+def measure(call: Callable[[], dict], repeat: int = 3) -> dict:
+    """
+    Wall time over `repeat` timed runs, then one traced run (numpy buffers
+    included) for `alloc_peak_mib`, the most memory the call allocated at once
+    on top of what was live before it (temporaries included), and
+    `retained_mib`, what it still holds when it returns.
+    """
+    call()  # warm-up: imports, caches
+    walls = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        weights = call()
+        walls.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_sec": statistics.median(walls),
+        "wall_min_sec": min(walls),
+        "alloc_peak_mib": (peak - before) / 2 ** 20,
+        "retained_mib": (after - before) / 2 ** 20,
+        "weights": len(weights or {}),
+    }
+
+
+def case_key(case: dict) -> str:
+    return f"{case['strategy']}|{case['assets']}|{case['bars']}"
+
+
+def run_suite(strategies: List[str], asset_counts: List[int], bar_counts: List[int], repeat: int = 3,
+              seed: int = 0, max_cells: float = 5e7, verbose: bool = True) -> List[dict]:
+    """
+    Benchmark every strategy on every (assets, bars) panel. `bars` counts bars
+    at the frequency the strategy declares in `schedule_config` (1 minute if
+    none), so daily strategies get `bars` days. Panels above `max_cells` and
+    histories shorter than the declared lookback are recorded as skipped.
+    """
+    cadences = {name: strategy_cadence(name) for name in strategies}
+    frequencies = {name: cadence.frequency if cadence is not None else "1m" for name, cadence in cadences.items()}
+    cases = []
+    for num_assets in asset_counts:
+        for bars in bar_counts:
+            if num_assets * bars > max_cells:
+                cases += [{"strategy": name, "assets": num_assets, "bars": bars, "skipped": "max_cells"} for name in strategies]
+                continue
+            contexts = {}
+            for name in strategies:
+                frequency = frequencies[name]
+                case = {"strategy": name, "assets": num_assets, "bars": bars, "frequency": frequency}
+                cadence = cadences[name]
+                if cadence is not None and bars < cadence.lookback:
+                    cases.append(dict(case, skipped="lookback"))
+                    continue
+                if frequency not in contexts:
+                    contexts[frequency] = synthetic_context(num_assets, bars, seed=seed, frequency=frequency)
+                context = contexts[frequency]
+                try:
+                    case.update(measure(strategy_call(name, context), repeat=repeat))
+                    case["fits_bar_budget"] = case["wall_sec"] < BAR_BUDGET_SEC
+                except Exception as e:
+                    case["error"] = f"{type(e).__name__}: {e}"
+                cases.append(case)
+                if verbose:
+                    detail = (f"{case['wall_sec'] * 1000:9.1f} ms  {case['alloc_peak_mib']:8.1f} MiB peak"
+                              if "wall_sec" in case else case["error"])
+                    print(f"⏱ {name:<24} assets={num_assets:<5} bars={bars:<7} {detail}")
+    return cases
+
+
+def compare(cases: List[dict], baseline: List[dict], tolerance: float = 0.25) -> List[dict]:
+    """Cases whose median wall time or peak memory grew by more than `tolerance` over the baseline."""
+    previous = {case_key(case): case for case in baseline if "wall_sec" in case}
+    regressions = []
+    for case in cases:
+        before = previous.get(case_key(case))
+        if before is None or "wall_sec" not in case:
+            continue
+        for metric in ("wall_sec", "alloc_peak_mib"):
+            if before.get(metric, 0) > 0 and case[metric] > before[metric] * (1 + tolerance):
+                regressions.append({"case": case_key(case), "metric": metric, "baseline": before[metric],
+                                    "current": case[metric], "ratio": case[metric] / before[metric]})
+    return regressions
+
+
+def save_results(path: str, cases: List[dict]) -> None:
+    payload = {
+        "created": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cases": cases,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark strategy() across universe size and history length")
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES + LEGACY_STRATEGIES)
+    parser.add_argument("--assets", nargs="+", type=int, default=ASSET_COUNTS)
+    parser.add_argument("--bars", nargs="+", type=int, default=BAR_COUNTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max_cells", type=float, default=5e7, help="Skip panels with more assets x bars than this")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / memory growth ratio")
+    args = parser.parse_args()
+
+    cases = run_suite(args.strategies, args.assets, args.bars, repeat=args.repeat, seed=args.seed, max_cells=args.max_cells)
+    save_results(args.out, cases)
+    print(f"📝 Results saved to {args.out}")
+
+    regressions: Optional[list] = None
+    if args.baseline:
+        regressions = compare(cases, load_results(args.baseline), tolerance=args.tolerance)
+        for r in regressions:
+            print(f"❌ {r['case']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} (x{r['ratio']:.2f})")
+        if not regressions:
+            print("✅ No regressions against baseline")
+    raise SystemExit(1 if regressions else 0)
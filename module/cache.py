@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from module.data_context import DataContext, frequency_to_minutes
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+@dataclass
+class _Buffer:
+    """Cached bars of one (asset, frequency, field)."""
+    times: np.ndarray     # int64 ns, ascending
+    values: np.ndarray    # float64, aligned with `times`
+    covered_from: int     # earliest bar time (ns) the buffer is complete from
+    fetched_at: int       # context time (ns) of the latest fetch; the bar containing it may have been partial
+    capacity: int         # largest window (in bars) requested for this key
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+
+class CachingDataContext(DataContext):
+    """
+    `DataContext` wrapper that keeps recent bars per (asset, frequency, field).
+
+    Repeated `get_history` calls only ask the wrapped context for the tail since
+    the previous call (the last cached bar is re-fetched, as it may have been
+    partial) and serve the rest of the window from memory. Buffers are trimmed
+    to the largest window ever requested for them and evicted least-recently-used
+    once the total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, inner: DataContext, max_bytes: int = 256 * 1024 * 1024):
+        self.inner = inner
+        self.max_bytes = max_bytes
+        self._buffers: "OrderedDict[Tuple[str, str, str], _Buffer]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "tail_fetches": 0, "misses": 0, "evictions": 0, "bars_fetched": 0}
+
+    @property
+    def current_dt(self) -> datetime:
+        return self.inner.current_dt
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def clear(self) -> None:
+        self._buffers.clear()
+        self._bytes = 0
+
+    def get_history(self, assets: list, window: int, frequency: str = "1m", fields: Union[str, list] = 'close') -> pd.DataFrame:
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        step = frequency_to_minutes(frequency) * NS_PER_MINUTE
+        now_exact = pd.Timestamp(self.current_dt).value
+        now = now_exact // step * step
+        window_start = now - (window - 1) * step
+
+        # Split assets by what is missing: nothing, a tail since the last fetch, or everything.
+        full, tail, tail_bars = [], [], 1
+        for asset in assets:
+            buffers = [self._buffers.get((asset, frequency, name)) for name in field_list]
+            if any(b is None or b.covered_from > window_start for b in buffers):
+                full.append(asset)
+                continue
+            fetched_at = min(b.fetched_at for b in buffers)
+            if fetched_at >= now_exact:
+                self.stats["hits"] += 1
+                continue
+            tail.append(asset)
+            tail_bars = max(tail_bars, int((now - fetched_at // step * step) // step) + 1)
+
+        if full:
+            self.stats["misses"] += len(full)
+            self._fetch(full, window, step, frequency, field_list, now_exact, window_start, window)
+        if tail:
+            self.stats["tail_fetches"] += len(tail)
+            if tail_bars >= window:
+                self._fetch(tail, window, step, frequency, field_list, now_exact, window_start, window)
+            else:
+                self._fetch(tail, tail_bars, step, frequency, field_list, now_exact, now - (tail_bars - 1) * step, window)
+
+        frame = self._serve(assets, frequency, field_list, window_start, now)
+        self._evict()
+        return frame[fields] if isinstance(fields, str) else frame
+
+    def _fetch(self, assets: List[str], bars: int, step: int, frequency: str, field_list: list,
+               now_exact: int, fetch_start: int, window: int) -> None:
+        """Fetch `bars` bars from the wrapped context and merge them into the buffers."""
+        hist = self.inner.get_history(assets=assets, window=bars, frequency=frequency, fields=field_list)
+        self.stats["bars_fetched"] += len(hist)
+        groups = _split_by_asset(hist[field_list] if not hist.empty else hist)
+
+        for asset in assets:
+            times, block = groups.get(asset, (np.empty(0, dtype=np.int64), None))
+            for j, name in enumerate(field_list):
+                values = block[:, j] if block is not None else np.empty(0)
+                self._merge((asset, frequency, name), times, values, step, fetch_start, now_exact, window)
+
+    def _merge(self, key: tuple, times: np.ndarray, values: np.ndarray, step: int,
+               fetch_start: int, now_exact: int, window: int) -> None:
+        buffer = self._buffers.pop(key, None)
+        if buffer is not None:
+            self._bytes -= buffer.nbytes
+
+        if buffer is None or buffer.fetched_at // step * step < fetch_start - step or buffer.covered_from >= fetch_start:
+            # Nothing usable to splice onto: the fetch replaces the buffer.
+            buffer = _Buffer(times, values, fetch_start, now_exact, window)
+        else:
+            # Keep cached bars older than the fetched range, replace the rest.
+            keep = int(np.searchsorted(buffer.times, fetch_start, side="left"))
+            buffer = _Buffer(
+                np.concatenate([buffer.times[:keep], times]),
+                np.concatenate([buffer.values[:keep], values]),
+                buffer.covered_from,
+                now_exact,
+                max(buffer.capacity, window),
+            )
+
+        # Trim to the largest window ever asked for this key.
+        if len(buffer.times) > buffer.capacity:
+            oldest = now_exact // step * step - (buffer.capacity - 1) * step
+            cut = int(np.searchsorted(buffer.times, oldest, side="left"))
+            buffer.times, buffer.values = buffer.times[cut:], buffer.values[cut:]
+            buffer.covered_from = max(buffer.covered_from, oldest)
+
+        self._buffers[key] = buffer
+        self._bytes += buffer.nbytes
+
+    def _serve(self, assets: list, frequency: str, field_list: list, window_start: int, now: int) -> pd.DataFrame:
+        asset_codes, time_parts, columns = [], [], {name: [] for name in field_list}
+        served = []
+        for asset in assets:
+            buffers = [self._buffers.get((asset, frequency, name)) for name in field_list]
+            if any(b is None for b in buffers):
+                continue
+            for key_name in field_list:
+                self._buffers.move_to_end((asset, frequency, key_name))
+            times, values = _align(buffers, window_start, now)
+            if len(times) == 0:
+                continue
+            asset_codes.append(np.full(len(times), len(served), dtype=np.intp))
+            served.append(asset)
+            time_parts.append(times)
+            for name, column in zip(field_list, values):
+                columns[name].append(column)
+
+        if not served:
+            index = pd.MultiIndex.from_arrays([[], []], names=["asset", "datetime"])
+            return pd.DataFrame(columns=field_list, index=index)
+
+        times = np.concatenate(time_parts).view("datetime64[ns]")
+        asset_level = np.asarray(served, dtype=object)[np.concatenate(asset_codes)]
+        index = pd.MultiIndex.from_arrays([asset_level, times], names=["asset", "datetime"])
+        return pd.DataFrame({name: np.concatenate(parts) for name, parts in columns.items()}, index=index)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._buffers:
+            _, buffer = self._buffers.popitem(last=False)
+            self._bytes -= buffer.nbytes
+            self.stats["evictions"] += 1
+
+
+def _align(buffers: List[_Buffer], window_start: int, now: int) -> tuple:
+    """Slice each field's buffer to [window_start, now] and align them on a common time axis."""
+    slices = []
+    for buffer in buffers:
+        lo = int(np.searchsorted(buffer.times, window_start, side="left"))
+        hi = int(np.searchsorted(buffer.times, now, side="right"))
+        slices.append((buffer.times[lo:hi], buffer.values[lo:hi]))
+
+    times = slices[0][0]
+    if all(len(t) == len(times) and np.array_equal(t, times) for t, _ in slices[1:]):
+        return times, [v for _, v in slices]
+
+    # Fields were cached from different requests; rows missing for one field become NaN.
+    times = slices[0][0]
+    for t, _ in slices[1:]:
+        times = np.union1d(times, t)
+    values = []
+    for t, v in slices:
+        column = np.full(len(times), np.nan)
+        column[np.searchsorted(times, t)] = v
+        values.append(column)
+    return times, values
+
+
+def _split_by_asset(hist: pd.DataFrame) -> Dict[str, tuple]:
+    """{asset: (int64 ns times, (bars x field) values)} from a long (asset, datetime) frame."""
+    if hist.empty:
+        return {}
+    codes = hist.index.codes[0]
+    levels = hist.index.levels[0]
+    times = hist.index.get_level_values(1).values.astype("datetime64[ns]").astype(np.int64)
+    values = hist.to_numpy(dtype=np.float64)
+
+    order = np.argsort(codes, kind="stable")
+    codes, times, values = codes[order], times[order], values[order]
+    bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+    groups = {}
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        asset_times = times[lo:hi]
+        sort = np.argsort(asset_times, kind="stable")
+        groups[levels[codes[lo]]] = (asset_times[sort], values[lo:hi][sort])
+    return groups
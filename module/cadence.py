@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from module.data_context import frequency_to_minutes
+
+NS_PER_HOUR = 3600 * 1_000_000_000
+
+
+@dataclass(frozen=True)
+class Cadence:
+    """
+    When a strategy can act and which data it reads, from the `schedule_config`
+    dict next to `strategy_config` in `<name>_config.py`:
+
+        schedule_config = {
+            "weekdays": [0],              # run only on these days (0 = Monday)
+            "hours": [0],                 # ... and in these hours of the day
+            "every_hours": 4,             # ... and in hours that are multiples of this
+            "frequency": "1d",            # bars the strategy reads
+            "lookback": ["vol_z_period", 5],  # bars at `frequency` it needs
+            "fields": ["close", "volume"],
+        }
+
+    `lookback` is a number of bars, or a list of numbers and `strategy_config`
+    keys that are added up (a key holding a list counts its largest entry),
+    so the window follows the parameters when a sweep changes them.
+    `completed_bars` promises that the output depends only on closed bars at
+    `frequency` (not on the forming one), which lets `StrategyMemo` reuse it
+    until the next close.
+
+    Every key is optional. Day and hour are those of the bar being evaluated
+    (UTC, like the bar times). Calls that are not `due` are known to return {}
+    (hold), so runners skip them without touching the context. `lookback`,
+    `frequency` and `fields` let a runner fetch the strategy's window ahead of
+    the call.
+    """
+    weekdays: Optional[Tuple[int, ...]] = None
+    hours: Optional[Tuple[int, ...]] = None
+    every_hours: Optional[int] = None
+    frequency: str = "1m"
+    lookback: int = 0
+    fields: Tuple[str, ...] = ("close",)
+    completed_bars: bool = False
+
+    @classmethod
+    def from_config(cls, config_dict: dict) -> Optional["Cadence"]:
+        """The cadence declared in `config_dict["schedule_config"]`, or None."""
+        schedule = config_dict.get("schedule_config")
+        if not schedule:
+            return None
+        unknown = set(schedule) - {"weekdays", "hours", "every_hours", "frequency", "lookback", "fields",
+                                   "completed_bars"}
+        if unknown:
+            raise ValueError(f"Unknown schedule_config keys: {sorted(unknown)}")
+
+        def days_or_hours(key: str) -> Optional[Tuple[int, ...]]:
+            values = schedule.get(key)
+            return None if values is None else tuple(int(v) for v in np.atleast_1d(values))
+
+        fields = schedule.get("fields", ["close"])
+        cadence = cls(
+            weekdays=days_or_hours("weekdays"),
+            hours=days_or_hours("hours"),
+            every_hours=int(schedule["every_hours"]) if schedule.get("every_hours") else None,
+            frequency=schedule.get("frequency", "1m"),
+            lookback=_lookback(schedule.get("lookback", 0), config_dict.get("strategy_config") or {}),
+            fields=(fields,) if isinstance(fields, str) else tuple(fields),
+            completed_bars=bool(schedule.get("completed_bars", False)),
+        )
+        frequency_to_minutes(cadence.frequency)   # reject unsupported frequencies up front
+        return cadence
+
+    @property
+    def gated(self) -> bool:
+        return self.weekdays is not None or self.hours is not None or self.every_hours is not None
+
+    @property
+    def lookback_minutes(self) -> int:
+        """Minutes of base bars covering `lookback` bars at `frequency` (plus the partial one)."""
+        return (self.lookback + 1) * frequency_to_minutes(self.frequency) if self.lookback else 0
+
+    def due_mask(self, times: np.ndarray) -> np.ndarray:
+        """Boolean mask of the bar `times` at which the strategy has to run."""
+        ns = np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+        mask = np.ones(len(ns), dtype=bool)
+        hours = ns // NS_PER_HOUR
+        if self.weekdays is not None:
+            # Day 0 of the epoch (1970-01-01) was a Thursday.
+            mask &= np.isin((hours // 24 + 3) % 7, self.weekdays)
+        if self.hours is not None:
+            mask &= np.isin(hours % 24, self.hours)
+        if self.every_hours is not None:
+            mask &= hours % self.every_hours == 0
+        return mask
+
+    def due(self, when: Union[datetime, np.datetime64]) -> bool:
+        if not self.gated:
+            return True
+        return bool(self.due_mask(np.array([np.datetime64(when, "ns")]))[0])
+
+    def request(self, config_dict: dict) -> Optional[Tuple[List[str], int, str, List[str]]]:
+        """(assets, window, frequency, fields) to prefetch, or None when no lookback is declared."""
+        assets = (config_dict.get("strategy_config") or {}).get("assets", [])
+        if not self.lookback or not assets:
+            return None
+        return list(assets), self.lookback, self.frequency, list(self.fields)
+
+
+def _lookback(spec, strategy_config: dict) -> int:
+    """Bars of a `lookback` declaration: an int, or ints and `strategy_config` keys to add up."""
+    total = 0
+    for term in [spec] if isinstance(spec, (str, int, np.integer)) else spec:
+        if isinstance(term, str):
+            if term not in strategy_config:
+                raise ValueError(f"schedule_config lookback names {term!r}, which strategy_config does not set")
+            term = strategy_config[term]
+        total += int(np.max(term))
+    return total
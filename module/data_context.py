@@ -0,0 +1,261 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from module.features import FeatureGraph
+from module.resample import AGGREGATION, BarPyramid
+
+_FREQ_PATTERN = re.compile(r"^\s*(\d*)\s*(m|min|t|h|hour|d|day|w|week)\s*$", re.IGNORECASE)
+_FREQ_MINUTES = {"m": 1, "min": 1, "t": 1, "h": 60, "hour": 60, "d": 1440, "day": 1440, "w": 10080, "week": 10080}
+
+
+def frequency_to_minutes(frequency: str) -> int:
+    """Convert a frequency string such as "1m", "1min", "4h" or "1d" to minutes."""
+    match = _FREQ_PATTERN.match(str(frequency))
+    if not match:
+        raise ValueError(f"Unsupported frequency: {frequency!r}")
+    count = int(match.group(1) or 1)
+    return count * _FREQ_MINUTES[match.group(2).lower()]
+
+
+class DataContext(ABC):
+    """Interface the platform hands to every `strategy(context, config_dict)` call."""
+
+    @property
+    @abstractmethod
+    def current_dt(self) -> datetime: pass
+
+    @abstractmethod
+    def get_history(self, assets: list, window: int, frequency: str, fields: Union[str, list] = 'close') -> pd.DataFrame: pass
+
+    def get_panel(self, assets: list, window: int, frequency: str, fields: Union[str, list] = 'close',
+                  dtype=None) -> "Panel":
+        """
+        Same window as `get_history`, as a (time x asset x field) panel with `assets`' order.
+
+        Generic fallback built from the long frame; array-backed contexts override it.
+        """
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        hist = self.get_history(assets=assets, window=window, frequency=frequency, fields=field_list)
+        if hist.empty:
+            return Panel.empty(field_list, dtype=dtype)
+        known = [asset for asset in assets if asset in hist.index.get_level_values(0)]
+        blocks = {}
+        for name in field_list:
+            wide = hist[name].unstack(level=0).reindex(columns=known)
+            blocks[name] = wide.to_numpy(dtype=dtype or np.float64)
+        return Panel(wide.index.values, known, blocks)
+
+    @property
+    def features(self) -> FeatureGraph:
+        """Per-bar memo of shared features for this context (see `module.features`)."""
+        graph = self.__dict__.get("_feature_graph")
+        if graph is None:
+            # setdefault keeps one graph when sleeve threads get here at the same time.
+            graph = self.__dict__.setdefault("_feature_graph", FeatureGraph(self))
+        return graph
+
+    def feature(self, spec, assets: list, window: int = 1, frequency: str = "1m") -> pd.DataFrame:
+        """
+        Last `window` rows of a declared feature such as "rolling_std(20)" or
+        "momentum(60)" for `assets`, as a datetime x asset frame. Computed once
+        per bar and shared by every strategy evaluated on this context.
+        """
+        return self.features.get(spec, assets, window, frequency)
+
+    def universe(self, top_n: int) -> Optional[List[str]]:
+        """
+        The `top_n` most liquid symbols by recent daily turnover, from the
+        `module.universe.Universe` attached to this context; None without one.
+        """
+        universe = self.__dict__.get("_universe")
+        return universe.top(self, top_n) if universe is not None else None
+
+
+class Panel:
+    """
+    Time x asset x field window returned by `DataContext.get_panel`.
+
+    Each field is held as its own (time x asset) block, so single-field access
+    and `frame()` are views of the context's buffers; `values` stacks the
+    blocks into one (time x asset x field) array on first use.
+    """
+
+    def __init__(self, times: np.ndarray, assets: List[str], blocks: Dict[str, np.ndarray]):
+        self.times = times
+        self.assets = list(assets)
+        self.blocks = blocks
+        self.fields = list(blocks)
+        self._values = None
+
+    @classmethod
+    def empty(cls, fields: list, dtype=None) -> "Panel":
+        return cls(np.empty(0, dtype="datetime64[ns]"), [], {name: np.empty((0, 0), dtype=dtype or np.float64) for name in fields})
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def empty_window(self) -> bool:
+        return len(self.times) == 0 or len(self.assets) == 0
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.blocks[field]
+
+    @property
+    def values(self) -> np.ndarray:
+        if self._values is None:
+            if len(self.fields) == 1:
+                self._values = self.blocks[self.fields[0]][:, :, None]
+            else:
+                self._values = np.stack([self.blocks[name] for name in self.fields], axis=2)
+        return self._values
+
+    def frame(self, field: str = "close") -> pd.DataFrame:
+        """Wide (datetime x asset) frame viewing the field's block, like `hist[field].unstack(level=0)`."""
+        index = pd.DatetimeIndex(self.times, name="datetime")
+        columns = pd.Index(self.assets, name="asset")
+        return pd.DataFrame(self.blocks[field], index=index, columns=columns, copy=False)
+
+    def to_long(self) -> pd.DataFrame:
+        """Long (asset, datetime) frame in the `get_history` layout; all-NaN bars are dropped."""
+        if self.empty_window:
+            return pd.DataFrame(columns=self.fields, index=pd.MultiIndex.from_arrays([[], []], names=["asset", "datetime"]))
+
+        # Long format is asset-major: each asset's window is contiguous.
+        data = {name: block.T.ravel() for name, block in self.blocks.items()}
+        index = pd.MultiIndex.from_product([self.assets, pd.DatetimeIndex(self.times)], names=["asset", "datetime"])
+        frame = pd.DataFrame(data, index=index)
+
+        # Drop bars where the asset had no data at all (not yet listed, delisted, gaps).
+        valid = np.zeros(len(frame), dtype=bool)
+        for column in data.values():
+            valid |= ~np.isnan(column)
+        if not valid.all():
+            frame = frame[valid]
+        return frame
+
+
+class PanelDataContext(DataContext):
+    """
+    In-memory DataContext over time-aligned bars.
+
+    Each field is stored as one (time x asset) array sharing a single time axis.
+    `cursor` marks the bar the strategy is evaluated at; `get_history` never
+    returns bars after it, so a backtester only has to move the cursor.
+    """
+
+    def __init__(self, times, assets: List[str], fields: Dict[str, np.ndarray], frequency: str = "1m"):
+        self.times = np.asarray(times, dtype="datetime64[ns]")
+        self.assets = list(assets)
+        self.fields = dict(fields)
+        self.frequency = frequency
+        self.bar_minutes = frequency_to_minutes(frequency)
+        self._asset_index = {asset: i for i, asset in enumerate(self.assets)}
+        self.cursor = len(self.times) - 1
+        self._pyramid: Optional[BarPyramid] = None
+
+        for name, values in self.fields.items():
+            if values.shape != (len(self.times), len(self.assets)):
+                raise ValueError(
+                    f"Field '{name}' has shape {values.shape}, expected {(len(self.times), len(self.assets))}"
+                )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, frequency: str = "1m") -> "PanelDataContext":
+        """Build a context from a long-format frame indexed by (asset, datetime)."""
+        fields = {}
+        times = assets = None
+        for name in frame.columns:
+            wide = frame[name].unstack(level=0)
+            if times is None:
+                times, assets = wide.index.values, list(wide.columns)
+            fields[name] = wide.reindex(index=times, columns=assets).to_numpy(dtype=np.float64)
+        return cls(times, assets, fields, frequency=frequency)
+
+    @property
+    def current_dt(self) -> datetime:
+        return pd.Timestamp(self.times[self.cursor]).to_pydatetime()
+
+    def asset_columns(self, assets: list) -> tuple:
+        """Return (known assets, column selector) preserving the requested order."""
+        known = [asset for asset in assets if asset in self._asset_index]
+        columns = np.fromiter((self._asset_index[a] for a in known), dtype=np.intp, count=len(known))
+        # A contiguous run of columns becomes a basic slice, so windows are views, not copies.
+        if len(columns) and columns[-1] - columns[0] == len(columns) - 1 and (np.diff(columns) == 1).all():
+            return known, slice(int(columns[0]), int(columns[-1]) + 1)
+        return known, columns
+
+    def get_history(self, assets: list, window: int, frequency: str = "1m", fields: Union[str, list] = 'close') -> pd.DataFrame:
+        frame = self.get_panel(assets, window, frequency, fields).to_long()
+        return frame[fields] if isinstance(fields, str) else frame
+
+    def get_panel(self, assets: list, window: int, frequency: str = "1m", fields: Union[str, list] = 'close',
+                  dtype=None) -> Panel:
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        known, columns = self.asset_columns(assets)
+        times, blocks = self._window(columns, window, frequency, field_list)
+        if dtype is not None:
+            blocks = [block.astype(dtype, copy=False) for block in blocks]
+        return Panel(times, known, dict(zip(field_list, blocks)))
+
+    def _window(self, columns, window: int, frequency: str, field_list: list) -> tuple:
+        """Return (times, [time x asset block per field]) for the last `window` bars at `frequency`."""
+        end = self.cursor + 1
+        minutes = frequency_to_minutes(frequency)
+        if minutes % self.bar_minutes:
+            raise ValueError(f"Frequency {frequency!r} is not a multiple of this context's "
+                             f"{self.bar_minutes}-minute bars")
+        step = minutes // self.bar_minutes
+        if step <= 1:
+            start = max(0, end - window)
+            return self.times[start:end], [self.fields[name][start:end, columns] for name in field_list]
+        return self.pyramid.window(step * self.bar_minutes, self.cursor, window, field_list, columns)
+
+    @property
+    def pyramid(self) -> BarPyramid:
+        """Coarser-frequency aggregates of every field, built on first use."""
+        if self._pyramid is None:
+            self._pyramid = BarPyramid(self.times, self.fields)
+        return self._pyramid
+
+    def extend(self, times, fields: Dict[str, np.ndarray]) -> None:
+        """
+        Append newly arrived bars (every field, strictly after the last bar) and
+        fold them into the coarser aggregates. A cursor on the last bar follows it.
+        """
+        follow = self.cursor == len(self.times) - 1
+        pyramid = self.pyramid
+        pyramid.extend(times, fields)
+        self.times = pyramid.times
+        self.fields = {name: pyramid.base(name) for name in self.fields}
+        if follow:
+            self.cursor = len(self.times) - 1
+
+    def prices(self, field: str = "close", fill: bool = True) -> np.ndarray:
+        """Return the full (time x asset) array for `field`, forward-filled if requested."""
+        values = self.fields[field]
+        if not fill:
+            return values
+        return ffill(values)
+
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down the time axis of a (time x asset) array."""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    index = np.where(mask, 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(index, axis=0, out=index)
+    return np.take_along_axis(values, index, axis=0)
+
+
+def to_datetime64(value: Optional[Union[str, datetime, np.datetime64]]) -> Optional[np.datetime64]:
+    """Normalise user-supplied timestamps ("2025-09-01 09:00", datetime, ...) to datetime64[ns]."""
+    if value is None:
+        return None
+    return pd.Timestamp(value).to_datetime64().astype("datetime64[ns]")
@@ -0,0 +1,356 @@
+# python -m module.downloader --symbols BTCUSDT,ETHUSDT --days 60 --granularity 1m --store {STORE_DIR}
+# python -m module.downloader --check
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from module.bar_store import BarStore, frame_to_arrays
+from module.data_context import frequency_to_minutes
+from module.futures.client import run
+
+BITGET_URL = "https://api.bitget.com"
+HISTORY_CANDLES = "/api/v2/mix/market/history-candles"
+PAGE_LIMIT = 200  # Bitget maximum candles per request
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "base_volume", "volume"]
+
+
+class TokenBucket:
+    """Async token bucket: at most `rate` acquisitions per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryableError(Exception):
+    """Rate limiting or a transient server/network failure; the page is retried with backoff."""
+
+
+class IncompleteDownload(Exception):
+    """
+    Pages that still failed after the last retry. `failed` lists them as
+    (symbol, start, end, reason) with bar times in [start, end); `frame` holds
+    the candles that did arrive.
+    """
+
+    def __init__(self, failed: List[tuple], frame: pd.DataFrame):
+        super().__init__(f"{len(failed)} page(s) failed, first: {failed[0][0]} {failed[0][1]} - {failed[0][2]} "
+                         f"({failed[0][3]})")
+        self.failed = failed
+        self.frame = frame
+
+
+class OHLCVDownloader:
+    """
+    Concurrent Bitget candle fetcher.
+
+    The requested range is split into fixed 200-candle pages up front (each page
+    carries its own startTime/endTime), so every page of every symbol can be in
+    flight at once. Requests pass through a token bucket, run on a pooled
+    `requests.Session` in a worker-thread pool, and are retried with exponential
+    backoff. Candles are de-duplicated per symbol by timestamp. If any page
+    still fails after its retries, `fetch` raises `IncompleteDownload` rather
+    than return a frame with holes.
+    """
+
+    def __init__(self, base_url: str = BITGET_URL, product_type: str = "usdt-futures", rate: float = 10,
+                 max_concurrency: int = 16, retries: int = 5, backoff: float = 0.5, timeout: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.product_type = product_type
+        self.bucket = TokenBucket(rate)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.stats = {"requests": 0, "retries": 0, "failed_pages": 0}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _get(self, params: dict) -> list:
+        response = self.session.get(self.base_url + HISTORY_CANDLES, params=params, timeout=self.timeout)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        data = response.json()
+        if data.get("code") == "429":
+            raise RetryableError(data.get("msg", "rate limited"))
+        if data.get("code") != "00000":
+            raise ValueError(f"{params['symbol']}: {data.get('msg')}")
+        return data.get("data") or []
+
+    async def _fetch_page(self, semaphore: asyncio.Semaphore, params: dict) -> tuple:
+        """(candles, None), or (None, reason) once the page has failed for good."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            async with semaphore:
+                await self.bucket.acquire()
+                self.stats["requests"] += 1
+                try:
+                    return await loop.run_in_executor(self._executor, self._get, params), None
+                except (RetryableError, requests.ConnectionError, requests.Timeout) as e:
+                    reason = str(e) or type(e).__name__
+                    if attempt == self.retries:
+                        break
+                except (ValueError, requests.RequestException) as e:
+                    reason = str(e) or type(e).__name__
+                    break
+            self.stats["retries"] += 1
+            await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+        self.stats["failed_pages"] += 1
+        return None, reason
+
+    async def fetch(self, symbols: List[str], start: datetime, end: datetime, granularity: str = "1m") -> pd.DataFrame:
+        """Long OHLCV frame indexed by (asset, datetime) for bars opening in [start, end)."""
+        step_ms = frequency_to_minutes(granularity) * 60_000
+        start_ms = int(pd.Timestamp(start).timestamp() * 1000) // step_ms * step_ms
+        end_ms = int(pd.Timestamp(end).timestamp() * 1000) // step_ms * step_ms
+        page_span = PAGE_LIMIT * step_ms
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks, owners = [], []
+        for symbol in symbols:
+            for page_end in range(end_ms, start_ms, -page_span):
+                params = {
+                    "symbol": symbol,
+                    "granularity": granularity,
+                    "productType": self.product_type,
+                    "startTime": max(start_ms, page_end - page_span),
+                    "endTime": page_end - 1,
+                    "limit": PAGE_LIMIT,
+                }
+                tasks.append(self._fetch_page(semaphore, params))
+                owners.append((symbol, params["startTime"], page_end))
+        pages = await asyncio.gather(*tasks)
+
+        # Dedupe by timestamp: the dict key is the candle's open time.
+        candles: Dict[str, Dict[int, list]] = {symbol: {} for symbol in symbols}
+        failed = []
+        for (symbol, page_start, page_end), (page, reason) in zip(owners, pages):
+            if page is None:
+                failed.append((symbol, pd.Timestamp(page_start, unit="ms"), pd.Timestamp(page_end, unit="ms"), reason))
+                continue
+            book = candles[symbol]
+            for candle in page:
+                ts = int(candle[0])
+                if start_ms <= ts < end_ms:
+                    book[ts] = candle
+        frame = candles_to_frame(candles)
+        if failed:
+            raise IncompleteDownload(sorted(failed, key=lambda page: page[:2]), frame)
+        return frame
+
+
+def candles_to_frame(candles: Dict[str, Dict[int, list]]) -> pd.DataFrame:
+    frames = []
+    for symbol, book in candles.items():
+        if not book:
+            continue
+        rows = np.asarray([book[ts] for ts in sorted(book)], dtype=np.float64)
+        df = pd.DataFrame(rows[:, :len(OHLCV_COLUMNS)], columns=OHLCV_COLUMNS)
+        df["datetime"] = pd.to_datetime(df["timestamp"].astype(np.int64), unit="ms")
+        df["asset"] = symbol
+        frames.append(df[["asset", "datetime", "open", "high", "low", "close", "volume"]])
+    if not frames:
+        index = pd.MultiIndex.from_arrays([[], []], names=["asset", "datetime"])
+        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"], index=index)
+    return pd.concat(frames, ignore_index=True).set_index(["asset", "datetime"])
+
+
+def download_ohlcv(symbols: List[str], start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   days: Optional[float] = None, granularity: str = "1m", **downloader_kwargs) -> pd.DataFrame:
+    """
+    Blocking wrapper around `OHLCVDownloader.fetch` (also callable from inside a
+    running event loop); `days` counts back from `end` (default: now). Raises
+    `IncompleteDownload` when pages are still missing after their retries.
+    """
+    end = pd.Timestamp(end).to_pydatetime() if end is not None else datetime.now(timezone.utc).replace(tzinfo=None)
+    start = pd.Timestamp(start).to_pydatetime() if start is not None else end - timedelta(days=days or 1)
+    downloader = OHLCVDownloader(**downloader_kwargs)
+    try:
+        return run(downloader.fetch(symbols, start, end, granularity))
+    finally:
+        downloader.close()
+
+
+def download_to_store(store_path: str, symbols: List[str], granularity: str = "1m", **kwargs) -> BarStore:
+    """
+    Download OHLCV bars and write them as a memory-mapped `BarStore`. Nothing is
+    written if any page failed (`IncompleteDownload` propagates).
+    """
+    frame = download_ohlcv(symbols, granularity=granularity, **kwargs)
+    times, assets, fields = frame_to_arrays(frame)
+    return BarStore.create(store_path, times, assets, fields, frequency=granularity.lower())
+
+
+class CandleStandIn:
+    """
+    Local stand-in for the history-candles endpoint, serving synthetic candles.
+    `failures[symbol]` is a list of HTTP statuses answered, in order, to the
+    first requests for each page of that symbol; "always" entries fail every time.
+    """
+
+    def __init__(self, failures: Optional[Dict[str, list]] = None, always: Optional[Dict[str, int]] = None):
+        self.failures = failures or {}
+        self.always = always or {}
+        self.seen: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def reply(self, query: dict) -> tuple:
+        symbol, start, end = query["symbol"], int(query["startTime"]), int(query["endTime"])
+        with self._lock:
+            attempt = self.seen.get((symbol, start), 0)
+            self.seen[(symbol, start)] = attempt + 1
+        if symbol in self.always:
+            return self.always[symbol], {"code": str(self.always[symbol]), "msg": "stand-in failure"}
+        if attempt < len(self.failures.get(symbol, [])):
+            status = self.failures[symbol][attempt]
+            return status, {"code": str(status), "msg": "stand-in failure"}
+        step = frequency_to_minutes(query["granularity"]) * 60_000
+        candles = [[str(ts), "1", "2", "0.5", "1.5", "10", "15"]
+                   for ts in range((start + step - 1) // step * step, end + 1, step)]
+        return 200, {"code": "00000", "msg": "success", "data": candles}
+
+    def start(self) -> str:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, payload = stand_in.reply({k: v[0] for k, v in parse_qs(url.query).items()})
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def retry_check(store_dir: str) -> List[tuple]:
+    """
+    Download from a `CandleStandIn` that answers 429 and 5xx before succeeding,
+    and from one whose pages never succeed. Returns (case, passed, detail) rows.
+    """
+    end, start = datetime(2025, 1, 2), datetime(2025, 1, 1)
+    bars = int((end - start).total_seconds() // 60)
+    fast = dict(rate=1000, retries=3, backoff=0.001)
+    results = []
+
+    stand_in = CandleStandIn(failures={"BTCUSDT": [429, 500, 503], "ETHUSDT": [502]})
+    try:
+        frame = download_ohlcv(["BTCUSDT", "ETHUSDT"], start, end, base_url=stand_in.start(), **fast)
+        counts = frame.groupby(level="asset").size().to_dict()
+        results.append(("retried pages complete", counts == {"BTCUSDT": bars, "ETHUSDT": bars}, str(counts)))
+    except IncompleteDownload as e:
+        results.append(("retried pages complete", False, str(e)))
+    finally:
+        stand_in.stop()
+
+    stand_in = CandleStandIn(failures={"BTCUSDT": [429]}, always={"ETHUSDT": 503})
+    path = os.path.join(store_dir, "incomplete")
+    try:
+        download_to_store(path, ["BTCUSDT", "ETHUSDT"], start=start, end=end, base_url=stand_in.start(), **fast)
+        results.append(("final failure raises", False, "no exception"))
+    except IncompleteDownload as e:
+        pages = -(-bars // PAGE_LIMIT)
+        ok = len(e.failed) == pages and {page[0] for page in e.failed} == {"ETHUSDT"} \
+            and len(e.frame) == bars and not os.path.exists(path)
+        results.append(("final failure raises", ok, f"{len(e.failed)} failed pages, {len(e.frame)} bars kept, "
+                                                    f"store written: {os.path.exists(path)}"))
+    finally:
+        stand_in.stop()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent Bitget OHLCV downloader")
+    parser.add_argument("--symbols", help="Comma-separated symbols, e.g. BTCUSDT,ETHUSDT")
+    parser.add_argument("--days", type=float, default=60, help="Days of history ending now")
+    parser.add_argument("--granularity", default="1m", help="Bitget granularity (1m, 5m, 1H, 1D, ...)")
+    parser.add_argument("--rate", type=float, default=10, help="Max requests per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max requests in flight")
+    parser.add_argument("--base_url", default=BITGET_URL, help="API root (point at a local stand-in for testing)")
+    parser.add_argument("--store", help="Write to this bar store directory")
+    parser.add_argument("--csv", help="Write a long OHLCV CSV instead")
+    parser.add_argument("--check", action="store_true", help="Check retries and failures against a local stand-in")
+    args = parser.parse_args()
+
+    if args.check:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = retry_check(tmp)
+        for case, passed, detail in results:
+            print(f"{'✅' if passed else '❌'} {case}: {detail}")
+        raise SystemExit(0 if all(passed for _, passed, _ in results) else 1)
+    if not args.symbols:
+        parser.error("--symbols is required")
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    started = time.perf_counter()
+    kwargs = dict(days=args.days, granularity=args.granularity, rate=args.rate,
+                  max_concurrency=args.concurrency, base_url=args.base_url)
+    try:
+        if args.store:
+            store = download_to_store(args.store, symbols, **kwargs)
+            print(f"📦 {store.length} bars x {len(store.assets)} assets -> {args.store}")
+        else:
+            frame = download_ohlcv(symbols, **kwargs)
+            if args.csv:
+                frame.to_csv(args.csv)
+            print(frame)
+    except IncompleteDownload as e:
+        for symbol, page_start, page_end, reason in e.failed:
+            print(f"❌ {symbol} {page_start} - {page_end}: {reason}")
+        print(f"❌ {len(e.failed)} pages failed after retries; nothing written")
+        raise SystemExit(1)
+    print(f"⏱ {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,161 @@
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# A feature is a hashable node: kind, integer parameter and input node. Equal
+# declarations from different strategies are the same key and share one result.
+Feature = namedtuple("Feature", ["kind", "param", "input", "frequency"])
+
+
+def field(name: str = "close", frequency: str = "1m") -> Feature:
+    """Raw bars of `name` at `frequency`."""
+    return Feature("field", name, None, frequency)
+
+
+def returns(periods: int = 1, of: Optional[Feature] = None) -> Feature:
+    """`pct_change(periods)` of `of` (default: 1m close)."""
+    of = of or field()
+    return Feature("returns", periods, of, of.frequency)
+
+
+def momentum(periods: int, of: Optional[Feature] = None) -> Feature:
+    """`periods`-bar return, close[t] / close[t - periods] - 1."""
+    return returns(periods, of)
+
+
+def rolling_std(window: int, of: Optional[Feature] = None) -> Feature:
+    """Rolling sample std (min_periods=window) of `of` (default: 1-bar returns)."""
+    of = of or returns(1)
+    return Feature("rolling_std", window, of, of.frequency)
+
+
+def rolling_mean(window: int, of: Optional[Feature] = None) -> Feature:
+    """Rolling mean (min_periods=window) of `of` (default: 1-bar returns)."""
+    of = of or returns(1)
+    return Feature("rolling_mean", window, of, of.frequency)
+
+
+_CALL = re.compile(r"^\s*(\w+)\s*\((.*)\)\s*$")
+_CONSTRUCTORS = {"returns": returns, "momentum": momentum, "rolling_std": rolling_std, "rolling_mean": rolling_mean}
+
+
+def parse(spec: Union[str, Feature], frequency: str = "1m") -> Feature:
+    """
+    Feature from a declaration string, so strategy files need no extra import:
+    "close", "volume", "returns(1)", "momentum(60)", "rolling_std(20)",
+    "rolling_mean(60, rolling_std(20))". Fields are read at `frequency`.
+    """
+    if isinstance(spec, Feature):
+        return spec
+    match = _CALL.match(spec)
+    if match is None:
+        return field(spec.strip(), frequency)
+    kind, args = match.group(1), match.group(2)
+    param, _, inner = args.partition(",")
+    constructor = _CONSTRUCTORS.get(kind)
+    if constructor is None:
+        raise ValueError(f"Unknown feature: {spec!r}")
+    of = parse(inner, frequency) if inner.strip() else field("close", frequency)
+    if kind in ("rolling_std", "rolling_mean") and not inner.strip():
+        of = returns(1, of)
+    return constructor(int(param), of)
+
+
+def lookback(node: Feature) -> int:
+    """Extra leading rows `node` needs beyond the rows it returns."""
+    if node.kind == "field":
+        return 0
+    own = node.param if node.kind == "returns" else node.param - 1
+    return own + lookback(node.input)
+
+
+def _compute(node: Feature, source: pd.DataFrame) -> pd.DataFrame:
+    """Evaluate `node` on its input frame (NaN in any input row of a window -> NaN, as in pandas rolling)."""
+    values = source.to_numpy(dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    n = node.param
+    if node.kind == "returns":
+        if len(values) > n:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[n:] = values[n:] / values[:-n] - 1
+    elif node.kind == "rolling_std":
+        return source.rolling(n).std()
+    elif node.kind == "rolling_mean":
+        return source.rolling(n).mean()
+    else:
+        raise ValueError(f"Unknown feature kind: {node.kind!r}")
+    return pd.DataFrame(out, index=source.index, columns=source.columns)
+
+
+class FeatureGraph:
+    """
+    Per-bar memo of feature nodes over one context.
+
+    A strategy reading `rolling_std(20)` gets what its own
+    `pct_change(1).rolling(20).std()` would, up to float rounding (returns are
+    one numpy op and rolling nodes use pandas' rolling, over just the rows
+    they need). Each node is cached as a wide frame over the union of assets
+    requested so far at the current bar and the longest window asked for;
+    smaller requests are slices of it, and every node's inputs are cached
+    too. The memo is dropped whenever `context.current_dt` moves; assets seen
+    at earlier bars are kept, so in steady state each node is computed once
+    per bar for all strategies.
+
+    Passing `universe` (e.g. the union of every co-hosted strategy's assets)
+    computes each node once for all of them up front. `get` holds a lock, so
+    strategies running on threads over one context (as `Portfolio` sleeves do)
+    can share a graph; a node asked for concurrently is computed once.
+    """
+
+    def __init__(self, context, universe: Optional[List[str]] = None):
+        self.context = context
+        self.universe = list(universe) if universe else None
+        self.stats = {"hits": 0, "computed": 0}
+        self._bar: Optional[datetime] = None
+        self._memo: Dict[Feature, tuple] = {}
+        # Assets requested at earlier bars: from the second bar on, each node is
+        # computed once over all of them instead of once per distinct asset list.
+        self._seen: Dict[str, None] = dict.fromkeys(self.universe or [])
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    def get(self, node: Union[str, Feature], assets: List[str], window: int = 1, frequency: str = "1m") -> pd.DataFrame:
+        """Last `window` rows of `node` for `assets` (those the context knows), as datetime x asset."""
+        node = parse(node, frequency)
+        with self._lock:
+            now = self.context.current_dt
+            if now != self._bar:
+                self._memo.clear()
+                self._bar = now
+            frame = self._node(node, assets, window)
+        positions = frame.columns.get_indexer(assets)
+        return frame.iloc[-window:, positions[positions >= 0]]
+
+    def _node(self, node: Feature, assets: List[str], window: int) -> pd.DataFrame:
+        # Memo entries remember what was asked for, not what came back, so assets
+        # the context does not know and windows longer than the data still hit.
+        rows, requested, frame = self._memo.get(node, (0, (), None))
+        if frame is not None and rows >= window and set(assets).issubset(requested):
+            self.stats["hits"] += 1
+            return frame
+
+        self._seen.update(dict.fromkeys(assets))
+        columns = list(dict.fromkeys([*self._seen, *requested]))
+        rows = max(window, rows)
+        if node.kind == "field":
+            panel = self.context.get_panel(columns, rows, node.frequency, node.param)
+            frame = panel.frame(node.param) if not panel.empty_window else pd.DataFrame(columns=columns, dtype=float)
+        else:
+            source = self._node(node.input, columns, rows + lookback(node) - lookback(node.input))
+            frame = _compute(node, source).iloc[-rows:]
+        self.stats["computed"] += 1
+        self._memo[node] = (rows, tuple(columns), frame)
+        return frame
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "https://bitgettrader.fin.cloud.ainode.ai"
+
+_settings = {
+    "base_url": BASE_URL,
+    "timeout": (3.05, 10),   # (connect, read) seconds
+    "retries": 3,
+    "backoff": 0.2,
+    "pool_size": 32,
+}
+_sessions = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def configure(base_url: Optional[str] = None, timeout: Optional[Union[float, Tuple[float, float]]] = None,
+              retries: Optional[int] = None, backoff: Optional[float] = None, pool_size: Optional[int] = None) -> None:
+    """Change client settings; open sessions are dropped and rebuilt on next use."""
+    global _executor
+    updates = {"base_url": base_url.rstrip("/") if base_url else None, "timeout": timeout,
+               "retries": retries, "backoff": backoff, "pool_size": pool_size}
+    with _lock:
+        _settings.update({k: v for k, v in updates.items() if v is not None})
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _build_session(idempotent: bool) -> requests.Session:
+    retries = _settings["retries"]
+    if idempotent:
+        # Safe to resend: retry connection errors, read timeouts and throttling/5xx replies.
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset({"GET", "POST"}),
+                      backoff_factor=_settings["backoff"], raise_on_status=False)
+    else:
+        # Only retry when the request never reached the server (connection failures).
+        retry = Retry(total=retries, connect=retries, read=0, status=0, other=0,
+                      allowed_methods=frozenset({"GET"}), backoff_factor=_settings["backoff"])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_settings["pool_size"], max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(idempotent: bool = True) -> requests.Session:
+    """Shared keep-alive session; one for idempotent calls and one for order-changing calls."""
+    session = _sessions.get(idempotent)
+    if session is None:
+        with _lock:
+            session = _sessions.get(idempotent)
+            if session is None:
+                session = _sessions[idempotent] = _build_session(idempotent)
+    return session
+
+
+def post(path: str, USER_KEY: str, json: dict, idempotent: bool = False) -> dict:
+    """
+    POST `json` to `<base_url><path>` with the API headers and return the
+    decoded body. Non-2xx replies raise `requests.HTTPError`.
+    """
+    headers = {
+        "API-KEY": USER_KEY,
+        "Target-Email": None
+    }
+    session = get_session(idempotent)
+    response = session.post(_settings["base_url"] + path, json=json, headers=headers, timeout=_settings["timeout"])
+    if not response.ok:
+        # Error replies raise (callers used to decode them like successes and read a null `data`),
+        # carrying the API's own code and message when the body has them.
+        try:
+            body = response.json()
+            reason = f"{body.get('code')} {body.get('msg')}"
+        except (ValueError, AttributeError):
+            reason = response.reason
+        raise requests.HTTPError(f"{response.status_code} {reason} for {path}", response=response)
+    return response.json()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_settings["pool_size"])
+        return _executor
+
+
+async def async_post(path: str, USER_KEY: str, json: dict, idempotent: bool = False) -> dict:
+    """`post` for asyncio code; runs on a thread pool sized to the connection pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), post, path, USER_KEY, json, idempotent)
+
+
+def run(coroutine):
+    """
+    `asyncio.run(coroutine)` for the blocking wrappers. When the calling thread
+    already runs an event loop (Jupyter, async services), where `asyncio.run`
+    refuses to start, the coroutine gets its own loop on a worker thread and
+    the call blocks until it finishes.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as worker:
+        return worker.submit(asyncio.run, coroutine).result()
@@ -1,21 +1,26 @@
 import pandas as pd
-import requests
+
+from module.futures.client import async_post, post
+
+ALL_POSITIONS = "/futures/position/all-positions"
 
 def all_positions(USER_KEY: str, productType: str, marginCoin: str) -> pd.DataFrame:
-    url = "https://bitgettrader.fin.cloud.ainode.ai/futures/position/all-positions"
-  
-    headers = {
-        "API-KEY": USER_KEY,
-        "Target-Email": None
+    json = {
+        "productType": productType,
+        'marginCoin': marginCoin.upper()
     }
 
+    # Read-only query: safe to retry on timeouts and 5xx.
+    data = post(ALL_POSITIONS, USER_KEY, json, idempotent=True)['data']
+    df = pd.DataFrame(data)
+    return df
+
+async def async_all_positions(USER_KEY: str, productType: str, marginCoin: str) -> pd.DataFrame:
     json = {
         "productType": productType,
         'marginCoin': marginCoin.upper()
     }
 
-    response = requests.post(url, json=json, headers=headers)
-
-    data = response.json()['data']
+    data = (await async_post(ALL_POSITIONS, USER_KEY, json, idempotent=True))['data']
     df = pd.DataFrame(data)
     return df
@@ -0,0 +1,172 @@
+import asyncio
+import time
+import uuid
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+
+from module.futures.client import run
+from module.futures.position import async_all_positions
+from module.futures.trade import async_place_order
+
+ORDER_COLUMNS = ["symbol", "side", "tradeSide", "reduceOnly", "size", "price", "notional", "phase"]
+
+
+def _float_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[name], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def plan_orders(weights: Dict[str, float], system_config: dict, positions: pd.DataFrame, equity: float,
+                prices: Optional[Dict[str, float]] = None, band: float = 0.001,
+                size_decimals: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """
+    Orders that move `positions` (an `all_positions` frame) to the strategy `weights`.
+
+    Target quantity per symbol is `weight * equity * total_allocation * leverage / price`.
+    In hedge_mode the net target lives on one side: the opposite leg is closed and
+    the same-side leg is opened or reduced by the difference. In one_way_mode a
+    single net order is sent (reduce-only when it shrinks the position).
+
+    Legs whose notional change is below `band * equity` are skipped (no-trade band),
+    except full closes. `prices` fills in symbols without a mark price in
+    `positions`. Closing orders are tagged phase 0, opening orders phase 1.
+    """
+    leverage = float(system_config.get("leverage", 1))
+    allocation = float(system_config.get("total_allocation", 1))
+    hedge = system_config.get("posMode", "hedge_mode") == "hedge_mode"
+    prices = prices or {}
+
+    if positions is None or positions.empty:
+        positions = pd.DataFrame(columns=["symbol", "holdSide", "total", "markPrice"])
+    held = positions.assign(_total=_float_column(positions, "total"), _mark=_float_column(positions, "markPrice"))
+
+    symbols = list(dict.fromkeys([*weights, *held["symbol"]]))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    n = len(symbols)
+
+    # --- Current book as arrays ---
+    rows = held["symbol"].map(index).to_numpy(dtype=np.intp)
+    is_long = (held["holdSide"] == "long").to_numpy() if len(held) else np.zeros(0, dtype=bool)
+    long_qty = np.bincount(rows[is_long], weights=held["_total"].to_numpy()[is_long], minlength=n)
+    short_qty = np.bincount(rows[~is_long], weights=held["_total"].to_numpy()[~is_long], minlength=n)
+
+    price = np.array([prices.get(symbol, np.nan) for symbol in symbols], dtype=np.float64)
+    mark = np.full(n, np.nan)
+    mark[rows] = held["_mark"].to_numpy()
+    price = np.where(np.isnan(price) & (mark > 0), mark, price)
+
+    # --- Targets ---
+    weight = np.array([weights.get(symbol, 0.0) or 0.0 for symbol in symbols], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        target = np.where(price > 0, weight * equity * allocation * leverage / price, np.nan)
+    if size_decimals:
+        scale = np.array([10.0 ** size_decimals.get(symbol, 8) for symbol in symbols])
+        target = np.trunc(target * scale) / scale
+    # Without a price the symbol cannot be sized; leave it untouched.
+    unpriced = np.isnan(target)
+    target = np.where(unpriced, long_qty - short_qty, target)
+
+    threshold = band * equity
+    orders = []
+    if hedge:
+        target_long = np.maximum(target, 0.0)
+        target_short = np.maximum(-target, 0.0)
+        for held_qty, goal, side in ((long_qty, target_long, "buy"), (short_qty, target_short, "sell")):
+            delta = goal - held_qty
+            notional = np.abs(delta) * np.nan_to_num(price)
+            full_close = (goal == 0) & (held_qty > 0)
+            trade = (delta != 0) & ~unpriced & ((notional >= threshold) | full_close)
+            for i in np.flatnonzero(trade):
+                opening = delta[i] > 0
+                orders.append([symbols[i], side, "open" if opening else "close", None,
+                               abs(delta[i]), price[i], notional[i], 1 if opening else 0])
+    else:
+        current = long_qty - short_qty
+        delta = target - current
+        notional = np.abs(delta) * np.nan_to_num(price)
+        full_close = (target == 0) & (current != 0)
+        trade = (delta != 0) & ~unpriced & ((notional >= threshold) | full_close)
+        for i in np.flatnonzero(trade):
+            reducing = abs(target[i]) < abs(current[i]) and np.sign(target[i]) != -np.sign(current[i])
+            orders.append([symbols[i], "buy" if delta[i] > 0 else "sell", None, "YES" if reducing else "NO",
+                           abs(delta[i]), price[i], notional[i], 0 if reducing else 1])
+
+    return pd.DataFrame(orders, columns=ORDER_COLUMNS).sort_values(["phase", "symbol"], ignore_index=True)
+
+
+def _text(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _format_size(size: float) -> str:
+    return np.format_float_positional(size, precision=8, trim="-")
+
+
+async def submit_orders(USER_KEY: str, orders: pd.DataFrame, system_config: dict) -> pd.DataFrame:
+    """
+    Send `orders` concurrently: all closing orders first (to free margin), then all
+    opening orders. Returns one row per order with its ack or error and latency.
+    Orders are not resent once they may have reached the exchange; one whose reply
+    timed out is reported as "unknown" (it may have filled; the next rebalance
+    plans from the positions it reads).
+    """
+    async def send(order) -> dict:
+        clientOid = uuid.uuid4().hex
+        started = time.perf_counter()
+        try:
+            data = await async_place_order(
+                USER_KEY, order.symbol, system_config.get("productType", "usdt-futures"),
+                system_config.get("marginMode", "crossed"), system_config.get("marginCoin", "usdt"),
+                _format_size(order.size), order.side, tradeSide=_text(order.tradeSide),
+                orderType=system_config.get("orderType", "market"), clientOid=clientOid,
+                reduceOnly=_text(order.reduceOnly),
+            )
+            result, orderId, error = "success", (data or {}).get("orderId", ""), ""
+        except requests.ReadTimeout as e:
+            result, orderId, error = "unknown", "", f"{type(e).__name__}: {e}"
+        except Exception as e:
+            result, orderId, error = "failure", "", f"{type(e).__name__}: {e}"
+        return {"symbol": order.symbol, "side": order.side, "tradeSide": order.tradeSide, "size": order.size,
+                "clientOid": clientOid, "orderId": orderId, "result": result, "errorMsg": error,
+                "latency_sec": time.perf_counter() - started}
+
+    acks = []
+    for phase in sorted(orders["phase"].unique()):
+        batch = orders[orders["phase"] == phase]
+        acks += await asyncio.gather(*(send(order) for order in batch.itertuples(index=False)))
+    return pd.DataFrame(acks)
+
+
+async def async_rebalance(USER_KEY: str, weights: Dict[str, float], system_config: dict, equity: float,
+                          prices: Optional[Dict[str, float]] = None, positions: Optional[pd.DataFrame] = None,
+                          band: float = 0.001, size_decimals: Optional[Dict[str, int]] = None) -> tuple:
+    """
+    Weights -> acknowledged orders. Returns (acks, timings) where timings holds the
+    wall-clock seconds of each stage and `total` from weights ready to last ack.
+    """
+    started = time.perf_counter()
+    timings = {}
+    if positions is None:
+        positions = await async_all_positions(USER_KEY, system_config.get("productType", "usdt-futures"),
+                                              system_config.get("marginCoin", "usdt"))
+        timings["positions"] = time.perf_counter() - started
+
+    planned = time.perf_counter()
+    orders = plan_orders(weights, system_config, positions, equity, prices=prices, band=band, size_decimals=size_decimals)
+    timings["plan"] = time.perf_counter() - planned
+
+    submitted = time.perf_counter()
+    acks = await submit_orders(USER_KEY, orders, system_config) if len(orders) else pd.DataFrame()
+    timings["submit"] = time.perf_counter() - submitted
+    timings["orders"] = len(orders)
+    timings["total"] = time.perf_counter() - started
+    return acks, timings
+
+
+def rebalance(USER_KEY: str, weights: Dict[str, float], system_config: dict, equity: float, **kwargs) -> tuple:
+    """Blocking wrapper around `async_rebalance` (also callable from inside a running event loop)."""
+    return run(async_rebalance(USER_KEY, weights, system_config, equity, **kwargs))
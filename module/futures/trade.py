@@ -1,24 +1,16 @@
+import asyncio
 import pandas as pd
-import requests
-from typing import Optional
+from typing import List, Optional
 
-def flash_close_position(USER_KEY: str, symbol: Optional[str], productType: str, holdSide: Optional[str]) -> pd.DataFrame:
-    url = "https://bitgettrader.fin.cloud.ainode.ai/futures/trade/close-position"
-
-    headers = {
-        "API-KEY": USER_KEY,
-        "Target-Email": None
-    }
-
-    json = {
-        "symbol": symbol,
-        "productType": productType,
-        "holdSide": holdSide
-    }
+from module.futures.client import async_post, post, run
 
-    response = requests.post(url=url, json=json, headers=headers)
-    data = response.json()['data']
+CLOSE_POSITION = "/futures/trade/close-position"
+# Not confirmed with the trading service yet: the body follows Bitget's v2 place-order
+# and the path mirrors close-position. Check both before trading live through it.
+PLACE_ORDER = "/futures/trade/place-order"
+RESULT_COLUMNS = ["orderId", "clientOid", "result", "errorMsg", "errorCode"]
 
+def _close_result_frame(data: dict) -> pd.DataFrame:
     rows = []
     # Success list processing
     for item in data.get('successList', []):
@@ -36,5 +28,81 @@ def flash_close_position(USER_KEY: str, symbol: Optional[str], productType: str,
         errorCode = item.get('errorCode', '')
         rows.append([orderId, clientOid, result, errorMsg, errorCode])
 
-    df = pd.DataFrame(rows, columns=["orderId", "clientOid", "result", "errorMsg", "errorCode"])
+    df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
     return df
+
+def flash_close_position(USER_KEY: str, symbol: Optional[str], productType: str, holdSide: Optional[str]) -> pd.DataFrame:
+    json = {
+        "symbol": symbol,
+        "productType": productType,
+        "holdSide": holdSide
+    }
+
+    # Closing is not idempotent: only connection failures are retried.
+    data = post(CLOSE_POSITION, USER_KEY, json)['data']
+    return _close_result_frame(data)
+
+async def async_flash_close_position(USER_KEY: str, symbol: Optional[str], productType: str, holdSide: Optional[str]) -> pd.DataFrame:
+    json = {
+        "symbol": symbol,
+        "productType": productType,
+        "holdSide": holdSide
+    }
+
+    data = (await async_post(CLOSE_POSITION, USER_KEY, json))['data']
+    return _close_result_frame(data)
+
+async def async_flash_close_positions(USER_KEY: str, symbols: List[str], productType: str, holdSide: Optional[str] = None) -> pd.DataFrame:
+    """Close every symbol concurrently; one row per order plus the symbol, failures included."""
+    results = await asyncio.gather(
+        *(async_flash_close_position(USER_KEY, symbol, productType, holdSide) for symbol in symbols),
+        return_exceptions=True,
+    )
+
+    frames = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            result = pd.DataFrame([["", "", "failure", f"{type(result).__name__}: {result}", ""]], columns=RESULT_COLUMNS)
+        frames.append(result.assign(symbol=symbol))
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS + ["symbol"])
+    return pd.concat(frames, ignore_index=True)
+
+def flash_close_positions(USER_KEY: str, symbols: List[str], productType: str, holdSide: Optional[str] = None) -> pd.DataFrame:
+    """Blocking wrapper around `async_flash_close_positions` (for emergency flattening of many legs)."""
+    return run(async_flash_close_positions(USER_KEY, symbols, productType, holdSide))
+
+def _order_json(symbol: str, productType: str, marginMode: str, marginCoin: str, size: str, side: str,
+                tradeSide: Optional[str], orderType: str, clientOid: Optional[str], reduceOnly: Optional[str]) -> dict:
+    json = {
+        "symbol": symbol,
+        "productType": productType,
+        "marginMode": marginMode,
+        "marginCoin": marginCoin.upper(),
+        "size": size,
+        "side": side,
+        "orderType": orderType,
+    }
+    # Hedge mode uses tradeSide (open/close); one-way mode uses reduceOnly instead.
+    if tradeSide:
+        json["tradeSide"] = tradeSide
+    if reduceOnly:
+        json["reduceOnly"] = reduceOnly
+    if clientOid:
+        json["clientOid"] = clientOid
+    return json
+
+def place_order(USER_KEY: str, symbol: str, productType: str, marginMode: str, marginCoin: str, size: str, side: str,
+                tradeSide: Optional[str] = None, orderType: str = "market", clientOid: Optional[str] = None,
+                reduceOnly: Optional[str] = None) -> dict:
+    json = _order_json(symbol, productType, marginMode, marginCoin, size, side, tradeSide, orderType, clientOid, reduceOnly)
+
+    # Not retried after it may have reached the server: a resent order whose first reply was
+    # lost would come back as a duplicate-clientOid error although the first one filled.
+    return post(PLACE_ORDER, USER_KEY, json)['data']
+
+async def async_place_order(USER_KEY: str, symbol: str, productType: str, marginMode: str, marginCoin: str, size: str, side: str,
+                            tradeSide: Optional[str] = None, orderType: str = "market", clientOid: Optional[str] = None,
+                            reduceOnly: Optional[str] = None) -> dict:
+    json = _order_json(symbol, productType, marginMode, marginCoin, size, side, tradeSide, orderType, clientOid, reduceOnly)
+    return (await async_post(PLACE_ORDER, USER_KEY, json))['data']
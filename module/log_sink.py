@@ -0,0 +1,248 @@
+import glob
+import gzip
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+def rebalance_marker(field: str = "event", value: str = "rebalance") -> Callable[[str], bool]:
+    """Marker test for JSON object lines whose `field` equals `value`, e.g. {"event": "rebalance", ...}."""
+    def is_rebalance(line: str) -> bool:
+        if value not in line:   # cheap pre-filter; the parsed field decides
+            return False
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return False
+        return isinstance(record, dict) and record.get(field) == value
+
+    return is_rebalance
+
+
+class JSONLSink:
+    """
+    Buffered, rotating JSONL log writer.
+
+    `write` only enqueues the raw line; a background thread batches lines into
+    the active segment `<prefix>.<n>.jsonl` and flushes every `flush_interval`
+    seconds. A segment is rotated once it reaches `max_bytes` or `max_seconds`,
+    then compressed to `<prefix>.<n>.jsonl.gz` as one gzip member per index block.
+
+    Each segment has a sidecar `<prefix>.<n>.idx.json` listing its blocks (first
+    line number, receive time, byte offsets in the plain and compressed file) and
+    the rebalance markers inside them, so a reader can jump to a block directly.
+    A marker is a line `is_rebalance` accepts; by default a JSON object with
+    `"event": "rebalance"` (see `rebalance_marker`).
+
+    Lines that arrive while the queue is full are counted in `dropped`.
+    """
+
+    def __init__(self, directory: str, prefix: str = "log", max_bytes: int = 64 * 1024 * 1024,
+                 max_seconds: float = 3600, flush_interval: float = 0.5, block_lines: int = 2048,
+                 is_rebalance: Optional[Callable[[str], bool]] = None, compress: bool = True):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.flush_interval = flush_interval
+        self.block_lines = block_lines
+        self.is_rebalance = is_rebalance or rebalance_marker()
+        self.compress = compress
+        self.dropped = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=100_000)
+        self._segment = self._next_segment_number()
+        self._rebalances = 0
+        self._compressors: List[threading.Thread] = []
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, name="jsonl-sink", daemon=True)
+        self._thread.start()
+
+    # --- producer side ---
+    def write(self, line: str) -> None:
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        for thread in self._compressors:
+            thread.join()
+
+    # --- writer thread ---
+    def _next_segment_number(self) -> int:
+        numbers = [int(m.group(1)) for path in glob.glob(os.path.join(self.directory, f"{self.prefix}.*.idx.json"))
+                   if (m := re.search(r"\.(\d+)\.idx\.json$", path))]
+        return max(numbers, default=-1) + 1
+
+    def _path(self, segment: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}.{segment:05d}.{suffix}")
+
+    def _open_segment(self) -> None:
+        self._file = open(self._path(self._segment, "jsonl"), "wb")
+        self._opened = time.time()
+        self._bytes = 0
+        self._lines = 0
+        self._blocks = []
+
+    def _index_line(self, line: str, received: float) -> None:
+        if self._lines % self.block_lines == 0:
+            self._blocks.append({"line": self._lines, "ts": received, "offset": self._bytes, "rebalances": []})
+        if self.is_rebalance(line):
+            self._rebalances += 1
+            self._blocks[-1]["rebalances"].append({"n": self._rebalances, "line": self._lines, "ts": received})
+
+    def _run(self) -> None:
+        last_flush = time.time()
+        buffer = io.BytesIO()
+        running = True
+        while running:
+            try:
+                lines = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                lines = []
+            while len(lines) < 10_000:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.time()
+            for line in lines:
+                if line is None:
+                    running = False
+                    break
+                data = (line.rstrip("\n") + "\n").encode("utf-8")
+                self._index_line(line, now)
+                buffer.write(data)
+                self._bytes += len(data)
+                self._lines += 1
+
+            rotate = self._lines and (self._bytes >= self.max_bytes or now - self._opened >= self.max_seconds)
+            if buffer.tell() and (rotate or not running or now - last_flush >= self.flush_interval or buffer.tell() > 1 << 20):
+                self._file.write(buffer.getvalue())
+                self._file.flush()
+                buffer = io.BytesIO()
+                last_flush = now
+
+            if rotate and running:
+                self._rotate()
+
+        self._finish_segment()
+
+    def _rotate(self) -> None:
+        self._finish_segment()
+        self._segment += 1
+        self._open_segment()
+
+    def _finish_segment(self) -> None:
+        self._file.close()
+        segment, blocks = self._segment, self._blocks
+        index = {"segment": segment, "lines": self._lines, "bytes": self._bytes, "blocks": blocks, "compressed": False}
+        self._write_index(segment, index)
+        if self.compress and self._lines:
+            thread = threading.Thread(target=self._compress, args=(segment, index), daemon=True)
+            thread.start()
+            self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+
+    def _write_index(self, segment: int, index: dict) -> None:
+        tmp = self._path(segment, "idx.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self._path(segment, "idx.json"))
+
+    def _compress(self, segment: int, index: dict) -> None:
+        """Compress a finished segment as one gzip member per block, recording member offsets."""
+        plain_path, gz_path = self._path(segment, "jsonl"), self._path(segment, "jsonl.gz")
+        blocks = index["blocks"]
+        with open(plain_path, "rb") as src, open(gz_path + ".tmp", "wb") as dst:
+            for i, block in enumerate(blocks):
+                end = blocks[i + 1]["offset"] if i + 1 < len(blocks) else index["bytes"]
+                src.seek(block["offset"])
+                block["gz_offset"] = dst.tell()
+                dst.write(gzip.compress(src.read(end - block["offset"]), compresslevel=6))
+        os.replace(gz_path + ".tmp", gz_path)
+        index["compressed"] = True
+        self._write_index(segment, index)
+        os.remove(plain_path)
+
+
+class LogReader:
+    """Reads segments written by `JSONLSink`, using the index to seek to blocks."""
+
+    def __init__(self, directory: str, prefix: str = "log"):
+        self.directory = directory
+        self.prefix = prefix
+
+    def indexes(self) -> List[dict]:
+        paths = sorted(glob.glob(os.path.join(self.directory, f"{self.prefix}.*.idx.json")))
+        indexes = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                indexes.append(json.load(f))
+        return indexes
+
+    def _block_lines(self, index: dict, block_no: int) -> List[str]:
+        blocks = index["blocks"]
+        base = os.path.join(self.directory, f"{self.prefix}.{index['segment']:05d}")
+        if index.get("compressed"):
+            with open(base + ".jsonl.gz", "rb") as f:
+                f.seek(blocks[block_no]["gz_offset"])
+                end = blocks[block_no + 1]["gz_offset"] if block_no + 1 < len(blocks) else None
+                raw = f.read(end - blocks[block_no]["gz_offset"]) if end is not None else f.read()
+            data = gzip.decompress(raw)
+        else:
+            with open(base + ".jsonl", "rb") as f:
+                f.seek(blocks[block_no]["offset"])
+                end = blocks[block_no + 1]["offset"] if block_no + 1 < len(blocks) else None
+                data = f.read(end - blocks[block_no]["offset"]) if end is not None else f.read()
+        return data.decode("utf-8").splitlines()
+
+    def _iter_from(self, segment_pos: int, block_no: int, skip: int) -> Iterator[tuple]:
+        """Yields (segment position, line number in segment, line) from a block onwards."""
+        indexes = self.indexes()
+        for s in range(segment_pos, len(indexes)):
+            index = indexes[s]
+            start = block_no if s == segment_pos else 0
+            for b in range(start, len(index["blocks"])):
+                first = index["blocks"][b]["line"]
+                lines = self._block_lines(index, b)
+                offset = skip if s == segment_pos and b == block_no else 0
+                for i in range(offset, len(lines)):
+                    yield s, first + i, lines[i]
+
+    def iter_lines(self, since: Optional[float] = None) -> Iterator[str]:
+        """All lines, or those from the first block that may hold lines received at or after `since` (epoch seconds)."""
+        for s, index in enumerate(self.indexes()):
+            for b, block in enumerate(index["blocks"]):
+                following = index["blocks"][b + 1]["ts"] if b + 1 < len(index["blocks"]) else float("inf")
+                if since is None or following >= since:
+                    for _, _, line in self._iter_from(s, b, 0):
+                        yield line
+                    return
+
+    def rebalance(self, n: int) -> List[str]:
+        """Lines from the n-th rebalance marker (1-based) up to the next one."""
+        markers = [(marker["n"], s, b, block["line"], marker["line"])
+                   for s, index in enumerate(self.indexes())
+                   for b, block in enumerate(index["blocks"])
+                   for marker in block["rebalances"]]
+        found = [i for i, m in enumerate(markers) if m[0] == n]
+        if not found:
+            return []
+        _, s, b, block_line, line_no = markers[found[0]]
+        following = markers[found[0] + 1] if found[0] + 1 < len(markers) else None
+        stop = (following[1], following[4]) if following else None
+        lines = []
+        for position in self._iter_from(s, b, line_no - block_line):
+            if stop is not None and position[:2] == stop:
+                break
+            lines.append(position[2])
+        return lines
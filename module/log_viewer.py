@@ -1,33 +1,40 @@
 # python log_viewer.py --user_key {USER_KEY} --session_id {session_id} --save_log {true/false}
+# python log_viewer.py --session_id {session_id} --show_rebalance {N}
+# (from module/, or as python module/log_viewer.py / python -m module.log_viewer)
 
 import json
 import argparse
-import websocket
 import sys
 
-log_file = None
-save_log = False
+sink = None
+
+def log_sink():
+    """`module.log_sink`, also when this file is run as a script from module/."""
+    try:
+        from module import log_sink as sink_module
+    except ImportError:
+        import log_sink as sink_module
+    return sink_module
 
 def write_to_file(line):
-    if save_log and log_file:
-        log_file.write(line + "\n")
-        log_file.flush()
+    if sink is not None:
+        # Server messages are already JSON and are stored as received; plain-text lines are quoted for JSONL.
+        try:
+            json.loads(line)
+        except ValueError:
+            line = json.dumps(line, ensure_ascii=False)
+        sink.write(line)
 
 def on_message(ws, message):
-    try:
-        parsed = json.loads(message)
-        log_line = json.dumps(parsed, ensure_ascii=False)
-        print(log_line)
-        write_to_file(log_line)
-    except Exception:
-        if "\r" in message:
-            line = message.split("\r")[-1]
-            sys.stdout.write("\r" + line)
-            sys.stdout.flush()
-            write_to_file(line)
-        else:
-            print(message)
-            write_to_file(message)
+    # Messages are passed through as received: no decode/re-encode per line.
+    if "\r" in message:
+        line = message.split("\r")[-1]
+        sys.stdout.write("\r" + line)
+        sys.stdout.flush()
+        write_to_file(line)
+    else:
+        sys.stdout.write(message + "\n")
+        write_to_file(message)
 
 def on_close(ws, close_status_code, close_msg):
     print("🔌 Connection closed")
@@ -40,17 +47,27 @@ def on_error(ws, error):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="WebSocket Real-Time Log Viewer")
-    parser.add_argument("--user_key", required=True, help="User API Key")
+    parser.add_argument("--user_key", help="User API Key")
     parser.add_argument("--session_id", required=True, help="Session ID")
     parser.add_argument("--save_log", default="false", help="Whether to save log to file (true/false)")
+    parser.add_argument("--show_rebalance", type=int, help="Print rebalance N from a saved log and exit")
     args = parser.parse_args()
 
-    save_log = args.save_log.lower() == "true"
+    log_dir = f"log_{args.session_id}"
+
+    if args.show_rebalance is not None:
+        for line in log_sink().LogReader(log_dir).rebalance(args.show_rebalance):
+            print(line)
+        sys.exit(0)
+
+    if not args.user_key:
+        parser.error("--user_key is required to stream logs")
+
+    import websocket
 
-    if save_log:
-        filename = f"log_{args.session_id}.txt"
-        log_file = open(filename, "a", encoding="utf-8")
-        print(f"📝 Logging to {filename}")
+    if args.save_log.lower() == "true":
+        sink = log_sink().JSONLSink(log_dir)
+        print(f"📝 Logging to {log_dir}/")
 
     ws_url = f"wss://aifapbt.fin.cloud.ainode.ai/logs/ws/{args.session_id}?user_key={args.user_key}"
 
@@ -65,5 +82,8 @@ if __name__ == "__main__":
     try:
         ws.run_forever()
     finally:
-        if log_file:
-            log_file.close()
+        sys.stdout.flush()
+        if sink is not None:
+            sink.close()
+            if sink.dropped:
+                print(f"⚠️ {sink.dropped} lines dropped: the log writer fell behind")
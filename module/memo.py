@@ -0,0 +1,157 @@
+# python -m module.memo --check [--days 5]
+
+import argparse
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from module.cadence import Cadence
+from module.data_context import frequency_to_minutes
+from module.result_store import code_hash, config_hash
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+class StrategyMemo:
+    """
+    Bounded cache of strategy outputs between bar closes.
+
+    `wrap(strategy)` returns a drop-in `strategy(context, config_dict)` whose
+    results are keyed by (code hash, config hash, bar). For strategies whose
+    `schedule_config` declares `completed_bars` the bar is the last completed
+    one at their `frequency`: with hourly rebalances and a "1d" strategy, the
+    first call after each daily close runs the strategy and the rest of the
+    day's calls get a copy of its weights. Any other strategy may read the
+    forming bar (as `get_history` windows at a coarser frequency do), so its
+    bar is the current base bar and only repeated calls at the same bar are
+    reused. Passing `frequency` to `wrap` declares completed-bar reads at that
+    frequency. Base bars are `context.bar_minutes` long (1 minute for contexts
+    without it).
+
+    The key does not name the data source, so use one memo per context.
+    Entries are evicted least recently used past `max_entries`; `invalidate`
+    drops them explicitly.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def wrap(self, strategy: Callable, frequency: Optional[str] = None) -> Callable:
+        code = code_hash(strategy) or f"id:{id(strategy)}"
+
+        @functools.wraps(strategy)
+        def memoized(context, config_dict: dict) -> dict:
+            step = frequency
+            if step is None:
+                cadence = Cadence.from_config(config_dict)
+                step = cadence.frequency if cadence is not None and cadence.completed_bars else None
+            bar = completed_bar(context, step) if step else pd.Timestamp(context.current_dt).value
+            key = (code, config_hash(config_dict), bar)
+            with self._lock:
+                weights = self._entries.get(key)
+                if weights is not None:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return dict(weights)
+                self.stats["misses"] += 1
+            weights = strategy(context, config_dict) or {}
+            with self._lock:
+                self._entries[key] = dict(weights)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+            return weights
+
+        memoized.memo = self
+        return memoized
+
+    def invalidate(self, strategy: Optional[Callable] = None, config_dict: Optional[dict] = None,
+                   since=None) -> int:
+        """
+        Drop entries of `strategy`, of `config_dict`, and/or for bars at or after
+        `since` (e.g. after late or corrected data); no filter clears everything.
+        Returns the number of entries dropped.
+        """
+        code = None if strategy is None else (code_hash(strategy) or f"id:{id(strategy)}")
+        config = None if config_dict is None else config_hash(config_dict)
+        since_ns = None if since is None else pd.Timestamp(since).value
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (code is None or key[0] == code) and (config is None or key[1] == config)
+                     and (since_ns is None or key[2] >= since_ns)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def completed_bar(context, frequency: str) -> int:
+    """Start (ns) of the last bar at `frequency` that is complete at `context.current_dt`."""
+    step = frequency_to_minutes(frequency) * NS_PER_MINUTE
+    base = getattr(context, "bar_minutes", 1) * NS_PER_MINUTE
+    # The base bar stamped `now` closes at now + base; the bucket holding that close is still forming.
+    return (pd.Timestamp(context.current_dt).value + base) // step * step - step
+
+
+
+def _daily_close(context, config_dict: dict) -> dict:
+    """Latest daily close per asset; with `completed_bars` declared, of the last closed day only."""
+    hist = context.get_history(config_dict["strategy_config"]["assets"], 3, "1d", ["close"])
+    close = hist["close"].unstack(level=0)
+    if (config_dict.get("schedule_config") or {}).get("completed_bars"):
+        close = close[close.index.values.astype("datetime64[ns]").astype("int64") <= completed_bar(context, "1d")]
+    return close.iloc[-1].dropna().to_dict() if len(close) else {}
+
+
+def parity_check(days: int = 5, every: int = 60, num_assets: int = 5, seed: int = 0) -> list:
+    """
+    Call `_daily_close` every `every` minutes over `days` days of a synthetic
+    panel, once through a `StrategyMemo` and once directly, reading the forming
+    daily bar and (declared) only closed ones. Returns one dict per case with
+    calls, mismatching calls and memo hits.
+    """
+    from module.synthetic import synthetic_context
+    context = synthetic_context(num_assets, days * 1440, seed=seed)
+    results = []
+    cases = (("forming bar", {"frequency": "1d"}), ("completed bars", {"frequency": "1d", "completed_bars": True}))
+    for case, schedule in cases:
+        config_dict = {"strategy_config": {"assets": list(context.assets)}, "schedule_config": schedule}
+        memo = StrategyMemo()
+        memoized = memo.wrap(_daily_close)
+        calls = mismatched = 0
+        for cursor in range(0, len(context.times), every):
+            context.cursor = cursor
+            got, want = memoized(context, config_dict), _daily_close(context, config_dict)
+            calls += 1
+            mismatched += got != want
+        results.append({"case": case, "calls": calls, "mismatched": mismatched, "hits": memo.stats["hits"]})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check memoized strategy output against unmemoized calls")
+    parser.add_argument("--check", action="store_true", help="Run the parity check")
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--every", type=int, default=60, help="Minutes between calls")
+    args = parser.parse_args()
+
+    if not args.check:
+        parser.print_help()
+        raise SystemExit(0)
+    results = parity_check(args.days, args.every)
+    for r in results:
+        print(f"{'✅' if r['mismatched'] == 0 else '❌'} {r['case']}: {r['calls']} calls, {r['mismatched']} differ, "
+              f"{r['hits']} memo hits")
+    raise SystemExit(0 if all(r["mismatched"] == 0 for r in results) else 1)
@@ -0,0 +1,272 @@
+# python -m module.mock_exchange --store {STORE_DIR} --port 8080 [--latency_ms 20]
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from module.bar_store import BarStore
+from module.data_context import PanelDataContext
+from module.futures.position import ALL_POSITIONS
+from module.futures.trade import CLOSE_POSITION, PLACE_ORDER
+
+
+class ExchangeError(Exception):
+    """Rejected request; sent back as HTTP 400 with a Bitget-style code and message."""
+
+    def __init__(self, code: str, msg: str):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+
+
+class MockExchange:
+    """
+    Local stand-in for the trading service, filling market orders at the
+    current bar of a replayed `PanelDataContext`.
+
+    Serves the same request/response JSON as the live endpoints:
+        /futures/position/all-positions   {"data": [position, ...]}
+        /futures/trade/close-position     {"data": {"successList": [...], "failureList": [...]}}
+        /futures/trade/place-order        {"data": {"orderId", "clientOid"}}
+    Quantities and prices are strings, as on the live API. The position mode
+    is taken from each order: `tradeSide` means hedge mode (separate long and
+    short legs), its absence one-way mode (one net position per symbol).
+
+    Move the replay with `advance(bar)`; `equity()` marks the book at that bar.
+    `latency` (+ up to `jitter`) seconds are slept before each reply.
+    """
+
+    def __init__(self, context: PanelDataContext, capital: float = 10000, fee_rate: float = 0.0005,
+                 price_field: str = "close", slippage_bps: float = 0.0, latency: float = 0.0, jitter: float = 0.0):
+        self.context = context
+        self.price_field = price_field
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 1e4
+        self.latency, self.jitter = latency, jitter
+        self.cash = float(capital)
+        self.fees = 0.0
+        self.bar = context.cursor
+        self.legs: Dict[tuple, List[float]] = {}   # (symbol, "long"/"short") -> [size, average open price]
+        self.fills: List[dict] = []
+        self._client_oids = set()
+        self._asset_index = {asset: i for i, asset in enumerate(context.assets)}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # --- replay ---
+    def advance(self, bar: int) -> None:
+        with self._lock:
+            self.bar = bar
+
+    def price(self, symbol: str) -> float:
+        i = self._asset_index.get(symbol)
+        if i is None:
+            raise ExchangeError("40034", f"Symbol {symbol} does not exist")
+        values = self.context.fields[self.price_field]
+        # Last traded price at or before the replay bar.
+        column = values[max(self.bar - 10_000, 0):self.bar + 1, i]
+        valid = column[~np.isnan(column)]
+        if not len(valid):
+            raise ExchangeError("40808", f"No price for {symbol}")
+        return float(valid[-1])
+
+    def equity(self) -> float:
+        with self._lock:
+            return self.cash + sum(self._unrealized(symbol, side) for symbol, side in self.legs)
+
+    def _unrealized(self, symbol: str, side: str) -> float:
+        size, average = self.legs[(symbol, side)]
+        move = self.price(symbol) - average
+        return size * move if side == "long" else -size * move
+
+    # --- order handling ---
+    def _fill(self, symbol: str, side: str, hold_side: str, size: float, opening: bool) -> float:
+        """Open or close `size` on one leg at the replay price; returns the fill price."""
+        price = self.price(symbol) * (1 + self.slippage if side == "buy" else 1 - self.slippage)
+        leg = self.legs.get((symbol, hold_side), [0.0, 0.0])
+        if opening:
+            total = leg[0] + size
+            leg = [total, (leg[0] * leg[1] + size * price) / total]
+        else:
+            if size > leg[0] * (1 + 1e-9):
+                raise ExchangeError("22002", f"No position to close: {symbol} {hold_side} {leg[0]} < {size}")
+            size = min(size, leg[0])
+            pnl = (price - leg[1]) * size
+            self.cash += pnl if hold_side == "long" else -pnl
+            leg = [leg[0] - size, leg[1]]
+        fee = size * price * self.fee_rate
+        self.cash -= fee
+        self.fees += fee
+        if leg[0] > 1e-12:
+            self.legs[(symbol, hold_side)] = leg
+        else:
+            self.legs.pop((symbol, hold_side), None)
+        self.fills.append({"bar": self.bar, "symbol": symbol, "side": side, "holdSide": hold_side,
+                           "size": size, "price": price, "fee": fee, "opening": opening})
+        return price
+
+    def place_order(self, body: dict) -> dict:
+        symbol, side = body.get("symbol"), body.get("side")
+        try:
+            size = float(body.get("size", 0))
+        except (TypeError, ValueError):
+            size = 0.0
+        if side not in ("buy", "sell") or size <= 0:
+            raise ExchangeError("40017", f"Invalid side/size: {side} {body.get('size')}")
+        if body.get("orderType", "market") != "market":
+            raise ExchangeError("40017", "Only market orders are filled by the mock exchange")
+        client_oid = body.get("clientOid") or uuid.uuid4().hex
+        with self._lock:
+            if client_oid in self._client_oids:
+                raise ExchangeError("40757", f"Duplicate clientOid {client_oid}")
+            trade_side = body.get("tradeSide")
+            if trade_side:
+                # Hedge mode (Bitget v2): `side` names the leg, `tradeSide` opens or closes it,
+                # so closing a long is buy/close and trades as a sell.
+                hold_side = "long" if side == "buy" else "short"
+                opening = trade_side == "open"
+                direction = side if opening else ("sell" if side == "buy" else "buy")
+                self._fill(symbol, direction, hold_side, size, opening)
+            else:
+                self._one_way(symbol, side, size, body.get("reduceOnly") == "YES")
+            self._client_oids.add(client_oid)
+        return {"orderId": uuid.uuid4().hex[:18], "clientOid": client_oid}
+
+    def _one_way(self, symbol: str, side: str, size: float, reduce_only: bool) -> None:
+        """Net-position order: reduce the opposite leg first, then open the rest on this side."""
+        opposite = "short" if side == "buy" else "long"
+        held = self.legs.get((symbol, opposite), [0.0, 0.0])[0]
+        closing = min(size, held)
+        if reduce_only and size > held * (1 + 1e-9):
+            raise ExchangeError("22002", f"Reduce-only order larger than the {symbol} position")
+        if closing > 0:
+            self._fill(symbol, side, opposite, closing, opening=False)
+        if size - closing > 1e-12 and not reduce_only:
+            self._fill(symbol, side, "long" if side == "buy" else "short", size - closing, opening=True)
+
+    def close_position(self, body: dict) -> dict:
+        symbol, hold_side = body.get("symbol"), body.get("holdSide")
+        success, failure = [], []
+        with self._lock:
+            for leg_symbol, leg_side in list(self.legs):
+                if (symbol and leg_symbol != symbol) or (hold_side and leg_side != hold_side):
+                    continue
+                order_id = uuid.uuid4().hex[:18]
+                try:
+                    self._fill(leg_symbol, "sell" if leg_side == "long" else "buy", leg_side,
+                               self.legs[(leg_symbol, leg_side)][0], opening=False)
+                    success.append({"orderId": order_id, "clientOid": order_id})
+                except ExchangeError as e:
+                    failure.append({"orderId": order_id, "clientOid": order_id, "errorMsg": e.msg, "errorCode": e.code})
+        return {"successList": success, "failureList": failure}
+
+    def all_positions(self, body: dict) -> list:
+        margin_coin = str(body.get("marginCoin", "USDT")).upper()
+        with self._lock:
+            positions = []
+            for (symbol, side), (size, average) in sorted(self.legs.items()):
+                mark = self.price(symbol)
+                positions.append({
+                    "symbol": symbol, "marginCoin": margin_coin, "holdSide": side,
+                    "total": _text(size), "available": _text(size), "locked": "0",
+                    "openPriceAvg": _text(average), "markPrice": _text(mark),
+                    "unrealizedPL": _text(self._unrealized(symbol, side)),
+                })
+        return positions
+
+    # --- HTTP ---
+    ROUTES = {ALL_POSITIONS: "all_positions", CLOSE_POSITION: "close_position", PLACE_ORDER: "place_order"}
+
+    def handle(self, path: str, body: dict) -> tuple:
+        """(HTTP status, response JSON) for one request."""
+        route = self.ROUTES.get(path)
+        if route is None:
+            return 404, {"code": "40404", "msg": f"Unknown path {path}", "data": None}
+        try:
+            data = getattr(self, route)(body)
+        except ExchangeError as e:
+            return 400, {"code": e.code, "msg": e.msg, "data": None}
+        return 200, {"code": "00000", "msg": "success", "requestTime": int(time.time() * 1000), "data": data}
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on a background thread; returns the base URL for `client.configure`."""
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; with Nagle on, each keep-alive
+            # reply would stall on the client's delayed ACK (~40 ms on loopback).
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    body = None
+                if exchange.latency or exchange.jitter:
+                    time.sleep(exchange.latency + random.random() * exchange.jitter)
+                if not isinstance(body, dict):
+                    status, payload = 400, {"code": "40001", "msg": "Body is not a JSON object", "data": None}
+                else:
+                    status, payload = exchange.handle(self.path, body)
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockExchange":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _text(value: float) -> str:
+    return np.format_float_positional(value, precision=8, trim="-")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock futures exchange over replayed bars")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--bar", default=None, help="Replay bar time to fill at (default: last bar)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--latency_ms", type=float, default=0)
+    args = parser.parse_args()
+
+    context = BarStore(args.store).context()
+    if args.bar:
+        context.cursor = int(np.searchsorted(context.times, np.datetime64(args.bar), side="right")) - 1
+    exchange = MockExchange(context, capital=args.capital, latency=args.latency_ms / 1000)
+    url = exchange.start(args.host, args.port)
+    print(f"✅ Mock exchange on {url} at bar {context.current_dt} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        exchange.stop()
@@ -0,0 +1,157 @@
+# python -m module.paper --strategy {STRATEGY_NAME} --store {STORE_DIR} --start 2025-06-10 --end 2025-06-12 [--latency_ms 20]
+
+import argparse
+import importlib
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from module.backtest import load_strategy, rebalance_schedule
+from module.bar_store import BarStore
+from module.cadence import Cadence
+from module.data_context import PanelDataContext, to_datetime64
+from module.futures import client
+from module.futures.rebalance import rebalance
+from module.memo import StrategyMemo
+from module.mock_exchange import ExchangeError, MockExchange
+
+STAGES = ["strategy", "positions", "plan", "submit", "end_to_end"]
+PERCENTILES = [50, 90, 99]
+
+
+@dataclass
+class PaperResult:
+    steps: pd.DataFrame   # one row per rebalance: bar time, seconds per stage, orders, failures, equity
+    acks: pd.DataFrame    # one row per order with its ack latency
+    fills: pd.DataFrame   # fills booked by the mock exchange
+
+    def latency(self) -> pd.DataFrame:
+        """Milliseconds per stage (and per order ack): count, p50, p90, p99, max."""
+        stages = {stage: self.steps[stage] for stage in STAGES if stage in self.steps}
+        if len(self.acks):
+            stages["order_ack"] = self.acks["latency_sec"]
+        rows = {}
+        for stage, seconds in stages.items():
+            values = seconds.dropna().to_numpy() * 1000
+            rows[stage] = {"count": len(values), **{f"p{q}": np.percentile(values, q) if len(values) else np.nan
+                                                    for q in PERCENTILES},
+                           "max": values.max() if len(values) else np.nan}
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def load_system_config(strategy_name: str) -> dict:
+    """
+    `system_config` of `futures/futures_config.py` (position mode, leverage,
+    allocation, ...), with any keys `futures/<name>/<name>_config.py` overrides.
+    """
+    from futures.futures_config import system_config
+    config_module = importlib.import_module(f"futures.{strategy_name}.{strategy_name}_config")
+    return {**system_config, **getattr(config_module, "system_config", {})}
+
+
+def paper_trade(
+    strategy: Callable,
+    config_dict: dict,
+    context: PanelDataContext,
+    system_config: dict,
+    start=None,
+    end=None,
+    capital: float = 10000,
+    fee_rate: float = 0.0005,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    band: float = 0.001,
+    USER_KEY: str = "paper",
+    verbose: bool = False,
+) -> PaperResult:
+    """
+    Replay `context` bar by bar through the live order path against a local
+    `MockExchange`: at every `rebalancing_interval_hours` boundary the exchange
+    moves to the bar close, `strategy(context, config_dict)` runs, and its
+    weights go through `module.futures.rebalance` (positions, plan, orders)
+    over HTTP to the mock, which fills at that bar.
+
+    `end_to_end` is bar close handed to the strategy -> last order acknowledged.
+    `latency` / `jitter` (seconds) are added by the exchange to every reply to
+    stand in for the network. Rebalances off the strategy's declared cadence
+    hold without calling it. The client's base URL is restored afterwards.
+    """
+    times = context.times
+    start = to_datetime64(start) if start is not None else times[0]
+    end = to_datetime64(end) if end is not None else times[-1]
+    interval = (config_dict.get("rebalancing_config") or {}).get("rebalancing_interval_hours", 1)
+    schedule = rebalance_schedule(times, start, end, interval)
+    cadence = Cadence.from_config(config_dict)
+
+    exchange = MockExchange(context, capital=capital, fee_rate=fee_rate, latency=latency, jitter=jitter)
+    previous_url, cursor = client._settings["base_url"], context.cursor
+    steps, acks = [], []
+    client.configure(base_url=exchange.start())
+    try:
+        for bar in schedule:
+            exchange.advance(int(bar))
+            context.cursor = int(bar)
+            started = time.perf_counter()
+            weights = strategy(context, config_dict) if cadence is None or cadence.due(times[bar]) else {}
+            ran = time.perf_counter()
+            step = {"datetime": times[bar], "strategy": ran - started, "orders": 0, "failures": 0}
+            if weights:
+                prices = {}
+                for symbol in weights:
+                    try:
+                        prices[symbol] = exchange.price(symbol)
+                    except ExchangeError:
+                        pass
+                batch, timings = rebalance(USER_KEY, weights, system_config, exchange.equity(),
+                                           prices=prices, band=band)
+                step.update({key: timings[key] for key in ("positions", "plan", "submit", "orders")})
+                step["end_to_end"] = time.perf_counter() - started
+                if len(batch):
+                    step["failures"] = int((batch["result"] != "success").sum())
+                    acks.append(batch.assign(datetime=times[bar]))
+            step["equity"] = exchange.equity()
+            steps.append(step)
+            if verbose:
+                print(f"🔁 {str(times[bar])[:16]} {step['orders']} orders ({step['failures']} failed) "
+                      f"in {step.get('end_to_end', step['strategy']) * 1000:.1f} ms, equity {step['equity']:.2f}")
+    finally:
+        exchange.stop()
+        client.configure(base_url=previous_url)
+        context.cursor = cursor
+
+    return PaperResult(pd.DataFrame(steps), pd.concat(acks, ignore_index=True) if acks else pd.DataFrame(),
+                       pd.DataFrame(exchange.fills))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paper-trade a strategy against a local mock exchange and time each stage")
+    parser.add_argument("--strategy", required=True, help="Strategy name under futures/")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--interval_hours", type=float, default=None, help="Override rebalancing_interval_hours")
+    parser.add_argument("--latency_ms", type=float, default=0, help="Simulated network latency per request")
+    parser.add_argument("--jitter_ms", type=float, default=0, help="Extra uniform random latency per request")
+    parser.add_argument("--memo", action="store_true", help="Reuse the strategy's output until its next bar closes (see StrategyMemo)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    strategy, config_dict = load_strategy(args.strategy)
+    if args.memo:
+        strategy = StrategyMemo().wrap(strategy)
+    if args.interval_hours is not None:
+        config_dict["rebalancing_config"] = {"rebalancing_interval_hours": args.interval_hours}
+    context = BarStore(args.store).context()
+
+    started = time.perf_counter()
+    result = paper_trade(strategy, config_dict, context, load_system_config(args.strategy), start=args.start,
+                         end=args.end, capital=args.capital, latency=args.latency_ms / 1000,
+                         jitter=args.jitter_ms / 1000, verbose=args.verbose)
+    print(f"⏱ {time.perf_counter() - started:.1f}s for {len(result.steps)} rebalances, {len(result.fills)} fills")
+    print(result.latency().round(2).to_string())
+    if len(result.steps):
+        print(f"✅ Final equity {result.steps['equity'].iloc[-1]:.2f}")
@@ -0,0 +1,225 @@
+# python -m module.portfolio --strategies anomarly_vol=0.6 multi_period_momentum=0.4 --store {STORE_DIR}
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from module.backtest import load_strategy, run_backtest
+from module.bar_store import BarStore
+from module.cadence import Cadence
+from module.data_context import DataContext, Panel, PanelDataContext
+from module.futures.rebalance import rebalance
+from module.memo import StrategyMemo
+
+
+@dataclass
+class Sleeve:
+    """One strategy of a portfolio and the share of the book it controls."""
+    name: str
+    strategy: Callable
+    config_dict: dict
+    allocation: float
+    weights: Dict[str, float] = field(default_factory=dict)   # last non-empty target, held on {}
+    cadence: Optional[Cadence] = None                          # default: from config_dict["schedule_config"]
+
+    def __post_init__(self):
+        if self.cadence is None:
+            self.cadence = Cadence.from_config(self.config_dict)
+
+
+class _Requests:
+    """Union of the windows strategies asked for, per frequency: assets, fields and longest window."""
+
+    def __init__(self):
+        self.by_frequency: Dict[str, dict] = {}
+
+    def add(self, assets: list, window: int, frequency: str, fields: list) -> None:
+        entry = self.by_frequency.setdefault(frequency, {"assets": {}, "fields": {}, "window": 0})
+        entry["assets"].update(dict.fromkeys(assets))
+        entry["fields"].update(dict.fromkeys(fields))
+        entry["window"] = max(entry["window"], window)
+
+    def update(self, other: "_Requests") -> None:
+        for frequency, entry in other.by_frequency.items():
+            self.add(list(entry["assets"]), entry["window"], frequency, list(entry["fields"]))
+
+    def covers(self, assets: list, window: int, frequency: str, fields: list) -> bool:
+        entry = self.by_frequency.get(frequency)
+        return (entry is not None and window <= entry["window"]
+                and all(a in entry["assets"] for a in assets) and all(f in entry["fields"] for f in fields))
+
+
+class SnapshotContext(DataContext):
+    """
+    Context handed to every sleeve during one rebalance.
+
+    Windows declared in `requests` are fetched from `inner` once per frequency
+    (one `get_history` covering every sleeve's assets, fields and the longest
+    window) and served from memory. Requests outside the snapshot go to `inner`
+    and are added to `learned` (default: `requests`), so the next rebalance
+    prefetches them too. Shared features (`feature`) are computed once for all
+    sleeves.
+    """
+
+    def __init__(self, inner: DataContext, requests: _Requests, learned: Optional[_Requests] = None):
+        self.inner = inner
+        self.requests = requests
+        self.learned = requests if learned is None else learned
+        self.fetches = 0
+        self._now = inner.current_dt
+        self._panels: Dict[str, PanelDataContext] = {}
+        for frequency, entry in requests.by_frequency.items():
+            hist = inner.get_history(assets=list(entry["assets"]), window=entry["window"], frequency=frequency,
+                                     fields=list(entry["fields"]))
+            self.fetches += 1
+            if not hist.empty:
+                self._panels[frequency] = PanelDataContext.from_frame(hist, frequency=frequency)
+
+    @property
+    def current_dt(self) -> datetime:
+        return self._now
+
+    def get_history(self, assets: list, window: int, frequency: str = "1m", fields: Union[str, list] = 'close') -> pd.DataFrame:
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        panel = self._panels.get(frequency)
+        if panel is not None and self.requests.covers(assets, window, frequency, field_list):
+            return panel.get_history(assets, window, frequency, fields)
+        self.learned.add(assets, window, frequency, field_list)
+        self.fetches += 1
+        return self.inner.get_history(assets=assets, window=window, frequency=frequency, fields=fields)
+
+    def get_panel(self, assets: list, window: int, frequency: str = "1m", fields: Union[str, list] = 'close',
+                  dtype=None) -> Panel:
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        panel = self._panels.get(frequency)
+        if panel is not None and self.requests.covers(assets, window, frequency, field_list):
+            return panel.get_panel(assets, window, frequency, fields, dtype=dtype)
+        return super().get_panel(assets, window, frequency, fields, dtype=dtype)
+
+    def universe(self, top_n: int) -> Optional[List[str]]:
+        # Ranked on the wrapped context, so the daily stats never enter the snapshot.
+        return self.inner.universe(top_n) if hasattr(self.inner, "universe") else None
+
+
+class Portfolio:
+    """
+    Several strategies run as one book.
+
+    Each rebalance makes one data round-trip per frequency in use (see
+    `SnapshotContext`), calls the strategies concurrently, and blends their
+    weight dicts as `sum(allocation * weight)`. A sleeve that returns {} keeps
+    its previous weights. The blended dict is a regular strategy output, so it
+    goes through one `plan_orders`/`submit_orders` batch.
+
+    Sleeves with a `schedule_config` are only called when due, and only their
+    declared window is prefetched for them; windows of the other sleeves are
+    learned from their first calls.
+    """
+
+    def __init__(self, sleeves: List[Sleeve], max_workers: Optional[int] = None):
+        self.sleeves = sleeves
+        self.max_workers = max_workers or len(sleeves)
+        self.requests = _Requests()
+        self.timings: Dict[str, float] = {}
+
+    @classmethod
+    def load(cls, allocations: Dict[str, float], memo: Optional[StrategyMemo] = None, **kwargs) -> "Portfolio":
+        """
+        Sleeves from `futures/<name>/` strategy/config pairs, e.g. {"anomarly_vol": 0.6, ...}.
+        With `memo`, each strategy's output is reused until its next bar closes
+        if its `schedule_config` declares `completed_bars`, else within the bar.
+        """
+        sleeves = []
+        for name, allocation in allocations.items():
+            strategy, config_dict = load_strategy(name)
+            if memo is not None:
+                strategy = memo.wrap(strategy)
+            sleeves.append(Sleeve(name, strategy, config_dict, float(allocation)))
+        return cls(sleeves, **kwargs)
+
+    def weights(self, context: DataContext) -> Dict[str, float]:
+        """Blended target weights at `context.current_dt`."""
+        started = time.perf_counter()
+        now = context.current_dt
+        is_due = [sleeve.cadence is None or sleeve.cadence.due(now) for sleeve in self.sleeves]
+        due = [sleeve for sleeve, ok in zip(self.sleeves, is_due) if ok]
+        declared = [sleeve.cadence.request(sleeve.config_dict) if sleeve.cadence else None for sleeve in due]
+        requests = _Requests()
+        if any(request is None for request in declared):
+            requests.update(self.requests)
+        for request in declared:
+            if request is not None:
+                requests.add(*request)
+        snapshot = SnapshotContext(context, requests, learned=self.requests) if due else None
+        fetched = time.perf_counter()
+
+        def run(sleeve: Sleeve) -> dict:
+            return sleeve.strategy(snapshot, sleeve.config_dict) or {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = iter(list(pool.map(run, due)))
+        targets = [next(results) if ok else {} for ok in is_due]
+        ran = time.perf_counter()
+
+        blended: Dict[str, float] = {}
+        for sleeve, target in zip(self.sleeves, targets):
+            if target:
+                sleeve.weights = target
+            for symbol, weight in sleeve.weights.items():
+                if weight is not None and np.isfinite(weight):
+                    blended[symbol] = blended.get(symbol, 0.0) + sleeve.allocation * weight
+
+        self.timings = {"fetch": fetched - started, "strategies": ran - fetched,
+                        "blend": time.perf_counter() - ran, "fetches": snapshot.fetches if snapshot else 0,
+                        "skipped": len(self.sleeves) - len(due)}
+        return {symbol: weight for symbol, weight in blended.items() if weight != 0}
+
+    def as_strategy(self) -> Callable:
+        """`strategy(context, config_dict)` view of the portfolio, e.g. for `run_backtest`."""
+        def strategy(context: DataContext, config_dict: dict) -> dict:
+            return self.weights(context)
+        return strategy
+
+    def rebalance(self, USER_KEY: str, context: DataContext, system_config: dict, equity: float, **kwargs) -> tuple:
+        """Blend the sleeves and send one netted order batch. Returns (weights, acks, timings)."""
+        weights = self.weights(context)
+        acks, timings = rebalance(USER_KEY, weights, system_config, equity, **kwargs)
+        return weights, acks, {**self.timings, **timings}
+
+
+def parse_allocations(items: List[str]) -> Dict[str, float]:
+    """["anomarly_vol=0.6", "multi_period_momentum=0.4"] -> {name: allocation}; bare names split evenly."""
+    named = [item.partition("=") for item in items]
+    even = 1.0 / len(named) if named else 0.0
+    return {name: float(value) if value else even for name, _, value in named}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest several strategies as one blended book")
+    parser.add_argument("--strategies", nargs="+", required=True, help="name=allocation pairs, e.g. anomarly_vol=0.5")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--leverage", type=float, default=1)
+    parser.add_argument("--interval_hours", type=float, default=1, help="Rebalancing interval")
+    parser.add_argument("--memo", action="store_true", help="Reuse each strategy's output until its next bar closes (see StrategyMemo)")
+    args = parser.parse_args()
+
+    portfolio = Portfolio.load(parse_allocations(args.strategies), memo=StrategyMemo() if args.memo else None)
+    context = BarStore(args.store).context()
+    config_dict = {"rebalancing_config": {"rebalancing_interval_hours": args.interval_hours}}
+
+    started = time.perf_counter()
+    result = run_backtest(portfolio.as_strategy(), config_dict, context, start=args.start, end=args.end,
+                          capital=args.capital, leverage=args.leverage)
+    print(f"⏱ {time.perf_counter() - started:.2f}s for {len(result.rebalance_index)} rebalances "
+          f"({', '.join(f'{s.name}={s.allocation:g}' for s in portfolio.sleeves)})")
+    for key, value in result.summary().items():
+        print(f"  {key:<14} {value:.6g}")
@@ -0,0 +1,327 @@
+# python -m module.resample --check
+
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Aggregation rule used when minute bars are rolled up to a coarser frequency.
+# Fields not listed here take the last value of the bucket.
+AGGREGATION = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+# Levels a pyramid lays out up front, in minutes: 5m, 15m, 1h, 4h, 1d.
+LEVEL_MINUTES = [5, 15, 60, 240, 1440]
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def aggregate(values: np.ndarray, starts: np.ndarray, rule: str) -> np.ndarray:
+    """
+    Roll up (row x asset) `values` into buckets beginning at row positions `starts`.
+
+    NaNs are skipped as in pandas resampling: `first`/`last` take the first/last
+    valid value of the bucket, `max`/`min` ignore NaNs, and each is NaN only
+    when the whole bucket is; `sum` likewise.
+    """
+    if rule == "max":
+        return np.fmax.reduceat(values, starts, axis=0)
+    if rule == "min":
+        return np.fmin.reduceat(values, starts, axis=0)
+    if rule == "sum":
+        summed = np.add.reduceat(np.nan_to_num(values), starts, axis=0)
+        seen = np.add.reduceat(~np.isnan(values), starts, axis=0) > 0
+        return np.where(seen, summed, np.nan)
+    stops = np.r_[starts[1:], len(values)] - 1
+    edge = starts if rule == "first" else stops
+    out = values[edge]
+    missing = np.isnan(out)
+    if missing.any():
+        # Only columns with a NaN at some bucket edge look inside their buckets.
+        columns = missing.any(axis=0) if out.ndim > 1 else slice(None)
+        out[..., columns] = _first_or_last_valid(values[..., columns], starts, stops, rule == "first")
+    return out
+
+
+def _first_or_last_valid(values: np.ndarray, starts: np.ndarray, stops: np.ndarray, first: bool) -> np.ndarray:
+    """Per bucket [starts, stops] and column, the first (or last) non-NaN value, NaN if there is none."""
+    rows = np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+    valid = ~np.isnan(values)
+    if first:
+        # Next valid row at or after each row: a running minimum from the end.
+        seen = np.minimum.accumulate(np.where(valid, rows, len(values))[::-1], axis=0)[::-1][starts]
+        found = seen <= stops.reshape((-1,) + (1,) * (values.ndim - 1))
+    else:
+        # Last valid row at or before each row: a running maximum.
+        seen = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)[stops]
+        found = seen >= starts.reshape((-1,) + (1,) * (values.ndim - 1))
+    picked = np.take_along_axis(values, np.clip(seen, 0, max(len(values) - 1, 0)), axis=0)
+    return np.where(found, picked, np.nan)
+
+
+def bucket_bounds(times: np.ndarray, bucket_ns: int) -> tuple:
+    """(bucket ids, first row, last row) of each epoch-aligned bucket present in sorted `times`."""
+    buckets = times.astype(np.int64) // bucket_ns
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]]) if len(buckets) else np.zeros(0, dtype=np.intp)
+    stops = np.r_[starts[1:], len(buckets)] - 1
+    return buckets[starts], starts, stops
+
+
+def _append(buffer: np.ndarray, length: int, new: np.ndarray) -> np.ndarray:
+    """
+    Write `new` after the first `length` rows of `buffer`, reallocating with
+    doubled capacity when full. Caller-owned arrays are exactly `length` long,
+    so the first append always copies them instead of writing into them.
+    """
+    needed = length + len(new)
+    if needed > len(buffer):
+        grown = np.empty((max(needed, 2 * length, 16),) + buffer.shape[1:], dtype=np.result_type(buffer, new))
+        grown[:length] = buffer[:length]
+        buffer = grown
+    buffer[length:needed] = new
+    return buffer
+
+
+class PyramidLevel:
+    """
+    One resolution of a `BarPyramid`.
+
+    Buffers hold, per bucket, its epoch bucket id, its first/last base rows and
+    the field aggregates (built on first use); only the first `count` rows are
+    valid. The last bucket may be partial.
+    """
+
+    def __init__(self, minutes: int, bucket_ids: np.ndarray, starts: np.ndarray, stops: np.ndarray):
+        self.minutes = minutes
+        self.bucket_ns = minutes * NS_PER_MINUTE
+        self.count = len(starts)
+        self._ids, self._starts, self._stops = bucket_ids, starts, stops
+        self._fields: Dict[str, np.ndarray] = {}
+
+    @property
+    def bucket_ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts[:self.count]
+
+    @property
+    def stops(self) -> np.ndarray:
+        return self._stops[:self.count]
+
+    @property
+    def times(self) -> np.ndarray:
+        return (self.bucket_ids * self.bucket_ns).astype("datetime64[ns]")
+
+    def values(self, name: str) -> Optional[np.ndarray]:
+        values = self._fields.get(name)
+        return None if values is None else values[:self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BarPyramid:
+    """
+    Pre-aggregated coarser bars over a (time x asset) base panel.
+
+    Levels are epoch-aligned like `PanelDataContext` resampling, so each level
+    nests in the coarser ones (4h buckets tile a day). A level is built from the
+    finest built level that divides it, so a daily level costs a pass over 4h
+    bars rather than over minutes. `extend` folds newly arrived base rows into
+    every level, updating the partial last bucket, in time proportional to the
+    new rows.
+
+    `window` serves "last N buckets as of base row `cursor`": complete buckets
+    come straight from the level; the cursor's own bucket is re-aggregated from
+    base rows up to the cursor, so nothing after the cursor leaks in.
+    """
+
+    def __init__(self, times: np.ndarray, fields: Dict[str, np.ndarray], levels: Optional[List[int]] = None):
+        self.length = len(times)
+        self._times = np.asarray(times, dtype="datetime64[ns]")
+        self._base = dict(fields)
+        self.levels: Dict[int, PyramidLevel] = {}
+        for minutes in LEVEL_MINUTES if levels is None else levels:
+            self.level(minutes)
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self.length]
+
+    def base(self, name: str) -> np.ndarray:
+        return self._base[name][:self.length]
+
+    # --- building ---
+    def level(self, minutes: int) -> PyramidLevel:
+        """The level of `minutes`-wide buckets, built on first request."""
+        level = self.levels.get(minutes)
+        if level is None:
+            level = PyramidLevel(minutes, *bucket_bounds(self.times, minutes * NS_PER_MINUTE))
+            self.levels = dict(sorted({**self.levels, minutes: level}.items()))
+        return level
+
+    def field(self, minutes: int, name: str) -> np.ndarray:
+        """(bucket x asset) aggregate of `name` at `minutes`, built on first request."""
+        level = self.level(minutes)
+        values = level.values(name)
+        if values is None:
+            rule = AGGREGATION.get(name, "last")
+            sources = [m for m, lvl in self.levels.items()
+                       if m < minutes and minutes % m == 0 and lvl.values(name) is not None]
+            if not len(level):
+                values = self.base(name)[:0]
+            elif sources:
+                source = self.levels[max(sources)]
+                # Each bucket starts at the source bucket holding its first base row.
+                values = aggregate(source.values(name), np.searchsorted(source.starts, level.starts), rule)
+            else:
+                values = aggregate(self.base(name), level.starts, rule)
+            level._fields[name] = values
+        return values
+
+    # --- incremental updates ---
+    def extend(self, times: np.ndarray, fields: Dict[str, np.ndarray]) -> None:
+        """
+        Append base rows strictly after the current last row and fold them into
+        every level. `fields` must cover every base field.
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        if not len(times):
+            return
+        offset = self.length
+        self._times = _append(self._times, offset, times)
+        for name in self._base:
+            self._base[name] = _append(self._base[name], offset, np.asarray(fields[name]))
+        self.length += len(times)
+
+        for level in self.levels.values():
+            ids, starts, stops = bucket_bounds(times, level.bucket_ns)
+            starts, stops = starts + offset, stops + offset
+            merge = level.count > 0 and ids[0] == level.bucket_ids[-1]
+            for name in list(level._fields):
+                rule = AGGREGATION.get(name, "last")
+                new = aggregate(self.base(name)[offset:], starts - offset, rule)
+                values = level._fields[name]
+                if merge:
+                    values[level.count - 1] = _combine(values[level.count - 1], new[0], rule)
+                    new = new[1:]
+                level._fields[name] = _append(values, level.count, new)
+            if merge:
+                level._stops[level.count - 1] = stops[0]
+                ids, starts, stops = ids[1:], starts[1:], stops[1:]
+            level._ids = _append(level._ids, level.count, ids)
+            level._starts = _append(level._starts, level.count, starts)
+            level._stops = _append(level._stops, level.count, stops)
+            level.count += len(ids)
+
+    # --- reading ---
+    def window(self, minutes: int, cursor: int, window: int, names: List[str], columns=slice(None)) -> tuple:
+        """
+        (bucket times, [bucket x asset block per field]) for the last `window`
+        `minutes`-wide buckets, ending with the bucket that holds base row `cursor`.
+        """
+        level = self.level(minutes)
+        if cursor < 0 or not len(level):
+            return level.times[:0], [self.base(name)[:0, columns] for name in names]
+
+        current = int(np.searchsorted(level.starts, cursor, side="right")) - 1
+        first = int(np.searchsorted(level.bucket_ids, level.bucket_ids[current] - window + 1, side="left"))
+        times = (level.bucket_ids[first:current + 1] * level.bucket_ns).astype("datetime64[ns]")
+
+        complete = level.stops[current] <= cursor
+        blocks = []
+        for name in names:
+            values = self.field(minutes, name)
+            if complete:
+                blocks.append(values[first:current + 1, columns])
+                continue
+            rows = self.base(name)[level.starts[current]:cursor + 1, columns]
+            partial = aggregate(rows, np.zeros(1, dtype=np.intp), AGGREGATION.get(name, "last"))
+            blocks.append(np.concatenate([values[first:current, columns], partial]))
+        return times, blocks
+
+
+def _combine(old: np.ndarray, new: np.ndarray, rule: str) -> np.ndarray:
+    """Merge the aggregate of a bucket's earlier rows (`old`) with that of its later rows (`new`)."""
+    if rule == "first":
+        return np.where(np.isnan(old), new, old)
+    if rule == "max":
+        return np.fmax(old, new)
+    if rule == "min":
+        return np.fmin(old, new)
+    if rule == "sum":
+        return np.where(np.isnan(old), new, np.where(np.isnan(new), old, old + new))
+    return np.where(np.isnan(new), old, new)
+
+
+# --- Check against pandas ---
+def differential_check(num_assets: int = 8, bars: int = 3000, seed: int = 0, levels: Optional[List[int]] = None,
+                       extend_at: int = 1000, rtol: float = 1e-12) -> list:
+    """
+    Aggregate a minute panel with NaNs placed on bucket edges (first and last
+    minute of hours and days, whole missing buckets) through `BarPyramid` -
+    built on the first `extend_at` rows, then `extend`ed with the rest - and
+    compare every level and field with pandas `resample(...).agg(...)`.
+    Returns one dict per (level, field) with the NaN mismatches and the largest
+    relative difference (sums differ from pandas by the order of addition).
+    """
+    rng = np.random.default_rng(seed)
+    times = np.datetime64("2025-01-01T00:00", "ns") + np.arange(bars) * np.timedelta64(60, "s")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, (bars, num_assets)), axis=0))
+    fields = {"open": close * (1 + rng.normal(0, 1e-4, close.shape)), "high": close * 1.001, "low": close * 0.999,
+              "close": close, "volume": rng.uniform(0, 100, close.shape)}
+    minute = np.arange(bars)
+    edges = (minute % 60 == 0) | (minute % 60 == 59) | (minute % 1440 == 0) | (minute % 1440 == 1439)
+    for name, values in fields.items():
+        gaps = (rng.random(values.shape) < 0.02) | (edges[:, None] & (rng.random(values.shape) < 0.5))
+        gaps[120:240, 0] = True   # two whole missing hours
+        values[gaps] = np.nan
+
+    pyramid = BarPyramid(times[:extend_at], {name: values[:extend_at] for name, values in fields.items()}, levels=levels)
+    for name in fields:
+        for minutes in pyramid.levels:
+            pyramid.field(minutes, name)
+    pyramid.extend(times[extend_at:], {name: values[extend_at:] for name, values in fields.items()})
+
+    results = []
+    for minutes, level in pyramid.levels.items():
+        for name, values in fields.items():
+            frame = pd.DataFrame(values, index=pd.DatetimeIndex(times))
+            want = frame.resample(f"{minutes}min").agg(AGGREGATION.get(name, "last"))
+            if name == "volume":
+                want = want.where(frame.notna().resample(f"{minutes}min").sum() > 0)
+            want = want.reindex(pd.DatetimeIndex(level.times)).to_numpy()
+            got = pyramid.field(minutes, name)
+            nan_mismatch = int((np.isnan(got) != np.isnan(want)).sum())
+            both = ~np.isnan(got) & ~np.isnan(want)
+            error = np.abs(got - want) / np.maximum(np.abs(want), 1.0)
+            worst = float(error[both].max()) if both.any() else 0.0
+            results.append({"minutes": minutes, "field": name, "nan_mismatch": nan_mismatch, "max_rel_error": worst,
+                            "passed": nan_mismatch == 0 and worst <= rtol})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check bar pyramid aggregation against pandas resampling")
+    parser.add_argument("--check", action="store_true", help="Run the differential check")
+    parser.add_argument("--assets", type=int, default=8)
+    parser.add_argument("--bars", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.check:
+        parser.print_help()
+        raise SystemExit(0)
+    results = differential_check(args.assets, args.bars, args.seed)
+    for r in results:
+        print(f"{'✅' if r['passed'] else '❌'} {r['minutes']:>5}m {r['field']:<7} "
+              f"nan_mismatch={r['nan_mismatch']:<4} err={r['max_rel_error']:.2e}")
+    raise SystemExit(0 if all(r["passed"] for r in results) else 1)
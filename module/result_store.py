@@ -0,0 +1,271 @@
+# python -m module.result_store --root {RESULTS_DIR} --strategy anomarly_vol --param long_vol_window=60 --order_by sharpe
+
+import argparse
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from module.backtest import BacktestResult
+
+CATALOG_FILE = "catalog.sqlite"
+RUNS_DIR = "runs"
+
+# Arrays of a `BacktestResult`, one compressed member each in the run's .npz.
+ARRAYS = ["times", "equity", "leverage", "rebalance_index", "weights", "positions", "turnover", "fees"]
+METRICS = ["total_return", "sharpe", "max_drawdown", "avg_leverage", "avg_turnover", "total_fees", "rebalances"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    code_hash TEXT,
+    start TEXT,
+    end TEXT,
+    bar_minutes INTEGER,
+    num_assets INTEGER,
+    {", ".join(f"{name} {'INTEGER' if name == 'rebalances' else 'REAL'}" for name in METRICS)},
+    config TEXT,
+    metrics TEXT,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (strategy, config_hash, code_hash, start, end);
+CREATE INDEX IF NOT EXISTS runs_sharpe ON runs (strategy, sharpe);
+CREATE TABLE IF NOT EXISTS params (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value
+);
+CREATE INDEX IF NOT EXISTS params_key ON params (key, value, run_id);
+CREATE INDEX IF NOT EXISTS params_run ON params (run_id);
+"""
+
+
+def config_hash(config_dict: dict) -> str:
+    """Stable short hash of a config dict (key order does not matter)."""
+    return hashlib.sha256(json.dumps(config_dict, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def code_hash(strategy: Union[str, Callable]) -> Optional[str]:
+    """Short hash of the source file of a strategy function (unwrapping decorators), or of `futures/<name>/<name>.py`."""
+    if callable(strategy):
+        path = inspect.getsourcefile(inspect.unwrap(strategy))
+    else:
+        spec = importlib.util.find_spec(f"futures.{strategy}.{strategy}")
+        path = spec.origin if spec is not None else None
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def flatten_params(config_dict: dict) -> Dict[str, Union[int, float, str]]:
+    """Scalar `strategy_config` / `rebalancing_config` entries, keyed by name, for the params index."""
+    params = {}
+    for section in ("strategy_config", "rebalancing_config"):
+        for key, value in (config_dict.get(section) or {}).items():
+            if isinstance(value, bool):
+                params[key] = int(value)
+            elif isinstance(value, (int, float, str)):
+                params[key] = value
+    return params
+
+
+def _stamp(value) -> Optional[str]:
+    return None if value is None else str(np.datetime64(value, "s")).replace("T", " ")
+
+
+class ResultStore:
+    """
+    Backtest results on disk with an SQLite catalog.
+
+    Layout of a store directory:
+        catalog.sqlite     one `runs` row per run (strategy, config/code hashes,
+                           date range, headline metrics, config JSON) and one
+                           `params` row per scalar config entry
+        runs/<run_id>.npz  the run's arrays, each a separately compressed member
+
+    Queries only touch the indexed catalog; `column` / `equity_curves`
+    decompress just the arrays asked for.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, RUNS_DIR), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, CATALOG_FILE), timeout=30)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    # --- writing ---
+    def save(self, result: BacktestResult, strategy: str, config_dict: Optional[dict] = None,
+             code: Union[str, Callable, None] = None, metrics: Optional[dict] = None) -> str:
+        """
+        Store `result` and return its run id. `code` is the strategy function (or
+        name) whose source is hashed; it defaults to `futures/<strategy>/`.
+        `metrics` are extra numbers (e.g. a tearsheet's) kept as JSON.
+        """
+        config_dict = result.config if config_dict is None else config_dict
+        created = datetime.now()
+        run_id = f"{strategy}-{created:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(RUNS_DIR, f"{run_id}.npz")
+
+        arrays = {name: getattr(result, name) for name in ARRAYS}
+        arrays["times"] = np.asarray(result.times, dtype="datetime64[ns]").view(np.int64)
+        arrays["assets"] = np.asarray(result.assets, dtype=str)
+        tmp = os.path.join(self.root, path + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, os.path.join(self.root, path))
+
+        summary = result.summary()
+        times = result.times
+        row = {
+            "run_id": run_id,
+            "created": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "strategy": strategy,
+            "config_hash": config_hash(config_dict),
+            "code_hash": code_hash(code if code is not None else strategy),
+            "start": _stamp(times[0]) if len(times) else None,
+            "end": _stamp(times[-1]) if len(times) else None,
+            "bar_minutes": result.bar_minutes,
+            "num_assets": len(result.assets),
+            **{name: summary.get(name) for name in METRICS},
+            "config": json.dumps(config_dict, default=str),
+            "metrics": json.dumps(metrics or {}, default=float),
+            "path": path,
+        }
+        with self._db:
+            self._db.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                             list(row.values()))
+            self._db.executemany("INSERT INTO params (run_id, key, value) VALUES (?, ?, ?)",
+                                 [(run_id, key, value) for key, value in flatten_params(config_dict).items()])
+        return run_id
+
+    def delete(self, run_id: str) -> None:
+        path = self._path(run_id)
+        with self._db:
+            self._db.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    # --- querying ---
+    def query(self, strategy: Optional[str] = None, params: Optional[dict] = None, config_hash: Optional[str] = None,
+              code_hash: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+              order_by: str = "sharpe", descending: bool = True, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Catalog rows matching every given filter, e.g.
+        `query("anomarly_vol", params={"long_vol_window": 60})` sorted by Sharpe.
+        `start` / `end` keep runs covering at least [start, end].
+        """
+        if order_by not in METRICS + ["created", "start", "end", "strategy"]:
+            raise ValueError(f"Cannot order by {order_by!r}")
+        clauses, values = [], []
+        for column, value in (("strategy", strategy), ("config_hash", config_hash), ("code_hash", code_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                values.append(value)
+        if start is not None:
+            clauses.append("start <= ?")
+            values.append(_stamp(np.datetime64(pd.Timestamp(start))))
+        if end is not None:
+            clauses.append("end >= ?")
+            values.append(_stamp(np.datetime64(pd.Timestamp(end))))
+        for key, value in (params or {}).items():
+            clauses.append("run_id IN (SELECT run_id FROM params WHERE key = ? AND value = ?)")
+            values += [key, int(value) if isinstance(value, bool) else value]
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} IS NULL, {order_by} {'DESC' if descending else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, self._db, params=values)
+
+    def find(self, strategy: str, config_dict: dict, code: Union[str, Callable, None] = None,
+             start: Optional[str] = None, end: Optional[str] = None) -> Optional[str]:
+        """Most recent run of exactly this strategy code, config and first/last bar, if one is stored."""
+        runs = self.query(strategy, config_hash=config_hash(config_dict),
+                          code_hash=code_hash(code if code is not None else strategy), order_by="created")
+        for column, value in (("start", start), ("end", end)):
+            if value is not None:
+                runs = runs[runs[column] == _stamp(np.datetime64(pd.Timestamp(value)))]
+        return runs["run_id"].iloc[0] if len(runs) else None
+
+    # --- loading ---
+    def _path(self, run_id: str) -> Optional[str]:
+        row = self._db.execute("SELECT path FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return os.path.join(self.root, row[0]) if row else None
+
+    def column(self, run_id: str, name: str) -> np.ndarray:
+        """One array of a run (`ARRAYS` or "assets"), decompressing only that member."""
+        path = self._path(run_id)
+        if path is None:
+            raise KeyError(run_id)
+        with np.load(path) as arrays:
+            values = arrays[name]
+        return values.view("datetime64[ns]") if name == "times" else values
+
+    def load(self, run_id: str) -> BacktestResult:
+        row = self._db.execute("SELECT bar_minutes, config FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        with np.load(self._path(run_id)) as arrays:
+            values = {name: arrays[name] for name in ARRAYS}
+            assets = arrays["assets"].tolist()
+        values["times"] = values["times"].view("datetime64[ns]")
+        return BacktestResult(assets=assets, bar_minutes=row[0], config=json.loads(row[1]), **values)
+
+    def equity_curves(self, run_ids: Iterable[str]) -> pd.DataFrame:
+        """Equity of each run as one column, on the union of their bar times (for overlays)."""
+        curves = {}
+        for run_id in run_ids:
+            with np.load(self._path(run_id)) as arrays:
+                curves[run_id] = pd.Series(arrays["equity"], index=pd.DatetimeIndex(arrays["times"].view("datetime64[ns]")))
+        return pd.DataFrame(curves)
+
+    def trades(self, run_id: str) -> pd.DataFrame:
+        """Units traded per asset at each rebalance (long: datetime, asset, units), from the stored positions."""
+        with np.load(self._path(run_id)) as arrays:
+            times = arrays["times"].view("datetime64[ns]")
+            index, positions, assets = arrays["rebalance_index"], arrays["positions"], arrays["assets"]
+        traded = np.diff(np.vstack([np.zeros((1, positions.shape[1])), positions]), axis=0)
+        rows, cols = np.nonzero(traded)
+        return pd.DataFrame({"datetime": times[index[rows]], "asset": assets[cols], "units": traded[rows, cols]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query stored backtest runs")
+    parser.add_argument("--root", required=True, help="Result store directory")
+    parser.add_argument("--strategy", default=None)
+    parser.add_argument("--param", nargs="*", default=[], help="key=value filters on strategy_config, e.g. long_vol_window=60")
+    parser.add_argument("--order_by", default="sharpe")
+    parser.add_argument("--ascending", action="store_true")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    filters = {}
+    for item in args.param:
+        key, _, value = item.partition("=")
+        try:
+            filters[key] = json.loads(value)
+        except ValueError:
+            filters[key] = value
+    store = ResultStore(args.root)
+    runs = store.query(args.strategy, params=filters, order_by=args.order_by, descending=not args.ascending,
+                       limit=args.limit)
+    print(runs.drop(columns=["config", "metrics", "path"]).to_string(index=False))
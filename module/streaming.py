@@ -0,0 +1,273 @@
+# python -m module.streaming --check --assets 67 --bars 5000
+
+import argparse
+import weakref
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from module.weights import select_weights
+
+
+class RollingWindow:
+    """
+    Fixed-length rolling window over a stream of cross-sectional rows.
+
+    Keeps a (window x asset) ring buffer plus running sums, sums of squares and
+    NaN counts, so each `push` costs O(assets) regardless of the window length.
+    Statistics are NaN until an asset has `window` consecutive valid values,
+    which matches pandas' `rolling(window, min_periods=window)`.
+    """
+
+    def __init__(self, num_assets: int, window: int, resync_every: Optional[int] = None):
+        self.window = window
+        self.buffer = np.full((window, num_assets), np.nan)
+        self.sum = np.zeros(num_assets)
+        self.sumsq = np.zeros(num_assets)
+        self.nans = np.full(num_assets, window, dtype=np.int64)
+        self.position = 0
+        # Running sums drift after many add/subtract steps; re-sum the buffer periodically.
+        self.resync_every = resync_every or max(window * 64, 4096)
+        self._since_resync = 0
+
+    def push(self, row: np.ndarray) -> None:
+        old = self.buffer[self.position]
+        old_valid = np.isfinite(old)
+        new_valid = np.isfinite(row)
+
+        self.sum -= np.where(old_valid, old, 0.0)
+        self.sumsq -= np.where(old_valid, old * old, 0.0)
+        self.sum += np.where(new_valid, row, 0.0)
+        self.sumsq += np.where(new_valid, row * row, 0.0)
+        self.nans += (~new_valid).astype(np.int64) - (~old_valid).astype(np.int64)
+
+        self.buffer[self.position] = row
+        self.position = (self.position + 1) % self.window
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self.resync()
+
+    def resync(self) -> None:
+        """Recompute the running sums exactly from the ring buffer."""
+        valid = np.where(np.isfinite(self.buffer), self.buffer, 0.0)
+        self.sum = valid.sum(axis=0)
+        self.sumsq = (valid * valid).sum(axis=0)
+        self._since_resync = 0
+
+    @property
+    def full(self) -> np.ndarray:
+        return self.nans == 0
+
+    def mean(self) -> np.ndarray:
+        return np.where(self.full, self.sum / self.window, np.nan)
+
+    def std(self) -> np.ndarray:
+        """Sample standard deviation (ddof=1), as pandas' rolling std."""
+        n = self.window
+        if n < 2:
+            return np.full(self.sum.shape, np.nan)
+        var = (self.sumsq - self.sum * self.sum / n) / (n - 1)
+        return np.where(self.full, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+
+class AnomalyVolEngine:
+    """
+    Streaming version of the `anomarly_vol` volatility signal.
+
+    Per minute bar and asset:
+        returns  = close.pct_change(1)
+        vol_short = returns.rolling(short_vol_window).std()
+        vol_long  = vol_short.rolling(long_vol_window).mean()
+        zvol      = (vol_short - vol_long) / (vol_long + epsilon)
+
+    `update` consumes one close row and returns the current `zvol` row, so the
+    per-rebalance cost no longer depends on the lookback length.
+    """
+
+    def __init__(self, assets: list, short_vol_window: int = 20, long_vol_window: int = 60, epsilon: float = 1e-10):
+        self.assets = list(assets)
+        self.epsilon = epsilon
+        self.last_close = np.full(len(self.assets), np.nan)
+        self.returns = RollingWindow(len(self.assets), short_vol_window)
+        self.vol_short = RollingWindow(len(self.assets), long_vol_window)
+        self.zvol = np.full(len(self.assets), np.nan)
+        self.bars = 0
+
+    @classmethod
+    def from_config(cls, strategy_config: dict) -> "AnomalyVolEngine":
+        return cls(
+            strategy_config.get("assets", []),
+            short_vol_window=strategy_config.get("short_vol_window", 20),
+            long_vol_window=strategy_config.get("long_vol_window", 60),
+        )
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars needed before `zvol` can be non-NaN."""
+        return self.returns.window + self.vol_short.window
+
+    def update(self, close: np.ndarray) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = close / self.last_close - 1
+        self.last_close = close
+
+        self.returns.push(ret)
+        vol_short = self.returns.std()
+        self.vol_short.push(vol_short)
+        vol_long = self.vol_short.mean()
+
+        self.zvol = (vol_short - vol_long) / (vol_long + self.epsilon)
+        self.bars += 1
+        return self.zvol
+
+    def update_many(self, closes: np.ndarray) -> np.ndarray:
+        """Feed a (bars x asset) block in time order; returns the zvol row after the last bar."""
+        for row in np.asarray(closes, dtype=np.float64):
+            self.update(row)
+        return self.zvol
+
+    def signal(self, clip_threshold: float = 2.0) -> pd.Series:
+        """Clipped, inverted signal for the latest bar, indexed by asset (NaN dropped)."""
+        signal = pd.Series(np.clip(-self.zvol, -clip_threshold, clip_threshold), index=self.assets)
+        return signal.dropna()
+
+
+def streaming_strategy() -> Callable:
+    """
+    `futures/anomarly_vol` as a drop-in `strategy(context, config_dict)` backed
+    by `AnomalyVolEngine`. On contexts with a bar panel (`fields` / `cursor`)
+    one engine per context and (assets, windows) is fed only the close rows
+    since its previous call, so a replay costs O(assets) per bar however long
+    the windows are; engines go away with their context.
+
+    The first call feeds the same short_vol_window + long_vol_window + 5 bars
+    the pandas path fetches; after that the signal equals the pandas one up to
+    rounding. Calls that move the cursor back restart the engine. Other
+    contexts get a fresh engine over that window from `get_history` per call.
+    """
+    engines: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()   # context -> {key: [engine, next row]}
+
+    def strategy(context, config_dict: dict) -> dict:
+        params = config_dict.get("strategy_config", {})
+        assets = params.get("assets", [])
+        universe_size = params.get("universe_size")
+        if universe_size and hasattr(context, "universe"):
+            assets = context.universe(universe_size) or assets
+        if not assets:
+            return {}
+        short_vol_window, long_vol_window = params.get("short_vol_window", 20), params.get("long_vol_window", 60)
+        clip_threshold, max_positions = params.get("clip_threshold", 2.0), params.get("max_positions", 6)
+        if not hasattr(context, "fields") or not hasattr(context, "cursor"):
+            return _history_weights(context, assets, short_vol_window, long_vol_window, clip_threshold, max_positions)
+
+        columns = {asset: i for i, asset in enumerate(context.assets)}
+        assets = [asset for asset in assets if asset in columns]
+        if not assets:
+            return {}
+        states = engines.setdefault(context, {})
+        key = (tuple(assets), short_vol_window, long_vol_window)
+        state = states.get(key)
+        cursor = context.cursor
+        if state is None or cursor + 1 < state[1]:
+            engine = AnomalyVolEngine(assets, short_vol_window, long_vol_window)
+            state = states[key] = [engine, max(cursor + 1 - (engine.warmup_bars + 5), 0)]
+        engine, start = state
+        if cursor + 1 > start:
+            engine.update_many(context.fields["close"][start:cursor + 1, [columns[asset] for asset in engine.assets]])
+            state[1] = cursor + 1
+        return select_weights(engine.signal(clip_threshold), max_positions)
+
+    return strategy
+
+
+def _history_weights(context, assets: list, short_vol_window: int, long_vol_window: int, clip_threshold: float,
+                     max_positions: int) -> dict:
+    """One engine pass over the window the pandas strategy fetches with `get_history`."""
+    hist = context.get_history(assets=assets, window=short_vol_window + long_vol_window + 5, frequency="1m",
+                              fields=["close"])
+    if hist.empty:
+        return {}
+    close = hist["close"].unstack(level=0)
+    tradable = [asset for asset in assets if asset in close.columns]
+    if not tradable:
+        return {}
+    engine = AnomalyVolEngine(tradable, short_vol_window, long_vol_window)
+    engine.update_many(close[tradable].to_numpy(dtype=np.float64))
+    return select_weights(engine.signal(clip_threshold), max_positions)
+
+
+class HistoryOnly:
+    """A context exposing only `get_history`, so strategies take their plain pandas path."""
+
+    def __init__(self, context):
+        self.context = context
+
+    def get_history(self, *args, **kwargs) -> pd.DataFrame:
+        return self.context.get_history(*args, **kwargs)
+
+
+def parity_check(num_assets: int = 67, bars: int = 5000, every: int = 60, seed: int = 0, **strategy_config) -> dict:
+    """
+    Run `streaming_strategy` (on the panel and, via `HistoryOnly`, on
+    `get_history`) and the `anomarly_vol` strategy on its pandas path
+    (`HistoryOnly`) against the strategy on its `context.feature` path every
+    `every` bars of a synthetic panel. Returns the number of rebalances and,
+    per path, those whose chosen assets differ and the largest weight difference.
+    """
+    from futures.anomarly_vol.anomarly_vol import strategy as anomaly_vol
+    from module.synthetic import synthetic_context
+    context = synthetic_context(num_assets, bars, seed=seed)
+    config_dict = {"strategy_config": dict({"assets": list(context.assets), "short_vol_window": 20,
+                                            "long_vol_window": 60, "clip_threshold": 2.0}, **strategy_config)}
+    streaming = streaming_strategy()
+    paths = {"streaming": streaming,
+             "streaming_history": lambda context, config_dict: streaming(HistoryOnly(context), config_dict),
+             "pandas": lambda context, config_dict: anomaly_vol(HistoryOnly(context), config_dict)}
+    result = {"rebalances": 0, **{path: {"mismatched": 0, "max_weight_diff": 0.0} for path in paths}}
+    for cursor in range(every - 1, bars, every):
+        context.cursor = cursor
+        want = anomaly_vol(context, config_dict)
+        result["rebalances"] += 1
+        for path, strategy in paths.items():
+            got, stats = strategy(context, config_dict), result[path]
+            if got.keys() != want.keys():
+                stats["mismatched"] += 1
+                continue
+            stats["max_weight_diff"] = max([stats["max_weight_diff"]] + [abs(got[asset] - want[asset]) for asset in want])
+    return result
+
+
+def reference_zvol(close: pd.DataFrame, short_vol_window: int = 20, long_vol_window: int = 60,
+                   epsilon: float = 1e-10) -> pd.DataFrame:
+    """The pandas computation from `futures/anomarly_vol/anomarly_vol.py`, for cross-checking."""
+    returns = close.pct_change(1)
+    vol_short = returns.rolling(window=short_vol_window, min_periods=short_vol_window).std()
+    vol_long = vol_short.rolling(window=long_vol_window, min_periods=long_vol_window).mean()
+    return (vol_short - vol_long) / (vol_long + epsilon)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the streaming engine and the pandas path of anomarly_vol against its feature path")
+    parser.add_argument("--check", action="store_true", help="Run the parity check")
+    parser.add_argument("--assets", type=int, default=67)
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--every", type=int, default=60, help="Bars between rebalances")
+    parser.add_argument("--long_vol_window", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.check:
+        parser.print_help()
+        raise SystemExit(0)
+    result = parity_check(args.assets, args.bars, args.every, args.seed, long_vol_window=args.long_vol_window)
+    passed = True
+    for path in ("streaming", "streaming_history", "pandas"):
+        stats = result[path]
+        ok = stats["mismatched"] == 0 and stats["max_weight_diff"] <= 1e-9
+        passed &= ok
+        print(f"{'✅' if ok else '❌'} {path} vs feature path: {result['rebalances']} rebalances, "
+              f"{stats['mismatched']} with different assets, max weight difference {stats['max_weight_diff']:.2e}")
+    raise SystemExit(0 if passed else 1)
@@ -0,0 +1,260 @@
+# python -m module.sweep --strategy {STRATEGY_NAME} --store {STORE_DIR} --grid '{"short_vol_window": [10, 20, 30]}'
+
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from module.backtest import load_strategy, run_backtest
+from module.bar_store import BarStore
+from module.data_context import PanelDataContext
+from module.result_store import ResultStore
+from module.tearsheet import tearsheet, write_report
+
+# Columns of `BacktestResult.summary()`, fixed up front so the streamed CSV header
+# does not depend on whether the first finished combination succeeded.
+METRIC_COLUMNS = ["total_return", "sharpe", "max_drawdown", "avg_leverage", "avg_turnover", "total_fees", "rebalances"]
+
+
+def param_grid(grid: Dict[str, list]) -> List[dict]:
+    """Every combination of the values in `grid`, e.g. {"a": [1, 2], "b": [3]} -> [{a:1,b:3}, {a:2,b:3}]."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_search(space: Dict[str, Union[list, tuple]], n: int, seed: int = 0) -> List[dict]:
+    """
+    `n` random draws from `space`. Lists are sampled as choices; (low, high)
+    tuples are sampled uniformly (as ints when both bounds are ints).
+    """
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(n):
+        combo = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                combo[key] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                combo[key] = rng.choice(values)
+        combos.append(combo)
+    return combos
+
+
+def apply_params(config_dict: dict, params: dict) -> dict:
+    """
+    Copy of `config_dict` with `params` applied to `strategy_config`.
+    Dotted keys ("rebalancing_config.rebalancing_interval_hours") address other sections.
+    """
+    config = copy.deepcopy(config_dict)
+    for key, value in params.items():
+        section, _, name = key.rpartition(".")
+        config.setdefault(section or "strategy_config", {})[name] = value
+    return config
+
+
+class SharedPanel:
+    """
+    Bars copied once into `multiprocessing.shared_memory` blocks.
+
+    `spec` is a small picklable description; workers call `SharedPanel.attach(spec)`
+    to map the same memory instead of receiving the arrays through pickling.
+    """
+
+    def __init__(self, spec: dict, blocks: Dict[str, shared_memory.SharedMemory], owner: bool):
+        self.spec = spec
+        self._blocks = blocks
+        self._owner = owner
+
+    @classmethod
+    def from_context(cls, context: PanelDataContext) -> "SharedPanel":
+        arrays = {"__times__": context.times.astype(np.int64)}
+        arrays.update(context.fields)
+
+        blocks, layout = {}, {}
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+            blocks[name] = block
+            layout[name] = {"shm": block.name, "shape": values.shape, "dtype": values.dtype.str}
+
+        spec = {"assets": list(context.assets), "frequency": context.frequency, "layout": layout}
+        return cls(spec, blocks, owner=True)
+
+    @classmethod
+    def attach(cls, spec: dict) -> "SharedPanel":
+        blocks = {name: shared_memory.SharedMemory(name=item["shm"]) for name, item in spec["layout"].items()}
+        return cls(spec, blocks, owner=False)
+
+    def context(self) -> PanelDataContext:
+        arrays = {
+            name: np.ndarray(tuple(item["shape"]), dtype=np.dtype(item["dtype"]), buffer=self._blocks[name].buf)
+            for name, item in self.spec["layout"].items()
+        }
+        times = arrays.pop("__times__").view("datetime64[ns]")
+        return PanelDataContext(times, self.spec["assets"], arrays, frequency=self.spec["frequency"])
+
+    def close(self) -> None:
+        for block in self._blocks.values():
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = {}
+
+
+# Per-process state of pool workers started by `open_pool`: context, strategy, name, results.
+worker = {}
+
+
+def init_worker(source: dict, strategy_name: str, results_dir: Optional[str] = None) -> None:
+    if "store" in source:
+        context = BarStore(source["store"]).context()
+    else:
+        worker["panel"] = SharedPanel.attach(source["shared"])
+        context = worker["panel"].context()
+    worker["context"] = context
+    worker["strategy"], _ = load_strategy(strategy_name)
+    worker["name"] = strategy_name
+    worker["results"] = ResultStore(results_dir) if results_dir else None
+
+
+@contextmanager
+def open_pool(data: Union[str, PanelDataContext], strategy_name: str, processes: Optional[int] = None,
+              results_dir: Optional[str] = None) -> Iterator[ProcessPoolExecutor]:
+    """
+    Process pool whose workers hold `strategy_name` and the bars of `data` in
+    `worker`: a `BarStore` directory is memory-mapped by each worker, an
+    in-memory `PanelDataContext` is copied once into shared memory, which is
+    released when the pool closes.
+    """
+    shared = None
+    if isinstance(data, str):
+        source = {"store": data}
+    else:
+        shared = SharedPanel.from_context(data)
+        source = {"shared": shared.spec}
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                 initargs=(source, strategy_name, results_dir)) as pool:
+            yield pool
+    finally:
+        if shared is not None:
+            shared.close()
+
+
+def _run_one(config_dict: dict, params: dict, backtest_kwargs: dict, report: Optional[tuple] = None) -> dict:
+    started = time.perf_counter()
+    try:
+        result = run_backtest(worker["strategy"], apply_params(config_dict, params), worker["context"], **backtest_kwargs)
+        row = {**params, **result.summary(), "error": ""}
+        if worker["results"] is not None:
+            row["run_id"] = worker["results"].save(result, worker["name"], code=worker["strategy"])
+        if report is not None:
+            report_dir, name = report
+            row["report"] = write_report(tearsheet(result, worker["context"], name=name), report_dir)[0]
+    except Exception as e:
+        row = {**params, "error": f"{type(e).__name__}: {e}"}
+    row["elapsed_sec"] = time.perf_counter() - started
+    return row
+
+
+def run_sweep(
+    strategy_name: str,
+    combos: Iterable[dict],
+    data: Union[str, PanelDataContext],
+    config_dict: Optional[dict] = None,
+    processes: Optional[int] = None,
+    results_path: Optional[str] = None,
+    report_dir: Optional[str] = None,
+    results_dir: Optional[str] = None,
+    **backtest_kwargs,
+) -> pd.DataFrame:
+    """
+    Backtest `strategy_name` once per parameter combination in a process pool.
+
+    `data` is either a `BarStore` directory (workers memory-map it) or an in-memory
+    `PanelDataContext`, which is copied once into shared memory for all workers.
+    Each finished combination is appended to `results_path` (CSV) as it arrives;
+    the full results table is returned sorted by Sharpe. With `report_dir`, every
+    run also writes a tearsheet (see `module.tearsheet`) named after its combo number;
+    with `results_dir`, every result is saved to that `ResultStore`.
+    `backtest_kwargs` are passed to `run_backtest` (start, end, capital, leverage, fee_rate).
+    """
+    if config_dict is None:
+        _, config_dict = load_strategy(strategy_name)
+    combos = list(combos)
+
+    rows: List[dict] = []
+    writer, results_file = None, None
+    try:
+        if results_path:
+            results_file = open(results_path, "w", newline="", encoding="utf-8")
+
+        with open_pool(data, strategy_name, processes, results_dir) as pool:
+            futures = [pool.submit(_run_one, config_dict, params, backtest_kwargs,
+                                   (report_dir, f"{strategy_name}_{i:04d}") if report_dir else None)
+                       for i, params in enumerate(combos)]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                if results_file:
+                    if writer is None:
+                        fieldnames = list(dict.fromkeys([*combos[0], *METRIC_COLUMNS, "error", "elapsed_sec",
+                                                         *(["run_id"] if results_dir else []),
+                                                         *(["report"] if report_dir else [])]))
+                        writer = csv.DictWriter(results_file, fieldnames=fieldnames, extrasaction="ignore")
+                        writer.writeheader()
+                    writer.writerow(row)
+                    results_file.flush()
+    finally:
+        if results_file:
+            results_file.close()
+
+    results = pd.DataFrame(rows)
+    if "sharpe" in results.columns:
+        results = results.sort_values("sharpe", ascending=False, ignore_index=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel strategy_config parameter sweep")
+    parser.add_argument("--strategy", required=True, help="Strategy name under futures/")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--grid", help='JSON grid, e.g. \'{"short_vol_window": [10, 20]}\'')
+    parser.add_argument("--random", help='JSON search space, e.g. \'{"clip_threshold": {"low": 1.0, "high": 3.0}, "max_positions": [4, 6, 8]}\'')
+    parser.add_argument("--samples", type=int, default=50, help="Random-search draws")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--leverage", type=float, default=1)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="sweep_results.csv", help="CSV the results are streamed to")
+    parser.add_argument("--reports", default=None, help="Directory for one tearsheet per combination")
+    parser.add_argument("--results", default=None, help="ResultStore directory every run is saved to")
+    args = parser.parse_args()
+
+    if args.grid:
+        combos = param_grid(json.loads(args.grid))
+    elif args.random:
+        space = {k: (v["low"], v["high"]) if isinstance(v, dict) else v for k, v in json.loads(args.random).items()}
+        combos = random_search(space, args.samples, seed=args.seed)
+    else:
+        parser.error("one of --grid or --random is required")
+
+    print(f"🔁 {len(combos)} combinations on {args.processes} processes -> {args.out}")
+    results = run_sweep(args.strategy, combos, args.store, processes=args.processes, results_path=args.out,
+                        report_dir=args.reports, results_dir=args.results, start=args.start, end=args.end, capital=args.capital, leverage=args.leverage)
+    print(results.head(20).to_string())
@@ -0,0 +1,211 @@
+# python -m module.synthetic --assets 500 --days 365 --store {STORE_DIR} [--seed 0] [--dtype float32]
+
+import argparse
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from module.bar_store import BarStore
+from module.data_context import Panel, PanelDataContext, frequency_to_minutes
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+
+def _ar1(shocks: np.ndarray, phi: float, state: np.ndarray) -> np.ndarray:
+    """
+    x[t] = phi * x[t-1] + shocks[t] along axis 0, starting from `state` (x[-1]).
+
+    Solved in closed form on sub-blocks short enough that phi**-k stays below
+    1e3 (safe in float32), so the recursion costs a few array passes instead of
+    a Python loop per bar.
+    """
+    if phi <= 0:
+        return shocks.copy()
+    block = len(shocks) if phi >= 1 else max(1, int(np.log(1e3) / -np.log(phi)))
+    out = np.empty_like(shocks)
+    previous = state
+    for start in range(0, len(shocks), block):
+        e = shocks[start:start + block]
+        k = np.arange(len(e), dtype=shocks.dtype)[:, None]
+        powers = phi ** k
+        x = powers * (phi * previous + np.cumsum(e / powers, axis=0))
+        out[start:start + block] = x
+        previous = x[-1]
+    return out
+
+
+def iter_chunks(num_assets: int, bars: int, start: str = "2025-01-01", frequency: str = "1m", seed: int = 0,
+                drift: float = 0.0, vol: float = 0.8, vol_dispersion: float = 0.5, market_beta: float = 0.5,
+                vol_persistence: float = 0.999, vol_of_vol: float = 0.03, jump_intensity: float = 1e-4,
+                jump_scale: float = 0.02, base_volume: float = 1e4,
+                missing_rate: float = 1e-3, listing_fraction: float = 0.1, delisting_fraction: float = 0.05,
+                chunk_bars: int = 8192) -> Iterator[tuple]:
+    """
+    Yield (times, {field: (rows x asset) float32}) blocks of a synthetic OHLCV panel.
+
+    Log prices follow GBM with annualised `drift` and per-asset `vol` (lognormal
+    across assets with spread `vol_dispersion`), a shared market factor weighted
+    by `market_beta`, stochastic volatility (AR(1) log-vol with `vol_persistence`
+    and `vol_of_vol`) and Poisson jumps. Volume clusters with volatility and
+    has exponential noise on top. `missing_rate` blanks random single bars;
+    `listing_fraction` of the assets list late and `delisting_fraction` delist
+    early (all fields NaN outside their lifetime).
+
+    Output depends only on the arguments, including `chunk_bars`. Blocks are
+    float32 (draws and transcendentals are several times faster) and small
+    enough for the allocator to reuse between chunks; the running close is
+    carried in float64 so long runs do not drift.
+    """
+    step = frequency_to_minutes(frequency)
+    rng = np.random.default_rng(seed)
+    dt = step / MINUTES_PER_YEAR
+    times = pd.Timestamp(start).to_datetime64().astype("datetime64[ns]") + np.arange(bars) * np.timedelta64(step, "m")
+
+    asset_vol = vol * np.exp(vol_dispersion * rng.standard_normal(num_assets) - vol_dispersion ** 2 / 2)
+    sigma = asset_vol * np.sqrt(dt)
+    mu = (drift - asset_vol ** 2 / 2) * dt
+    volume_scale = base_volume * np.exp(rng.standard_normal(num_assets))
+
+    listed = np.zeros(num_assets, dtype=np.int64)
+    delisted = np.full(num_assets, bars, dtype=np.int64)
+    late = rng.random(num_assets) < listing_fraction
+    listed[late] = rng.integers(0, max(bars // 2, 1), late.sum())
+    early = rng.random(num_assets) < delisting_fraction
+    delisted[early] = rng.integers(bars // 2, bars, early.sum())
+
+    close = 100.0 * np.exp(rng.standard_normal(num_assets))
+    log_vol = np.zeros(num_assets)
+    # Innovation scale that makes `vol_of_vol` the stationary std of log-vol.
+    vol_noise_scale = vol_of_vol * np.sqrt(1 - min(vol_persistence, 1.0) ** 2)
+    sigma32, mu32, volume_scale32 = sigma.astype(np.float32), mu.astype(np.float32), volume_scale.astype(np.float32)
+
+    for first in range(0, bars, chunk_bars):
+        rows = min(chunk_bars, bars - first)
+        shape = (rows, num_assets)
+
+        def normal(size=shape):
+            return rng.standard_normal(size, dtype=np.float32)
+
+        def exponential(size=shape):
+            return rng.standard_exponential(size, dtype=np.float32)
+
+        log_vol_path = _ar1(np.float32(vol_noise_scale) * normal(), vol_persistence, log_vol)
+        log_vol = log_vol_path[-1].astype(np.float64)
+        bar_sigma = np.exp(log_vol_path)
+        bar_sigma *= sigma32
+
+        returns = normal()
+        returns *= np.float32(np.sqrt(1 - market_beta ** 2))
+        returns += np.float32(market_beta) * normal((rows, 1))
+        returns *= bar_sigma
+        returns += mu32
+        jumps = rng.poisson(jump_intensity * rows * num_assets)
+        if jumps:
+            at = rng.integers(0, rows * num_assets, jumps)
+            returns.reshape(-1)[at] += np.float32(jump_scale) * normal(jumps)
+
+        # Relative to the previous close, so float32 only has to carry the in-chunk move.
+        close_block = np.cumsum(returns, axis=0)
+        move = close_block[-1].astype(np.float64)
+        np.exp(close_block, out=close_block)
+        close_block *= close.astype(np.float32)
+        open_block = np.empty_like(close_block)
+        open_block[0] = close
+        open_block[1:] = close_block[:-1]
+        close = close * np.exp(move)
+
+        # Wicks: exponential excursions of about half a bar's volatility beyond open/close.
+        wick = bar_sigma * np.float32(0.5)
+        high_block = exponential()
+        high_block *= wick
+        high_block += 1
+        high_block *= np.maximum(open_block, close_block)
+        low_block = exponential()
+        low_block *= -wick
+        low_block += 1
+        low_block *= np.minimum(open_block, close_block)
+
+        # Volume clusters with volatility and with the size of the bar's move.
+        volume_block = np.abs(returns)
+        volume_block /= sigma32
+        volume_block += 1
+        log_vol_path *= 2
+        volume_block *= np.exp(log_vol_path, out=log_vol_path)
+        volume_block *= exponential()
+        volume_block *= volume_scale32
+
+        blocks = {"open": open_block, "high": high_block, "low": low_block, "close": close_block, "volume": volume_block}
+
+        # Gaps: whole column ranges outside each asset's lifetime, plus scattered single bars.
+        gaps = [(i, max(listed[i] - first, 0), min(delisted[i] - first, rows)) for i in
+                np.flatnonzero((listed > first) | (delisted < first + rows))]
+        missing = rng.integers(0, rows * num_assets, rng.poisson(missing_rate * rows * num_assets))
+        for values in blocks.values():
+            for i, alive_from, alive_to in gaps:
+                values[:alive_from, i] = np.nan
+                values[max(alive_to, 0):, i] = np.nan
+            values.reshape(-1)[missing] = np.nan
+
+        yield times[first:first + rows], blocks
+
+
+def synthetic_bars(num_assets: int, bars: int, dtype: str = "float64", **kwargs) -> tuple:
+    """Whole synthetic panel as (times, assets, {field: (time x asset) array}); see `iter_chunks`."""
+    assets = asset_names(num_assets)
+    fields = {name: np.empty((bars, num_assets), dtype=dtype) for name in FIELDS}
+    time_blocks = []
+    row = 0
+    for times, blocks in iter_chunks(num_assets, bars, **kwargs):
+        for name, values in blocks.items():
+            fields[name][row:row + len(times)] = values
+        time_blocks.append(times)
+        row += len(times)
+    times = np.concatenate(time_blocks) if time_blocks else np.array([], dtype="datetime64[ns]")
+    return times, assets, fields
+
+
+def asset_names(num_assets: int) -> List[str]:
+    return [f"SYN{i:04d}USDT" for i in range(num_assets)]
+
+
+def synthetic_context(num_assets: int, bars: int, frequency: str = "1m", **kwargs) -> PanelDataContext:
+    """`PanelDataContext` over a synthetic panel."""
+    times, assets, fields = synthetic_bars(num_assets, bars, frequency=frequency, **kwargs)
+    return PanelDataContext(times, assets, fields, frequency=frequency)
+
+
+def synthetic_frame(num_assets: int, bars: int, fields: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+    """Synthetic panel in the long (asset, datetime) layout returned by `get_history`."""
+    times, assets, blocks = synthetic_bars(num_assets, bars, **kwargs)
+    return Panel(times, assets, {name: blocks[name] for name in (fields or FIELDS)}).to_long()
+
+
+def synthetic_store(path: str, num_assets: int, bars: int, frequency: str = "1m", dtype: str = "float32",
+                    **kwargs) -> BarStore:
+    """Write a synthetic panel straight into a `BarStore`, one chunk in memory at a time."""
+    chunks = iter_chunks(num_assets, bars, frequency=frequency, **kwargs)
+    return BarStore.create_chunked(path, asset_names(num_assets), chunks, frequency=frequency, dtype=dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic OHLCV bar store")
+    parser.add_argument("--store", required=True, help="Output store directory")
+    parser.add_argument("--assets", type=int, default=67)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--frequency", default="1m")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dtype", default="float32", help="Storage dtype (float64/float32)")
+    parser.add_argument("--missing_rate", type=float, default=1e-3)
+    parser.add_argument("--jump_intensity", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    bars = int(args.days * 24 * 60 / frequency_to_minutes(args.frequency))
+    started = time.perf_counter()
+    store = synthetic_store(args.store, args.assets, bars, frequency=args.frequency, dtype=args.dtype,
+                            start=args.start, seed=args.seed, missing_rate=args.missing_rate,
+                            jump_intensity=args.jump_intensity)
+    print(f"📦 {store.length} bars x {len(store.assets)} assets -> {args.store} in {time.perf_counter() - started:.1f}s")
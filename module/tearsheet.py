@@ -0,0 +1,414 @@
+# python -m module.tearsheet --strategy {STRATEGY_NAME} --store {STORE_DIR} --out_dir backtest_report
+
+import argparse
+import html
+import itertools
+import json
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from module.backtest import MINUTES_PER_YEAR, BacktestResult, load_strategy, run_backtest
+from module.bar_store import BarStore
+from module.data_context import PanelDataContext, ffill
+
+DAY = np.timedelta64(1, "D")
+
+
+class TearsheetBuilder:
+    """
+    Streaming report over a backtest: feed bars in time order with `add_bars`
+    (any chunk size) and rebalances with `add_rebalances`, then `report()`.
+
+    Only running totals, the current drawdown state, one equity value per day
+    and per-asset P&L are kept, so a year of minute bars over hundreds of assets
+    never has to be in memory at once.
+    """
+
+    def __init__(self, assets: List[str], bar_minutes: int = 1):
+        self.assets = list(assets)
+        self.bar_minutes = bar_minutes
+        num_assets = len(self.assets)
+        self.bars = 0
+        self.start = self.end = None
+        self.first_equity = self.last_equity = None
+        # bar returns
+        self.returns = 0
+        self.sum_returns = self.sum_squares = self.sum_downside = 0.0
+        self.best_bar, self.worst_bar = -np.inf, np.inf
+        # drawdown
+        self.peak, self.peak_time = -np.inf, None
+        self.max_drawdown, self.drawdown_peak, self.drawdown_trough = 0.0, None, None
+        self.drawdown_level, self.recovery = None, None
+        self.longest_underwater = np.timedelta64(0, "ns")
+        # exposure
+        self.sum_leverage, self.max_leverage, self.sum_net = 0.0, 0.0, 0.0
+        self.exposure_bars = 0
+        # daily closes
+        self.days: List[np.datetime64] = []
+        self.day_equity: List[float] = []
+        # attribution
+        self.pnl = np.zeros(num_assets)
+        self.held_bars = np.zeros(num_assets, dtype=np.int64)
+        self._price = None
+        self._units = np.zeros(num_assets)
+        # rebalances
+        self.rebalances = 0
+        self.sum_turnover, self.max_turnover, self.fees = 0.0, 0.0, 0.0
+        self.sum_abs_weight = np.zeros(num_assets)
+
+    # --- feeding ---
+    def add_bars(self, times: np.ndarray, equity: np.ndarray, leverage: Optional[np.ndarray] = None,
+                 prices: Optional[np.ndarray] = None, units: Optional[np.ndarray] = None) -> None:
+        """
+        Next chunk of bars. `units[t]` are the units held at the close of bar t
+        (after any rebalance on it); with `prices` they give per-asset P&L and
+        net exposure.
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        equity = np.asarray(equity, dtype=np.float64)
+        if not len(times):
+            return
+        if self.start is None:
+            self.start, self.first_equity = times[0], float(equity[0])
+        self.end = times[-1]
+        self.bars += len(times)
+
+        previous = np.r_[equity[0] if self.last_equity is None else self.last_equity, equity]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = previous[1:] / previous[:-1] - 1
+        if self.last_equity is None:
+            returns = returns[1:]
+        returns = returns[np.isfinite(returns)]
+        if len(returns):
+            self.returns += len(returns)
+            self.sum_returns += float(returns.sum())
+            self.sum_squares += float(returns @ returns)
+            downside = np.minimum(returns, 0.0)
+            self.sum_downside += float(downside @ downside)
+            self.best_bar = max(self.best_bar, float(returns.max()))
+            self.worst_bar = min(self.worst_bar, float(returns.min()))
+        self.last_equity = float(equity[-1])
+
+        self._drawdown(times, equity)
+        self._daily(times, equity)
+
+        if leverage is not None:
+            leverage = np.asarray(leverage, dtype=np.float64)
+            finite = leverage[np.isfinite(leverage)]
+            self.sum_leverage += float(finite.sum())
+            self.max_leverage = max(self.max_leverage, float(finite.max()) if len(finite) else 0.0)
+            self.exposure_bars += len(finite)
+        if prices is not None and units is not None:
+            self._attribute(np.asarray(prices, dtype=np.float64), np.asarray(units, dtype=np.float64), equity)
+
+    def add_rebalances(self, turnover: np.ndarray, fees: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        turnover = np.asarray(turnover, dtype=np.float64)
+        self.rebalances += len(turnover)
+        self.sum_turnover += float(turnover.sum())
+        self.max_turnover = max(self.max_turnover, float(turnover.max()) if len(turnover) else 0.0)
+        self.fees += float(np.sum(fees))
+        if weights is not None and len(weights):
+            self.sum_abs_weight += np.abs(weights).sum(axis=0)
+
+    def _drawdown(self, times: np.ndarray, equity: np.ndarray) -> None:
+        positions = np.arange(len(equity))
+        peaks = np.maximum.accumulate(np.r_[self.peak, equity])[1:]
+        # Bar of the running peak at each bar; -1 means a peak from an earlier chunk.
+        at_peak = np.maximum.accumulate(np.where(equity >= peaks, positions, -1))
+        peak_times = np.where(at_peak >= 0, times[np.maximum(at_peak, 0)], self.peak_time if self.peak_time is not None else times[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(peaks > 0, equity / peaks - 1, 0.0)
+
+        if self.drawdown_level is not None and self.recovery is None:
+            recovered = np.flatnonzero(equity >= self.drawdown_level)
+            if len(recovered):
+                self.recovery = times[recovered[0]]
+        trough = int(np.argmin(drawdown))
+        if drawdown[trough] < self.max_drawdown:
+            self.max_drawdown = float(drawdown[trough])
+            self.drawdown_peak, self.drawdown_trough = peak_times[trough], times[trough]
+            self.drawdown_level = float(peaks[trough])
+            recovered = np.flatnonzero(equity[trough:] >= self.drawdown_level)
+            self.recovery = times[trough + recovered[0]] if len(recovered) else None
+
+        self.longest_underwater = max(self.longest_underwater, (times - peak_times).max())
+        self.peak, self.peak_time = float(peaks[-1]), peak_times[-1]
+
+    def _daily(self, times: np.ndarray, equity: np.ndarray) -> None:
+        days = times.astype("datetime64[D]")
+        last = np.flatnonzero(np.r_[days[1:] != days[:-1], True])
+        if self.days and days[0] == self.days[-1]:
+            self.days.pop()
+            self.day_equity.pop()
+        self.days.extend(days[last])
+        self.day_equity.extend(equity[last].tolist())
+
+    def _attribute(self, prices: np.ndarray, units: np.ndarray, equity: np.ndarray) -> None:
+        if self._price is None:
+            self._price = prices[0]
+        held = np.vstack([self._units, units[:-1]])
+        moves = np.diff(np.vstack([self._price, prices]), axis=0)
+        self.pnl += np.einsum("ij,ij->j", held, moves)
+        self.held_bars += (units != 0).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            net = (units * prices).sum(axis=1) / equity
+        self.sum_net += float(net[np.isfinite(net)].sum())
+        self._price, self._units = prices[-1], units[-1]
+
+    # --- output ---
+    def report(self, name: str = "", top_assets: int = 20) -> dict:
+        """JSON-ready tearsheet; `assets` lists the `top_assets` largest contributors by |P&L|."""
+        periods_per_year = MINUTES_PER_YEAR / self.bar_minutes
+        n = self.returns
+        mean = self.sum_returns / n if n else 0.0
+        variance = (self.sum_squares - n * mean * mean) / (n - 1) if n > 1 else 0.0
+        volatility = np.sqrt(max(variance, 0.0) * periods_per_year)
+        downside = np.sqrt(self.sum_downside / n * periods_per_year) if n else 0.0
+        years = self.bars * self.bar_minutes / MINUTES_PER_YEAR
+        total_return = self.last_equity / self.first_equity - 1 if self.first_equity else 0.0
+        annual_return = (1 + total_return) ** (1 / years) - 1 if years > 0 and total_return > -1 else -1.0
+
+        day_equity = np.asarray(self.day_equity)
+        daily = np.diff(np.r_[self.first_equity if self.first_equity else np.nan, day_equity]) / np.r_[
+            self.first_equity if self.first_equity else np.nan, day_equity[:-1]] if len(day_equity) else np.zeros(0)
+
+        contribution = self.pnl / self.first_equity if self.first_equity else self.pnl * 0
+        order = np.argsort(-np.abs(self.pnl), kind="stable")[:top_assets]
+        assets = [{
+            "asset": self.assets[i],
+            "pnl": float(self.pnl[i]),
+            "contribution": float(contribution[i]),
+            "avg_abs_weight": float(self.sum_abs_weight[i] / self.rebalances) if self.rebalances else 0.0,
+            "held_share": float(self.held_bars[i] / self.bars) if self.bars else 0.0,
+        } for i in order if self.pnl[i] != 0 or self.held_bars[i]]
+
+        return {
+            "name": name,
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "period": {
+                "start": _stamp(self.start), "end": _stamp(self.end), "bars": self.bars,
+                "bar_minutes": self.bar_minutes, "days": len(self.days),
+            },
+            "returns": {
+                "total_return": total_return,
+                "annual_return": annual_return,
+                "annual_volatility": float(volatility),
+                "sharpe": float(mean * periods_per_year / volatility) if volatility > 0 else 0.0,
+                "sortino": float(mean * periods_per_year / downside) if downside > 0 else 0.0,
+                "calmar": float(annual_return / -self.max_drawdown) if self.max_drawdown < 0 else 0.0,
+                "best_bar": self.best_bar if n else 0.0,
+                "worst_bar": self.worst_bar if n else 0.0,
+                "best_day": float(daily.max()) if len(daily) else 0.0,
+                "worst_day": float(daily.min()) if len(daily) else 0.0,
+                "positive_days": float((daily > 0).mean()) if len(daily) else 0.0,
+            },
+            "drawdown": {
+                "max_drawdown": self.max_drawdown,
+                "peak": _stamp(self.drawdown_peak),
+                "trough": _stamp(self.drawdown_trough),
+                "recovery": _stamp(self.recovery),
+                "longest_days": float(self.longest_underwater / DAY),
+            },
+            "exposure": {
+                "avg_leverage": self.sum_leverage / self.exposure_bars if self.exposure_bars else 0.0,
+                "max_leverage": self.max_leverage,
+                "avg_net_exposure": self.sum_net / self.bars if self.bars and self._price is not None else None,
+            },
+            "trading": {
+                "rebalances": self.rebalances,
+                "avg_turnover": self.sum_turnover / self.rebalances if self.rebalances else 0.0,
+                "max_turnover": self.max_turnover,
+                "annual_turnover": self.sum_turnover / years if years > 0 else 0.0,
+                "total_fees": self.fees,
+            },
+            "assets": assets,
+            "curve": {"days": [str(day) for day in self.days], "equity": day_equity.tolist()},
+        }
+
+
+def _stamp(value) -> Optional[str]:
+    return None if value is None else str(np.datetime64(value, "m")).replace("T", " ")
+
+
+# --- From a backtest ---
+def _price_chunks(context: PanelDataContext, field: str, first: int, last: int, chunk_bars: int) -> Iterator[np.ndarray]:
+    """Forward-filled, NaN-zeroed prices of bars [first, last) like `_simulate` uses, a chunk at a time."""
+    values = context.fields[field]
+    carry = None
+    for start in range(first, last, chunk_bars):
+        block = np.array(values[start:min(start + chunk_bars, last)], dtype=np.float64)
+        if carry is not None:
+            block = np.vstack([carry, block])
+        filled = ffill(block)
+        carry = filled[-1:]
+        yield np.nan_to_num(filled if start == first else filled[1:])
+
+
+def tearsheet(result: BacktestResult, context: Optional[PanelDataContext] = None, name: str = "",
+              price_field: str = "close", chunk_bars: int = 1 << 16, top_assets: int = 20) -> dict:
+    """
+    Report for a `run_backtest` result, streamed `chunk_bars` at a time. With
+    the `context` it ran on, prices are read chunk by chunk (memory-mapped for
+    a `BarStore`) for per-asset P&L and net exposure.
+    """
+    builder = TearsheetBuilder(result.assets, result.bar_minutes)
+    builder.add_rebalances(result.turnover, result.fees, result.weights)
+    num_bars = len(result.times)
+    prices = None
+    if context is not None and num_bars:
+        first = int(np.searchsorted(context.times, result.times[0]))
+        prices = _price_chunks(context, price_field, first, first + num_bars, chunk_bars)
+
+    for start in range(0, num_bars, chunk_bars):
+        stop = min(start + chunk_bars, num_bars)
+        units = None
+        if prices is not None:
+            held = np.searchsorted(result.rebalance_index, np.arange(start, stop), side="right") - 1
+            units = np.where((held >= 0)[:, None], result.positions[np.maximum(held, 0)], 0.0)
+        builder.add_bars(result.times[start:stop], result.equity[start:stop], result.leverage[start:stop],
+                         next(prices) if prices is not None else None, units)
+    return builder.report(name, top_assets=top_assets)
+
+
+# --- Rendering ---
+def _percent(value) -> str:
+    return "-" if value is None else f"{value * 100:.3f}%"
+
+
+def _number(value) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+ROWS = [
+    ("returns", "total_return", "Cumulative returns", _percent),
+    ("returns", "annual_return", "Annual return", _percent),
+    ("returns", "annual_volatility", "Annual volatility", _percent),
+    ("returns", "sharpe", "Sharpe ratio", _number),
+    ("returns", "sortino", "Sortino ratio", _number),
+    ("returns", "calmar", "Calmar ratio", _number),
+    ("returns", "best_day", "Best day", _percent),
+    ("returns", "worst_day", "Worst day", _percent),
+    ("returns", "positive_days", "Positive days", _percent),
+    ("drawdown", "max_drawdown", "Max drawdown", _percent),
+    ("drawdown", "peak", "Max drawdown peak", str),
+    ("drawdown", "trough", "Max drawdown trough", str),
+    ("drawdown", "recovery", "Recovered", lambda v: v or "not yet"),
+    ("drawdown", "longest_days", "Longest drawdown (days)", _number),
+    ("exposure", "avg_leverage", "Average gross leverage", _number),
+    ("exposure", "max_leverage", "Max gross leverage", _number),
+    ("exposure", "avg_net_exposure", "Average net exposure", _number),
+    ("trading", "rebalances", "Rebalances", str),
+    ("trading", "avg_turnover", "Average turnover", _percent),
+    ("trading", "annual_turnover", "Annual turnover", _number),
+    ("trading", "total_fees", "Total fees", lambda v: f"{v:,.2f}"),
+]
+
+
+def _svg(values: np.ndarray, width: int = 800, height: int = 160, color: str = "#1f77b4") -> str:
+    """Inline SVG polyline of `values` (at most `width` points)."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return ""
+    if len(values) > width:
+        values = values[np.linspace(0, len(values) - 1, width).astype(int)]
+    low, high = float(np.nanmin(values)), float(np.nanmax(values))
+    span = high - low or 1.0
+    x = np.linspace(0, width, len(values))
+    y = height - (values - low) / span * height
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(x, y))
+    return (f'<svg viewBox="0 0 {width} {height}" width="{width}" height="{height}">'
+            f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{points}"/></svg>'
+            f'<div class="axis">{low:,.4g} – {high:,.4g}</div>')
+
+
+def render_html(report: dict) -> str:
+    """Self-contained HTML page (no scripts or images) for a `report`."""
+    period = report["period"]
+    title = f"Backtest Report {html.escape(report.get('name') or '')} ({period['start']} to {period['end']})"
+    stats = "".join(f"<tr><td>{label}</td><td>{html.escape(fmt(report[section][key]))}</td></tr>"
+                    for section, key, label, fmt in ROWS)
+    assets = "".join(
+        f"<tr><td>{html.escape(a['asset'])}</td><td>{a['pnl']:,.2f}</td><td>{_percent(a['contribution'])}</td>"
+        f"<td>{a['avg_abs_weight']:.4f}</td><td>{_percent(a['held_share'])}</td></tr>" for a in report["assets"])
+    equity = np.asarray(report["curve"]["equity"], dtype=np.float64)
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else equity
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; line-height: 1.5; }}
+h1, h2 {{ color: #333; border-bottom: 1px solid #eee; padding-bottom: 5px; }}
+table {{ border-collapse: collapse; margin-bottom: 20px; }}
+th, td {{ padding: 4px 10px; border: 1px solid #ddd; text-align: left; }}
+th {{ background-color: #f8f8f8; }}
+.axis {{ color: #888; font-size: 12px; margin-bottom: 20px; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>{period['bars']} bars of {period['bar_minutes']}m over {period['days']} days, generated {report['created']}</p>
+<h2>Performance Statistics</h2>
+<table>{stats}</table>
+<h2>Equity (daily close)</h2>
+{_svg(equity)}
+<h2>Drawdown</h2>
+{_svg(drawdown, color="#d62728")}
+<h2>Top Assets by P&amp;L</h2>
+<table><tr><th>Asset</th><th>P&amp;L</th><th>Contribution</th><th>Avg |weight|</th><th>Held</th></tr>{assets}</table>
+</body>
+</html>
+"""
+
+
+def write_report(report: dict, out_dir: str, name: Optional[str] = None) -> tuple:
+    """
+    Write `<stamp>_<name>_backtest_report.{html,json}` into `out_dir`; returns
+    both paths. The stamp is the creation time as YYYY-MM-DD_HHMMSS (no colons,
+    so the names are valid on Windows); a report that would overwrite another
+    gets a `_2`, `_3`, ... suffix.
+    """
+    name = name or report.get("name") or "backtest"
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = report["created"].replace(":", "").replace(" ", "_")
+    base = os.path.join(out_dir, f"{stamp}_{name}_backtest_report")
+    for n in itertools.count(1):
+        stem = base if n == 1 else f"{base}_{n}"
+        try:
+            # Exclusive create claims the name, also against concurrent sweep workers.
+            f = open(stem + ".json", "x", encoding="utf-8")
+        except FileExistsError:
+            continue
+        break
+    with f:
+        json.dump(report, f, indent=1)
+    with open(stem + ".html", "w", encoding="utf-8") as f:
+        f.write(render_html(report))
+    return stem + ".html", stem + ".json"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest a strategy and write a local HTML/JSON tearsheet")
+    parser.add_argument("--strategy", required=True, help="Strategy name under futures/")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--leverage", type=float, default=1)
+    parser.add_argument("--chunk_bars", type=int, default=1 << 16)
+    parser.add_argument("--out_dir", default="backtest_report")
+    args = parser.parse_args()
+
+    strategy, config_dict = load_strategy(args.strategy)
+    context = BarStore(args.store).context()
+    result = run_backtest(strategy, config_dict, context, start=args.start, end=args.end,
+                          capital=args.capital, leverage=args.leverage)
+    report = tearsheet(result, context, name=args.strategy, chunk_bars=args.chunk_bars)
+    html_path, json_path = write_report(report, args.out_dir)
+    print(f"📝 {html_path} ({os.path.getsize(html_path) / 1024:.1f} KB), {json_path}")
+    for section, key, label, fmt in ROWS[:10]:
+        print(f"  {label:<24} {fmt(report[section][key])}")
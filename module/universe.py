@@ -0,0 +1,199 @@
+# python -m module.universe --store {STORE_DIR} --top 300 [--days 30] [--offline]
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import requests
+
+from module.bar_store import BarStore
+from module.data_context import DataContext
+from module.memo import completed_bar
+
+COIN_INFO_URL = "https://crypto.fin.cloud.ainode.ai/{apikey}/get/info/coin"
+NS_PER_DAY = 86400 * 1_000_000_000
+
+
+class CoinListing:
+    """
+    The data service's coin list (`/get/info/coin`) as perpetual symbols
+    (`coin_nm` + "USDT"), fetched at most once per `ttl` seconds.
+
+    With `cache_path` the listing is also kept on disk, so restarts and other
+    processes within the TTL skip the round trip. If a refresh fails the stale
+    listing is served and the next attempt waits `retry_after` seconds.
+    """
+
+    def __init__(self, apikey: str, ttl: float = 6 * 3600, cache_path: Optional[str] = None,
+                 quote: str = "USDT", timeout: float = 10, retry_after: float = 300):
+        self.url = COIN_INFO_URL.format(apikey=apikey)
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.quote = quote
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.fetched_at = 0.0
+        self._retry_at = 0.0
+        self._symbols: List[str] = []
+        self._lock = threading.Lock()
+        self.stats = {"fetches": 0, "failures": 0}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self._symbols, self.fetched_at = cached["symbols"], float(cached["fetched_at"])
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            now = time.time()
+            if now - self.fetched_at >= self.ttl and now >= self._retry_at:
+                try:
+                    self._refresh()
+                except (requests.RequestException, KeyError, TypeError, ValueError):
+                    self.stats["failures"] += 1
+                    if not self._symbols:
+                        raise
+                    self._retry_at = now + self.retry_after
+            return list(self._symbols)
+
+    def _refresh(self) -> None:
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        self.stats["fetches"] += 1
+        names = (item.get("coin_nm") for item in response.json()["data"])
+        symbols = [f"{name.upper()}{self.quote}" for name in names if name and name.upper() != self.quote]
+        self._symbols, self.fetched_at = list(dict.fromkeys(symbols)), time.time()
+        if self.cache_path:
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self.fetched_at, "symbols": self._symbols}, f)
+            os.replace(tmp, self.cache_path)
+
+
+class LiquidityStats:
+    """
+    Daily turnover and volume per symbol over the last `days` completed UTC days.
+
+    `update` folds in only the days completed since the previous call (one
+    daily `get_history`); symbols seen for the first time get their full
+    window. The store's `volume` is quote volume (USDT) as the downloader
+    writes it; pass `quote_volume=False` for contexts whose volume is in coins.
+    """
+
+    def __init__(self, days: int = 30, quote_volume: bool = True):
+        self.days = days
+        self.quote_volume = quote_volume
+        self.turnover = pd.DataFrame(dtype=np.float64)   # day x symbol, quote currency
+        self.volume = pd.DataFrame(dtype=np.float64)     # day x symbol, coins
+        self.last_day: Optional[int] = None              # ns start of the newest folded-in day
+
+    def update(self, context: DataContext, symbols: List[str]) -> None:
+        day = completed_bar(context, "1d")
+        if self.last_day is not None and day < self.last_day:
+            # Replaying from an earlier time (e.g. a new backtest): later days must not leak in.
+            self.turnover, self.volume, self.last_day = pd.DataFrame(dtype=np.float64), pd.DataFrame(dtype=np.float64), None
+        new = [symbol for symbol in symbols if symbol not in self.turnover.columns]
+        known = [symbol for symbol in symbols if symbol in self.turnover.columns]
+        if known and self.last_day is not None and day > self.last_day:
+            self._fold(context, known, min(int((day - self.last_day) // NS_PER_DAY), self.days), day)
+        if new:
+            self._fold(context, new, self.days, day)
+        self.last_day = day
+
+    def _fold(self, context: DataContext, symbols: List[str], days: int, day: int) -> None:
+        # One more bar than needed: the window ends with the forming day, which is dropped.
+        hist = context.get_history(assets=symbols, window=days + 1, frequency="1d", fields=["close", "volume"])
+        if hist.empty:
+            return
+        close = hist["close"].unstack(level=0)
+        volume = hist["volume"].unstack(level=0)
+        complete = close.index.values.astype("datetime64[ns]").astype(np.int64) <= day
+        close, volume = close[complete], volume[complete]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            turnover = volume if self.quote_volume else volume * close
+            coins = (volume / close).replace([np.inf, -np.inf], np.nan) if self.quote_volume else volume
+        self.turnover = self._merge(self.turnover, turnover)
+        self.volume = self._merge(self.volume, coins)
+
+    def _merge(self, current: pd.DataFrame, update: pd.DataFrame) -> pd.DataFrame:
+        merged = update.combine_first(current) if len(current) else update
+        return merged.sort_index().iloc[-self.days:]
+
+    def summary(self) -> pd.DataFrame:
+        """Per symbol: mean/median daily turnover and volume and the number of days seen."""
+        return pd.DataFrame({
+            "mean_turnover": self.turnover.mean(),
+            "median_turnover": self.turnover.median(),
+            "mean_volume": self.volume.mean(),
+            "days": self.turnover.count(),
+        }).sort_values("mean_turnover", ascending=False)
+
+
+class Universe:
+    """
+    Top-N symbols by median daily turnover, ranked once per completed day.
+
+    `symbols` is a `CoinListing` (live) or a fixed list (e.g. a store's assets
+    for backtests; a fixed list has no survivorship protection). Symbols with
+    fewer than `min_days` days of data are left out. Between daily closes
+    `top` only slices the cached ranking, so strategies can ask on every call.
+
+    `attach(context)` makes the universe available to strategies as
+    `context.universe(top_n)`.
+    """
+
+    def __init__(self, symbols: Union[CoinListing, List[str]], days: int = 30, min_days: int = 7,
+                 quote_volume: bool = True):
+        self.symbols = symbols
+        self.stats = LiquidityStats(days, quote_volume=quote_volume)
+        self.min_days = min_days
+        self.ranking: List[str] = []
+        self._day: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def attach(self, context: DataContext) -> DataContext:
+        context._universe = self
+        return context
+
+    def top(self, context: DataContext, top_n: int) -> List[str]:
+        day = completed_bar(context, "1d")
+        with self._lock:
+            if day != self._day:
+                listing = self.symbols.symbols() if isinstance(self.symbols, CoinListing) else list(self.symbols)
+                self.stats.update(context, listing)
+                summary = self.stats.summary()
+                eligible = summary[(summary["days"] >= self.min_days) & summary.index.isin(listing)]
+                self.ranking = eligible.sort_values("median_turnover", ascending=False, kind="stable").index.tolist()
+                self._day = day
+            return self.ranking[:top_n]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank perpetuals by recent daily turnover")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store) with close and volume")
+    parser.add_argument("--top", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30, help="Rolling window of daily stats")
+    parser.add_argument("--min_days", type=int, default=7)
+    parser.add_argument("--at", default=None, help="Rank as of this bar time (default: last bar)")
+    parser.add_argument("--offline", action="store_true", help="Use the store's assets instead of the coin listing")
+    parser.add_argument("--cache", default=None, help="JSON file caching the coin listing")
+    args = parser.parse_args()
+
+    context = BarStore(args.store).context()
+    if args.at:
+        context.cursor = int(np.searchsorted(context.times, np.datetime64(args.at), side="right")) - 1
+    if args.offline:
+        source = list(context.assets)
+    else:
+        from futures.futures_config import system_config
+        source = CoinListing(system_config["data_apikey"], cache_path=args.cache)
+    universe = Universe(source, days=args.days, min_days=args.min_days)
+
+    started = time.perf_counter()
+    members = universe.top(context, args.top)
+    print(f"⏱ {time.perf_counter() - started:.2f}s, {len(members)} of {len(universe.stats.turnover.columns)} symbols")
+    print(universe.stats.summary().loc[members].to_string())
@@ -0,0 +1,203 @@
+# python -m module.walk_forward --strategy {STRATEGY_NAME} --store {STORE_DIR} --grid '{"short_vol_window": [10, 20, 30]}' --train_days 14 --test_days 7
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from module.backtest import load_strategy, run_backtest
+from module.bar_store import BarStore
+from module.data_context import PanelDataContext, to_datetime64
+from module.sweep import apply_params, open_pool, param_grid, random_search, worker
+from module.tearsheet import TearsheetBuilder
+
+@dataclass
+class Fold:
+    number: int
+    train_start: np.datetime64
+    train_end: np.datetime64
+    test_start: np.datetime64
+    test_end: np.datetime64
+
+
+@dataclass
+class WalkForwardResult:
+    folds: pd.DataFrame   # one row per fold: dates, chosen params, train score, out-of-sample metrics
+    equity: pd.Series     # out-of-sample equity of every test segment, chained from `capital`
+    bar_minutes: int = 1
+
+    def summary(self) -> dict:
+        """Tearsheet statistics of the stitched out-of-sample equity."""
+        builder = TearsheetBuilder([], self.bar_minutes)
+        builder.add_bars(self.equity.index.values, self.equity.to_numpy())
+        report = builder.report()
+        return {**report["returns"], **report["drawdown"]}
+
+
+def make_folds(times: np.ndarray, train_days: float, test_days: float, step_days: Optional[float] = None,
+               start=None, end=None, anchored: bool = False) -> List[Fold]:
+    """
+    Rolling train/test splits over [start, end]: each fold trains on `train_days`
+    and tests on the following `test_days`; the next fold starts `step_days`
+    later (default: `test_days`, so test segments tile the range). With
+    `anchored`, every train segment starts at `start` and grows.
+    """
+    start = to_datetime64(start) if start is not None else times[0]
+    end = to_datetime64(end) if end is not None else times[-1]
+    train, test = np.timedelta64(int(train_days * 86400), "s"), np.timedelta64(int(test_days * 86400), "s")
+    step = np.timedelta64(int((step_days or test_days) * 86400), "s")
+    one = np.timedelta64(1, "ns")
+
+    folds = []
+    train_start = start
+    while train_start + train + test - one <= end:
+        test_start = train_start + train
+        folds.append(Fold(len(folds), start if anchored else train_start, test_start - one, test_start,
+                          test_start + test - one))
+        train_start = train_start + step
+    return folds
+
+
+def _run_segment(config_dict: dict, params: dict, start, end, backtest_kwargs: dict, curve: bool) -> dict:
+    """Backtest one combination on one segment in a worker; `curve` also returns its equity."""
+    started = time.perf_counter()
+    try:
+        result = run_backtest(worker["strategy"], apply_params(config_dict, params), worker["context"],
+                              start=start, end=end, **backtest_kwargs)
+        row = {"summary": result.summary(), "error": ""}
+        if curve:
+            row["times"], row["equity"], row["bar_minutes"] = result.times, result.equity, result.bar_minutes
+    except Exception as e:
+        row = {"summary": {}, "error": f"{type(e).__name__}: {e}"}
+    row["elapsed_sec"] = time.perf_counter() - started
+    return row
+
+
+def walk_forward(
+    strategy_name: str,
+    combos: List[dict],
+    data: Union[str, PanelDataContext],
+    folds: List[Fold],
+    config_dict: Optional[dict] = None,
+    metric: str = "sharpe",
+    processes: Optional[int] = None,
+    capital: float = 10000,
+    verbose: bool = True,
+    **backtest_kwargs,
+) -> WalkForwardResult:
+    """
+    For every fold, backtest each of `combos` on the train segment, keep the one
+    with the highest `metric` and backtest it on the test segment.
+
+    All (fold, combo) train runs go to one process pool at once; a fold's test
+    run is queued as soon as its last train run finishes. Like `run_sweep`,
+    workers memory-map a `BarStore` directory or attach to one shared-memory
+    copy of an in-memory context. Test segments are scale-free (targets are
+    fractions of equity), so each is run from `capital` and rescaled to start
+    where the previous one ended.
+    """
+    if config_dict is None:
+        _, config_dict = load_strategy(strategy_name)
+    combos = combos or [{}]
+
+    train_scores: Dict[int, List[tuple]] = {fold.number: [] for fold in folds}
+    tests: Dict[int, dict] = {}
+    chosen: Dict[int, tuple] = {}
+    kwargs = dict(backtest_kwargs, capital=capital)
+    with open_pool(data, strategy_name, processes) as pool:
+        pending = {}
+        for fold in folds:
+            for i, params in enumerate(combos):
+                future = pool.submit(_run_segment, config_dict, params, fold.train_start, fold.train_end, kwargs, False)
+                pending[future] = ("train", fold, i)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, fold, i = pending.pop(future)
+                row = future.result()
+                if kind == "test":
+                    tests[fold.number] = row
+                    if verbose:
+                        print(f"✅ fold {fold.number} test {str(fold.test_start)[:10]}..{str(fold.test_end)[:10]} "
+                              f"{metric}={row['summary'].get(metric, float('nan')):.4g} {combos[chosen[fold.number][0]]}")
+                    continue
+                score = row["summary"].get(metric)
+                train_scores[fold.number].append((i, score if score is not None and np.isfinite(score) else -np.inf))
+                if len(train_scores[fold.number]) == len(combos):
+                    best, best_score = max(train_scores[fold.number], key=lambda item: (item[1], -item[0]))
+                    chosen[fold.number] = (best, best_score)
+                    future = pool.submit(_run_segment, config_dict, combos[best], fold.test_start, fold.test_end,
+                                         kwargs, True)
+                    pending[future] = ("test", fold, best)
+
+    rows, pieces = [], []
+    level, bar_minutes = float(capital), 1
+    for fold in folds:
+        best, best_score = chosen[fold.number]
+        test = tests[fold.number]
+        rows.append({"fold": fold.number, "train_start": fold.train_start, "train_end": fold.train_end,
+                     "test_start": fold.test_start, "test_end": fold.test_end, **{f"param.{k}": v for k, v in combos[best].items()},
+                     f"train_{metric}": best_score, **{f"test_{k}": v for k, v in test["summary"].items()},
+                     "error": test["error"]})
+        if test["error"] or not len(test["equity"]):
+            continue
+        # Divide by `capital`, not equity[0], so the opening rebalance's fees stay in.
+        equity = test["equity"] / capital * level
+        pieces.append(pd.Series(equity, index=pd.DatetimeIndex(test["times"])))
+        level, bar_minutes = float(equity[-1]), test["bar_minutes"]
+
+    stitched = pd.concat(pieces) if pieces else pd.Series(dtype=float)
+    stitched = stitched[~stitched.index.duplicated(keep="first")].rename("equity")
+    return WalkForwardResult(pd.DataFrame(rows), stitched, bar_minutes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward optimisation: sweep on train folds, evaluate out of sample")
+    parser.add_argument("--strategy", required=True, help="Strategy name under futures/")
+    parser.add_argument("--store", required=True, help="Bar store directory (see module.bar_store)")
+    parser.add_argument("--grid", help='JSON grid, e.g. \'{"short_vol_window": [10, 20]}\'')
+    parser.add_argument("--random", help='JSON search space, as for module.sweep')
+    parser.add_argument("--samples", type=int, default=20, help="Random-search draws")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--train_days", type=float, default=14)
+    parser.add_argument("--test_days", type=float, default=7)
+    parser.add_argument("--step_days", type=float, default=None)
+    parser.add_argument("--anchored", action="store_true", help="Grow the train segment from --start instead of rolling it")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--metric", default="sharpe", help="BacktestResult.summary() key to maximise on train")
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--leverage", type=float, default=1)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="walk_forward_equity.csv", help="CSV of the stitched out-of-sample equity")
+    args = parser.parse_args()
+
+    if args.grid:
+        combos = param_grid(json.loads(args.grid))
+    elif args.random:
+        space = {k: (v["low"], v["high"]) if isinstance(v, dict) else v for k, v in json.loads(args.random).items()}
+        combos = random_search(space, args.samples, seed=args.seed)
+    else:
+        combos = [{}]
+
+    store = BarStore(args.store)
+    folds = make_folds(store.times, args.train_days, args.test_days, args.step_days, args.start, args.end, args.anchored)
+    if not folds:
+        parser.error("no fold fits between --start and --end")
+    print(f"🔁 {len(folds)} folds x {len(combos)} combinations on {args.processes} processes")
+
+    started = time.perf_counter()
+    result = walk_forward(args.strategy, combos, args.store, folds, metric=args.metric, processes=args.processes,
+                          capital=args.capital, leverage=args.leverage)
+    result.equity.to_csv(args.out, header=True)
+    print(f"⏱ {time.perf_counter() - started:.1f}s")
+    print(result.folds.to_string(index=False))
+    print(f"📝 Out-of-sample equity saved to {args.out}")
+    for key, value in result.summary().items():
+        print(f"  {key:<18} {value}")